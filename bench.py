@@ -0,0 +1,531 @@
+import datetime
+import importlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, fields, make_dataclass
+
+import numpy as np
+
+import ontology
+from cashflow import DebtBook
+from changelog import ChangeLog
+from exposure import ExposureEngine
+from extents import ExtentIndex
+from loader import load, load_parallel
+from pricing import DerivativeBook
+from propagation import PolicyGraph
+from query import Pattern, Var, query
+from ratings import MOODYS, RatingHistory
+from rdf import read_rdf, write_ntriples
+from serialize import msgpack, read_jsonl, read_msgpack, write_jsonl, write_msgpack
+from sessions import TradingCalendar
+from snapshot import Snapshot, write_snapshot
+from sqlstore import SqlStore
+from store import TripleStore
+from temporal import TemporalIndex
+from textindex import TextIndex
+from validate import SchemaValidator
+
+
+#### Helpers ####
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _bytes_per_instance(factory, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list itself is not part of the instance cost.
+    return (after - before - sys.getsizeof(instances)) / n
+
+
+def _dict_backed(cls):
+    # Unslotted twin of an instrument class, i.e. what the schema used to build.
+    return make_dataclass(cls.__name__, [(f.name, f.type) for f in fields(cls)])
+
+
+def _common_stock_kwargs(i):
+    # Field values are shared between instances so only the instance layout is measured.
+    return dict(
+        name="Stock",
+        annual_return=0.07,
+        risk=0.3,
+        issued_institution=None,
+        market=None,
+        commodity_value_as_of_execution_date=135.0,
+        nominal_value=135.0,
+        principal_executive_office_address="N/A",
+        redemption_terms="N/A",
+        financial_instrument_short_name="S",
+        share_type="Common",
+        dividend_yield=0.0063,
+        voting_rights=True,
+        dividend=0.85,
+        floating_shares=100,
+        share_class="Common Stock",
+        share_payment_status="Paid",
+        shares_authorized=100,
+    )
+
+
+#### Benchmarks ####
+def bench_instrument_memory(n=200_000):
+    slotted = ontology.CommonStock
+    unslotted = _dict_backed(slotted)
+    # Warm up so string interning and allocator pools don't skew the first run.
+    _bytes_per_instance(lambda i: slotted(**_common_stock_kwargs(i)), 1_000)
+    before = _bytes_per_instance(lambda i: unslotted(**_common_stock_kwargs(i)), n)
+    after = _bytes_per_instance(lambda i: slotted(**_common_stock_kwargs(i)), n)
+    print(f"CommonStock bytes/instance: dict={before:.0f} slots={after:.0f} "
+          f"({100 * (1 - after / before):.0f}% smaller, n={n})")
+
+
+def bench_snapshot_open(n=200_000):
+    nyse = ontology.StockExchange("New York Stock Exchange", "USA", "USD", "EST", "09:30", "16:00")
+    stocks = []
+    for i in range(n):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(name=f"Stock {i}", market=nyse, nominal_value=float(i))
+        stocks.append(ontology.CommonStock(**kwargs))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ontology.snap")
+        _, write = _timed(write_snapshot, path, stocks)
+        snapshot, opened = _timed(Snapshot, path)
+        _, first = _timed(lambda: snapshot[n // 2])
+        _, everything = _timed(lambda: [snapshot[i] for i in range(len(snapshot))])
+        snapshot.close()
+        size = os.path.getsize(path)
+    print(f"snapshot of {n} instruments: {size / n:.0f} bytes/object, write={write:.2f}s "
+          f"open={opened * 1e3:.2f}ms first object={first * 1e3:.3f}ms "
+          f"materialize all={everything:.2f}s")
+
+
+def bench_import_time(repeat=20):
+    # In-process, so interpreter startup and the stdlib modules ontology imports
+    # (dataclasses, typing, datetime) are excluded: only ontology's own work is timed.
+    saved = {name: sys.modules.get(name) for name in ("ontology", "sample")}
+    schema_runs, sample_runs = [], []
+    try:
+        for _ in range(repeat):
+            for name in saved:
+                sys.modules.pop(name, None)
+            module, schema = _timed(importlib.import_module, "ontology")
+            _, sample = _timed(module.load_sample)
+            schema_runs.append(schema)
+            sample_runs.append(sample)
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+    print(f"import ontology (best/median of {repeat}): schema "
+          f"{min(schema_runs) * 1e3:.1f}/{statistics.median(schema_runs) * 1e3:.1f}ms, "
+          f"sample build {min(sample_runs) * 1e3:.2f}/{statistics.median(sample_runs) * 1e3:.2f}ms")
+
+
+def bench_temporal_index(n=10_000_000, queries=1_000):
+    rng = np.random.default_rng(0)
+    first = datetime.date(1995, 1, 1).toordinal()
+    ordinals = rng.integers(first, first + 30 * 365, size=n)
+    edges = list(range(n))  # stand-ins, the index never looks inside an edge
+    index = TemporalIndex()
+    _, build = _timed(lambda: (index.add_ordinals(ontology.HoldBy, ordinals, edges),
+                               index.count_between(cls=ontology.HoldBy)))
+    days = [datetime.date.fromordinal(int(day))
+            for day in rng.integers(first, first + 30 * 365, size=queries)]
+    _, indexed = _timed(lambda: [index.count_between(day, day + datetime.timedelta(days=91),
+                                                     ontology.HoldBy) for day in days])
+    plain = ordinals.tolist()
+    start, end = days[0].toordinal(), days[0].toordinal() + 91
+    _, scan = _timed(lambda: sum(1 for day in plain if start <= day <= end))
+    print(f"temporal index over {n} edges: build={build:.2f}s, "
+          f"quarter query={indexed / queries * 1e6:.1f}us, linear scan={scan * 1e3:.0f}ms")
+
+
+def bench_validate(n=1_000_000):
+    validator = SchemaValidator()
+    validator.check({"type": "SecuritiesFirms", "id": "gs", "Jurisdiction": "USA",
+                     "RegulatoryAuthority": "FINRA", "LegalSystem": "Federal"})
+    validator.check({"type": "FinancialInstruments", "id": "etf", "name": "ETF",
+                     "annual_return": 0.1, "risk": 0.15, "@issued_institution": "gs",
+                     "@market": None, "commodity_value_as_of_execution_date": 415.0,
+                     "nominal_value": 415.0, "principal_executive_office_address": "N/A",
+                     "redemption_terms": "Redeemable"})
+    rows = [{"type": "HoldBy", "@holder": "gs", "@financial_instrument": "etf",
+             "holding_amount": float(i), "holding_date": "2021-05-01"} for i in range(n)]
+    rows[::100] = [dict(row, holding_amount="n/a") for row in rows[::100]]
+    (valid, errors), elapsed = _timed(validator.validate, rows)
+    print(f"validated {n} HoldBy rows in {elapsed:.2f}s ({n / elapsed / 1e6:.2f}M rows/s), "
+          f"{len(errors)} rejected")
+
+
+def bench_parallel_load(n=200_000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "feed.jsonl")
+        with open(path, "w") as handle:
+            handle.write(json.dumps({"type": "StockExchange", "id": "nyse", "name": "NYSE",
+                                     "country": "USA", "currency": "USD", "timezone": "EST",
+                                     "opening_time": "09:30", "closing_time": "16:00"}) + "\n")
+            for i in range(n):
+                handle.write(json.dumps({
+                    "type": "FinancialInstruments", "id": f"i{i}", "name": f"Instrument {i}",
+                    "annual_return": 0.1, "risk": 0.2, "@issued_institution": None,
+                    "@market": "nyse", "commodity_value_as_of_execution_date": 1.0,
+                    "nominal_value": 100.0, "principal_executive_office_address": "N/A",
+                    "redemption_terms": "N/A"}) + "\n")
+        _, sequential = _timed(lambda: sum(1 for _ in load(path)))
+        processes = os.cpu_count()
+        # The parent's own CPU time is the serial part: the speedup can't pass
+        # sequential / parent however many processes there are.
+        parent = time.process_time()
+        _, parallel = _timed(lambda: sum(1 for _ in load_parallel(path, processes=processes,
+                                                                shard_bytes=4 << 20)))
+        parent = time.process_time() - parent
+    print(f"load {n} instruments: sequential={sequential:.2f}s, "
+          f"{processes} processes={parallel:.2f}s ({sequential / parallel:.1f}x), "
+          f"parent={parent:.2f}s (at most {sequential / parent:.1f}x)")
+
+
+def bench_serialize(n=20_000, holdings_per_instrument=5):
+    nyse = ontology.StockExchange("New York Stock Exchange", "USA", "USD", "EST", "09:30", "16:00")
+    goldman = ontology.SecuritiesFirms("USA", "FINRA", "Federal")
+    relations = []
+    for i in range(n):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(name=f"Stock {i}", market=nyse, issued_institution=goldman)
+        stock = ontology.CommonStock(**kwargs)
+        relations += [ontology.HoldBy(goldman, stock, float(j), datetime.date(2021, 5, 1))
+                      for j in range(holdings_per_instrument)]
+    with tempfile.TemporaryDirectory() as directory:
+        def write_asdict(path, relations):
+            with open(path, "w") as handle:
+                for relation in relations:
+                    handle.write(json.dumps(asdict(relation), default=str) + "\n")
+
+        results = [("asdict+json", write_asdict, None, "asdict.jsonl"),
+                   ("jsonl", write_jsonl, read_jsonl, "refs.jsonl")]
+        if msgpack is not None:
+            results.append(("msgpack", write_msgpack, read_msgpack, "refs.msgpack"))
+        for label, write, read, name in results:
+            path = os.path.join(directory, name)
+            _, written = _timed(write, path, relations)
+            size = os.path.getsize(path)
+            line = (f"{label:>11}: write {len(relations) / written / 1e3:.0f}k relations/s, "
+                    f"{size / len(relations):.0f} bytes/relation")
+            if read is not None:
+                _, elapsed = _timed(lambda: sum(1 for _ in read(path)))
+                line += f", read {len(relations) / elapsed / 1e3:.0f}k relations/s"
+            print(line)
+
+
+def bench_rdf(n=20_000, holdings_per_instrument=5):
+    nyse = ontology.StockExchange("New York Stock Exchange", "USA", "USD", "EST", "09:30", "16:00")
+    goldman = ontology.SecuritiesFirms("USA", "FINRA", "Federal")
+    relations = []
+    for i in range(n):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(name=f"Stock {i}", market=nyse, issued_institution=goldman)
+        stock = ontology.CommonStock(**kwargs)
+        relations += [ontology.HoldBy(goldman, stock, float(j), datetime.date(2021, 5, 1))
+                      for j in range(holdings_per_instrument)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ontology.nt")
+        triples, written = _timed(write_ntriples, path, relations)
+        tracemalloc.start()
+        write_ntriples(path, relations)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size = os.path.getsize(path)
+        _, read = _timed(lambda: sum(1 for _ in read_rdf(path)))
+    print(f"N-Triples export of {len(relations)} relations: {triples} triples "
+          f"({size / 2**20:.0f} MiB), write {triples / written / 1e3:.0f}k triples/s "
+          f"(peak {peak / 2**20:.1f} MiB traced), read {triples / read / 1e3:.0f}k triples/s")
+
+
+def bench_extents(n=1_000_000):
+    classes = [ontology.CommonStock, ontology.PreferredStock, ontology.Bond, ontology.Loan,
+               ontology.Option, ontology.Future]
+    objects = [cls.__new__(cls) for cls in classes for _ in range(n // len(classes))]
+    index, build = _timed(ExtentIndex, objects)
+    _, indexed = _timed(index.extent, ontology.Debt)
+    _, scan = _timed(lambda: [obj for obj in objects if isinstance(obj, ontology.Debt)])
+    print(f"Debt extent over {len(objects)} instruments: build={build:.2f}s, "
+          f"extent={indexed * 1e3:.1f}ms, isinstance scan={scan * 1e3:.1f}ms")
+
+
+def bench_query(n=20_000, holders=200):
+    rng = np.random.default_rng(0)
+    markets = [ontology.StockExchange(f"Exchange {i}", "USA", "USD", "EST", "09:30", "16:00")
+               for i in range(20)]
+    firms = [ontology.SecuritiesFirms("USA", f"FINRA {i}", "Federal") for i in range(holders)]
+    moodys = ontology.CreditRatingAgency("USA", "SEC", "Federal")
+    ratings = ["Aaa", "Aa1", "Aa2", "A1", "Baa1", "Ba1"]
+    relations = []
+    for i in range(n):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(name=f"Stock {i}")
+        stock = ontology.CommonStock(**kwargs)
+        relations.append(ontology.IsTradedIn(stock, markets[i % len(markets)],
+                                             datetime.date(2020, 1, 1), 1e6))
+        relations.append(ontology.ProvidesRating(moodys, stock, ratings[i % len(ratings)]))
+        relations += [ontology.HoldBy(firms[j], stock, 100.0, datetime.date(2021, 5, 1))
+                      for j in rng.choice(holders, 5, replace=False)]
+    store = TripleStore(relations)
+    inst, holder = Var("inst"), Var("holder")
+    patterns = [Pattern(ontology.IsTradedIn, inst, markets[0]),
+                Pattern(ontology.ProvidesRating, moodys, inst, "Aaa"),
+                Pattern(ontology.HoldBy, holder, inst)]
+    result, planned = _timed(query, store, patterns, select=[inst, holder])
+
+    def nested():
+        found = []
+        for traded in relations:
+            if not (isinstance(traded, ontology.IsTradedIn) and traded.market is markets[0]):
+                continue
+            for rated in relations:
+                if isinstance(rated, ontology.ProvidesRating) and rated.rating_agency is moodys \
+                        and rated.financial_instrument is traded.instrument and rated.rating == "Aaa":
+                    found += [(held.financial_instrument, held.holder) for held in relations
+                              if isinstance(held, ontology.HoldBy)
+                              and held.financial_instrument is traded.instrument]
+        return found
+    _, naive = _timed(nested)
+    print(f"3-pattern query over {len(store)} relations: {len(result)} rows in "
+          f"{planned * 1e3:.1f}ms, nested loops {naive:.2f}s")
+
+
+def bench_text_index(n=1_000_000, queries=100):
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"term{i}" for i in range(20_000)])
+    # Zipf-like word frequencies, roughly what analyst prose looks like.
+    weights = 1 / np.arange(1, len(vocabulary) + 1)
+    words = rng.choice(vocabulary, size=(n, 12), p=weights / weights.sum())
+    policy = ontology.MonetaryPolicy()
+    relations = [ontology.IsAffectedBy(None, policy, None, " ".join(row)) for row in words.tolist()]
+    index, build = _timed(TextIndex, relations)
+    texts = [" ".join(rng.choice(vocabulary[:2_000], size=3)) for _ in range(queries)]
+    _, elapsed = _timed(lambda: [index.search(text, k=10) for text in texts])
+    _, common = _timed(index.search, "term0 term1 term2", 10)
+    print(f"text index over {n} documents: build={build:.1f}s, "
+          f"3-term query={elapsed / queries * 1e3:.1f}ms, most common terms={common * 1e3:.0f}ms")
+
+
+def bench_cashflow(n=10_000):
+    rng = np.random.default_rng(0)
+    loans = []
+    for i in range(n):
+        disbursed = datetime.date(2000, 1, 1) + datetime.timedelta(days=int(rng.integers(0, 8000)))
+        loans.append(ontology.Loan(
+            name=f"Loan {i}", annual_return=0.0, risk=0.1, issued_institution=None, market=None,
+            commodity_value_as_of_execution_date=0.0, nominal_value=100.0,
+            principal_executive_office_address="N/A", redemption_terms="Bullet",
+            interest_rate=float(rng.uniform(0.01, 0.08)), issuer="Bank",
+            maturity_date=disbursed + datetime.timedelta(days=int(rng.integers(365, 30 * 365))),
+            negative_amortization=False, principal_amount=float(rng.uniform(1e4, 1e6)),
+            disbursement_date=disbursed))
+    book, build = _timed(DebtBook.from_instruments, loans)
+    valuation = datetime.date(2024, 3, 1)
+
+    def value():
+        return (book.present_value(valuation, 0.05), book.duration(valuation, 0.05),
+                book.accrued_interest(valuation))
+    _, elapsed = _timed(value)
+    print(f"cash flows for {n} loans: build={build * 1e3:.0f}ms, "
+          f"PV + duration + accrued={elapsed * 1e3:.0f}ms")
+
+
+def bench_pricing(n=1_000_000):
+    rng = np.random.default_rng(0)
+    underlyings = []
+    for i in range(1_000):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(commodity_value_as_of_execution_date=float(rng.uniform(20, 500)),
+                      risk=float(rng.uniform(0.1, 0.6)))
+        underlyings.append(ontology.CommonStock(**kwargs))
+    common = dict(name="Contract", annual_return=0.0, risk=0.0, issued_institution=None,
+                  market=None, commodity_value_as_of_execution_date=0.0,
+                  principal_executive_office_address="N/A", redemption_terms="N/A",
+                  effective_date=datetime.date(2024, 1, 1))
+    days = rng.integers(30, 720, size=n).tolist()
+    strikes = rng.uniform(20, 500, size=n).tolist()
+    contracts, edges = [], []
+    for i in range(n):
+        expiry = datetime.date(2024, 3, 1) + datetime.timedelta(days=days[i])
+        if i % 3 == 0:
+            contract = ontology.Future(nominal_value=strikes[i], execution_date=None,
+                                       settlement_date=expiry, contract_size=100.0,
+                                       tick_size=0.01, **common)
+        elif i % 3 == 1:
+            contract = ontology.Forward(nominal_value=strikes[i], execution_date=expiry, **common)
+        else:
+            contract = ontology.Option(nominal_value=strikes[i], execution_date=expiry,
+                                       lot_size=100.0, **common)
+        contracts.append(contract)
+        edges.append(ontology.UnderlyingAsset(contract, underlyings[i % len(underlyings)], ""))
+    book, build = _timed(DerivativeBook.from_contracts, contracts, edges)
+    _, priced = _timed(book.value, datetime.date(2024, 3, 1), 0.04)
+    print(f"pricing {n} contracts: build={build:.2f}s, value all={priced * 1e3:.0f}ms")
+
+
+def bench_propagation(instruments=1_000_000, holders=100_000, policies=1_000, markets=10_000):
+    rng = np.random.default_rng(0)
+    graph = PolicyGraph()
+    policy_nodes = [ontology.MonetaryPolicy() for _ in range(policies)]
+    policy_codes = np.array([graph.code(node) for node in policy_nodes])
+    market_codes = np.array([graph.code(ontology.StockExchange.__new__(ontology.StockExchange))
+                             for _ in range(markets)])
+    instrument_codes = np.array([graph.code(ontology.CommonStock.__new__(ontology.CommonStock))
+                                 for _ in range(instruments)])
+    holder_codes = np.array([graph.code(ontology.Banks.__new__(ontology.Banks))
+                             for _ in range(holders)])
+    # ~10M edges: policy -> market, policy -> instrument, market -> instrument, holdings.
+    blocks = [(policy_codes, market_codes, 10_000), (policy_codes, instrument_codes, 1_000_000),
+              (market_codes, instrument_codes, 2_000_000),
+              (instrument_codes, holder_codes, 7_000_000)]
+    for sources, targets, size in blocks:
+        graph.add_code_edges(rng.choice(sources, size), rng.choice(targets, size))
+    _, build = _timed(graph.count, policy_nodes[0])
+    counts, shocked = _timed(graph.count, policy_nodes[1])
+    _, listed = _timed(graph.shock, policy_nodes[2])
+    print(f"policy shock over {len(graph)} edges: adjacency build={build:.2f}s, "
+          f"shock={shocked * 1e3:.0f}ms ({counts['instruments']} instruments, "
+          f"{counts['entities']} holders), with object lists={listed * 1e3:.0f}ms")
+
+
+def bench_ratings(instruments=100_000, events=10):
+    rng = np.random.default_rng(0)
+    moodys = ontology.CreditRatingAgency("USA", "SEC", "Federal")
+    bonds = [ontology.Bond.__new__(ontology.Bond) for _ in range(instruments)]
+    first = datetime.date(2005, 1, 1).toordinal()
+    days = rng.integers(0, 7_000, size=(instruments, events)).tolist()
+    grades = rng.integers(0, len(MOODYS), size=(instruments, events)).tolist()
+    history = RatingHistory()
+
+    def record():
+        for bond, bond_days, bond_grades in zip(bonds, days, grades):
+            for day, grade in zip(bond_days, bond_grades):
+                history.record(moodys, bond, MOODYS[grade], datetime.date.fromordinal(first + day))
+    _, recorded = _timed(record)
+    _, latest = _timed(lambda: [history.latest(moodys, bond) for bond in bonds])
+    _, matrix = _timed(history.migration_matrix, moodys, datetime.date(2010, 1, 1),
+                       datetime.date(2020, 1, 1))
+    _, again = _timed(history.migration_matrix, moodys, datetime.date(2011, 1, 1),
+                      datetime.date(2021, 1, 1))
+    print(f"rating history with {len(history)} events: record={recorded:.1f}s, "
+          f"latest for every bond={latest * 1e3:.0f}ms, migration matrix={matrix * 1e3:.0f}ms "
+          f"(first, includes sort) {again * 1e3:.0f}ms (after)")
+
+
+def bench_sessions(calls=1_000_000):
+    markets = [ontology.StockExchange("New York Stock Exchange", "USA", "USD", "EST", "09:30", "16:00"),
+               ontology.StockExchange("London Stock Exchange", "UK", "GBP", "GMT", "08:00", "16:30"),
+               ontology.StockExchange("Tokyo Stock Exchange", "Japan", "JPY", "JST", "09:00", "15:00"),
+               ontology.CryptocurrencyMarket("Crypto", "Global", "BTC", "24/7", "24/7", "24/7")]
+    calendar = TradingCalendar(markets)
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    instants = [start + datetime.timedelta(minutes=int(m))
+                for m in np.random.default_rng(0).integers(0, 365 * 1440, size=calls)]
+    nyse = markets[0]
+    _, elapsed = _timed(lambda: sum(calendar.is_open(nyse, when) for when in instants))
+    _, following = _timed(lambda: [calendar.next_open(nyse, when) for when in instants[:100_000]])
+    print(f"market hours: is_open={elapsed / calls * 1e9:.0f}ns/call, "
+          f"next_open={following / 100_000 * 1e6:.1f}us/call")
+
+
+def bench_changelog(holdings=200_000, changes=10_000):
+    firms = [ontology.SecuritiesFirms("USA", f"FINRA {i}", "Federal") for i in range(1_000)]
+    stocks = []
+    for i in range(1_000):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(name=f"Stock {i}")
+        stocks.append(ontology.CommonStock(**kwargs))
+    rng = np.random.default_rng(0)
+    relations = [ontology.HoldBy(firms[i % len(firms)], stocks[int(j)], 100.0,
+                                 datetime.date(2021, 5, 1))
+                 for i, j in enumerate(rng.integers(0, len(stocks), size=holdings))]
+    log = ChangeLog()
+    log.connect(ExposureEngine(relations))
+    targets = rng.integers(0, holdings, size=changes).tolist()
+
+    def mutate():
+        with log.batch():
+            for step, target in enumerate(targets):
+                log.set(relations[target], "holding_amount", float(step))
+    _, incremental = _timed(mutate)
+    _, rebuilt = _timed(ExposureEngine, relations)
+    print(f"change log: {changes} HoldBy updates applied to an exposure engine in "
+          f"{incremental * 1e3:.0f}ms, rebuilding it instead {rebuilt * 1e3:.0f}ms")
+
+
+def bench_sqlstore(instruments=20_000, holdings_per_instrument=10):
+    markets = [ontology.StockExchange(f"Exchange {i}", "USA", "USD", "EST", "09:30", "16:00")
+               for i in range(20)]
+    sec = ontology.Regulators("USA", "SEC", "Federal")
+    firms = [ontology.SecuritiesFirms("USA", f"FINRA {i}", "Federal") for i in range(1_000)]
+    relations = []
+    for i in range(instruments):
+        kwargs = _common_stock_kwargs(i)
+        kwargs.update(name=f"Stock {i}", market=markets[i % len(markets)],
+                      issued_institution=firms[i % len(firms)])
+        stock = ontology.CommonStock(**kwargs)
+        relations.append(ontology.RegulatoryOversight(sec, stock))
+        relations += [ontology.HoldBy(firms[(i + j) % len(firms)], stock, float(j),
+                                      datetime.date(2021, 5, 1))
+                      for j in range(holdings_per_instrument)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ontology.db")
+        with SqlStore(path) as store:
+            rows, inserted = _timed(store.insert, relations)
+        size = os.path.getsize(path)
+        with SqlStore(path) as store:
+            _, by_name = _timed(lambda: [next(store.by_name(f"Stock {i}"))
+                                         for i in range(0, instruments, instruments // 1_000)])
+            _, by_market = _timed(lambda: sum(1 for _ in store.by_market(markets[0])))
+            holdings, scanned = _timed(lambda: sum(1 for _ in store.of_type(ontology.HoldBy)))
+            store.forget()
+            tracemalloc.start()
+            sum(1 for _ in store.of_type(ontology.HoldBy))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    print(f"SQLite store: insert {rows / inserted / 1e3:.0f}k rows/s ({size / rows:.0f} bytes/row), "
+          f"by_name={by_name / 1_000 * 1e6:.0f}us, by_market={by_market * 1e3:.0f}ms "
+          f"({instruments // len(markets)} instruments), paged HoldBy scan "
+          f"{holdings / scanned / 1e3:.0f}k objects/s (peak {peak / 2**20:.1f} MiB traced)")
+
+
+BENCHMARKS = {
+    "instrument_memory": bench_instrument_memory,
+    "snapshot_open": bench_snapshot_open,
+    "import_time": bench_import_time,
+    "temporal_index": bench_temporal_index,
+    "validate": bench_validate,
+    "parallel_load": bench_parallel_load,
+    "serialize": bench_serialize,
+    "rdf": bench_rdf,
+    "extents": bench_extents,
+    "query": bench_query,
+    "text_index": bench_text_index,
+    "cashflow": bench_cashflow,
+    "pricing": bench_pricing,
+    "propagation": bench_propagation,
+    "ratings": bench_ratings,
+    "sessions": bench_sessions,
+    "changelog": bench_changelog,
+    "sqlstore": bench_sqlstore,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
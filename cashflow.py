@@ -0,0 +1,170 @@
+import datetime
+
+import numpy as np
+
+from ontology import Loan
+
+
+#### Debt cash-flow engine ####
+# Bond, Loan and GovernmentDebt instances as columns (face, coupon rate, start and
+# maturity dates), valued for a given date in one pass over a (debts x coupon periods)
+# grid. Schedules are bullet: a coupon of face * rate / frequency on every coupon date
+# counted back from maturity, plus the face at maturity. Coupon dates keep the
+# maturity's day of month, clipped to the month's length. Start dates cut off coupons
+# paid before the instrument existed.
+#
+#   face:     Loan.principal_amount, otherwise nominal_value
+#   start:    disbursement_date (Loan), execution_date (GovernmentDebt), award_date (Bond)
+#   maturity: maturity_date. Bond has none, so pass maturity=callable for it. Rows
+#             without a maturity value as NaN.
+#
+# Time is ACT/365F years from the valuation date. Yields compound at the coupon
+# frequency. Accrued interest is linear in actual days over the current period.
+
+_START_FIELDS = ("disbursement_date", "execution_date", "award_date")
+
+
+def _day(value):
+    if value is None:
+        return np.datetime64("NaT", "D")
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+def _start(instrument):
+    for name in _START_FIELDS:
+        value = getattr(instrument, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+class DebtBook:
+    def __init__(self, face, rate, start, maturity, objects, frequency=2):
+        if 12 % frequency:
+            raise ValueError(f"coupon frequency must divide 12, got {frequency}")
+        self.face = face
+        self.rate = rate
+        self.start = start
+        self.maturity = maturity
+        self.objects = objects
+        self.frequency = frequency
+        self._cached = None   # (valuation day, schedule) of the last schedule() call; columns
+                              # are treated as read-only once built
+
+    @classmethod
+    def from_instruments(cls, instruments, frequency=2, maturity=None):
+        instruments = list(instruments)
+        n = len(instruments)
+        face = np.empty(n, dtype=np.float64)
+        rate = np.empty(n, dtype=np.float64)
+        start = np.empty(n, dtype="datetime64[D]")
+        maturities = np.empty(n, dtype="datetime64[D]")
+        for row, instrument in enumerate(instruments):
+            face[row] = instrument.principal_amount if isinstance(instrument, Loan) \
+                else instrument.nominal_value
+            rate[row] = instrument.interest_rate
+            start[row] = _day(_start(instrument))
+            value = getattr(instrument, "maturity_date", None)
+            if value is None and maturity is not None:
+                value = maturity(instrument)
+            maturities[row] = _day(value)
+        objects = np.empty(n, dtype=object)
+        objects[:] = instruments
+        return cls(face, rate, start, maturities, objects, frequency)
+
+    def __len__(self):
+        return len(self.objects)
+
+    #### Schedules ####
+    def schedule(self, valuation):
+        # (coupon dates, cash flows, years from valuation) as (debts x periods) arrays,
+        # latest date first, periods without a flow are zero; then the current accrual
+        # period's start and end per debt (equal once a debt has matured).
+        when = _day(valuation)
+        if self._cached is not None and self._cached[0] == when:
+            return self._cached[1]
+        valid = ~np.isnat(self.maturity)
+        maturity = np.where(valid, self.maturity, when)
+        step = 12 // self.frequency
+        maturity_month = maturity.astype("datetime64[M]")
+        day = (maturity - maturity_month.astype("datetime64[D]")).astype(np.int64)
+        months_left = (maturity_month - when.astype("datetime64[M]")).astype(np.int64)
+        periods = int(max(months_left.max(initial=0), 0)) // step + 2
+
+        months = maturity_month[:, None] - (np.arange(periods) * step).astype("timedelta64[M]")
+        first = months.astype("datetime64[D]")
+        length = ((months + 1).astype("datetime64[D]") - first).astype(np.int64)
+        dates = first + np.minimum(day[:, None], length - 1).astype("timedelta64[D]")
+
+        start = np.where(np.isnat(self.start), np.datetime64("1900-01-01"), self.start)
+        paid = (dates > when) & (dates > start[:, None]) & valid[:, None]
+        coupon = self.face * self.rate / self.frequency
+        flows = np.where(paid, coupon[:, None], 0.0)
+        flows[:, 0] += np.where(paid[:, 0], self.face, 0.0)
+        years = (dates - when).astype(np.float64) / 365.0
+
+        remaining = paid.sum(axis=1)
+        rows = np.arange(len(dates))
+        previous = np.maximum(dates[rows, remaining], start)
+        upcoming = np.where(remaining > 0, dates[rows, np.maximum(remaining - 1, 0)], previous)
+        self._cached = (when, (dates, flows, years, previous, upcoming))
+        return self._cached[1]
+
+    #### Valuation ####
+    def _rates(self, rates):
+        return self.rate if rates is None else np.broadcast_to(
+            np.asarray(rates, dtype=np.float64), self.rate.shape)
+
+    def _discounted(self, valuation, rates):
+        _, flows, years, _, _ = self.schedule(valuation)
+        per_period = 1 + self._rates(rates) / self.frequency
+        factors = per_period[:, None] ** (-self.frequency * years)
+        return flows * factors, years, per_period
+
+    def present_value(self, valuation, rates=None):
+        # Dirty value of the remaining flows at flat yields (default: each coupon rate).
+        discounted, _, _ = self._discounted(valuation, rates)
+        value = discounted.sum(axis=1)
+        return np.where(np.isnat(self.maturity), np.nan, value)
+
+    def duration(self, valuation, rates=None):
+        # (Macaulay, modified) duration in years.
+        discounted, years, per_period = self._discounted(valuation, rates)
+        value = discounted.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            macaulay = (discounted * years).sum(axis=1) / value
+        macaulay = np.where(np.isnat(self.maturity), np.nan, macaulay)
+        return macaulay, macaulay / per_period
+
+    def accrued_interest(self, valuation):
+        when = _day(valuation)
+        _, _, _, previous, upcoming = self.schedule(valuation)
+        elapsed = (when - previous).astype(np.float64)
+        period = (upcoming - previous).astype(np.float64)
+        coupon = self.face * self.rate / self.frequency
+        with np.errstate(invalid="ignore", divide="ignore"):
+            accrued = np.where(period > 0, coupon * elapsed / period, 0.0)
+        return np.where(np.isnat(self.maturity), np.nan, accrued)
+
+    def clean_price(self, valuation, rates=None):
+        return self.present_value(valuation, rates) - self.accrued_interest(valuation)
+
+    def yield_to_maturity(self, valuation, prices, iterations=50, tolerance=1e-12):
+        # Flat yields that reprice the remaining flows to the given dirty prices (Newton).
+        prices = np.broadcast_to(np.asarray(prices, dtype=np.float64), self.rate.shape)
+        _, flows, years, _, _ = self.schedule(valuation)
+        exponent = -self.frequency * years
+        yields = self.rate.copy()
+        for _ in range(iterations):
+            per_period = 1 + yields / self.frequency
+            discounted = flows * per_period[:, None] ** exponent
+            error = discounted.sum(axis=1) - prices
+            slope = (discounted * exponent).sum(axis=1) / (self.frequency * per_period)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                change = np.where(slope != 0, error / slope, 0.0)
+            yields = yields - change
+            if np.nanmax(np.abs(change), initial=0.0) < tolerance:
+                break
+        return np.where(np.isnat(self.maturity) | (flows.sum(axis=1) == 0), np.nan, yields)
@@ -0,0 +1,206 @@
+from contextlib import contextmanager
+
+
+#### Change log ####
+# Append-only record of mutations to Things and Relations:
+#
+#   log.add(holding)                       "add"
+#   log.set(holding, "holding_amount", 9)  "update": sets the field and records old/new
+#   log.remove(edge)                       "remove"
+#
+# Subscribers each have a cursor into the log and receive the changes past it as one
+# list. Outside a batch that happens after every change. Inside `with log.batch():` it
+# happens once, when the outermost batch ends. A subscriber with batch_size waits
+# until that many matching changes are pending (or flush() is called). connect() plugs
+# in an index or view with add/remove/update methods: a batch's changes are coalesced
+# per object first, so each object costs the target one call, and an object updated then
+# removed is removed with its old field values. Changes a callback records are delivered
+# once it returns. Entries every subscriber has seen are dropped by compact().
+
+ADD, UPDATE, REMOVE = "add", "update", "remove"
+
+
+class Change:
+    __slots__ = ("sequence", "op", "obj", "field", "old", "new")
+
+    def __init__(self, sequence, op, obj, field=None, old=None, new=None):
+        self.sequence = sequence
+        self.op = op
+        self.obj = obj
+        self.field = field
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        detail = f" {self.field}: {self.old!r} -> {self.new!r}" if self.op == UPDATE else ""
+        return f"<Change #{self.sequence} {self.op} {type(self.obj).__name__}{detail}>"
+
+
+class _Subscriber:
+    __slots__ = ("callback", "classes", "batch_size", "cursor")
+
+    def __init__(self, callback, classes, batch_size, cursor):
+        self.callback = callback
+        self.classes = classes
+        self.batch_size = batch_size
+        self.cursor = cursor   # sequence number of the first undelivered change
+
+
+class ChangeLog:
+    def __init__(self):
+        self._entries = []
+        self._first = 0        # sequence number of _entries[0]
+        self._subscribers = []
+        self._depth = 0        # nesting of batch()
+        self._delivering = False
+
+    def __len__(self):
+        return self._first + len(self._entries)
+
+    #### Recording ####
+    def _append(self, op, obj, field=None, old=None, new=None):
+        change = Change(len(self), op, obj, field, old, new)
+        self._entries.append(change)
+        if not self._depth:
+            self._deliver(force=False)
+        return change
+
+    def add(self, obj):
+        return self._append(ADD, obj)
+
+    def remove(self, obj):
+        return self._append(REMOVE, obj)
+
+    def set(self, obj, field, value):
+        old = getattr(obj, field)
+        setattr(obj, field, value)
+        return self._append(UPDATE, obj, field, old, value)
+
+    def changed(self, obj, field=None):
+        # For mutations made directly on the object: records an update without values.
+        return self._append(UPDATE, obj, field)
+
+    def since(self, sequence):
+        if sequence < self._first:
+            raise ValueError(f"changes before #{self._first} were compacted away")
+        return self._entries[sequence - self._first:]
+
+    @contextmanager
+    def batch(self):
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self._deliver(force=False)
+
+    #### Subscribers ####
+    def subscribe(self, callback, classes=None, batch_size=None, replay=False):
+        # callback(changes) gets lists of Change; classes filters by isinstance.
+        # replay=True delivers the retained history first.
+        if classes is not None and not isinstance(classes, tuple):
+            classes = tuple(classes) if isinstance(classes, (list, set)) else (classes,)
+        subscriber = _Subscriber(callback, classes, batch_size,
+                                 self._first if replay else len(self))
+        self._subscribers.append(subscriber)
+        if replay:
+            self._deliver_to(subscriber, force=True)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.remove(subscriber)
+
+    def flush(self):
+        self._deliver(force=True)
+
+    def _deliver(self, force):
+        # Changes recorded by a callback are delivered after it returns, by another round.
+        if self._delivering:
+            return
+        self._delivering = True
+        try:
+            delivered = True
+            while delivered:
+                delivered = False
+                for subscriber in list(self._subscribers):
+                    delivered |= self._deliver_to(subscriber, force)
+        finally:
+            self._delivering = False
+
+    def _deliver_to(self, subscriber, force):
+        pending = self.since(subscriber.cursor)
+        if subscriber.classes is not None:
+            pending = [change for change in pending if isinstance(change.obj, subscriber.classes)]
+        if not pending:
+            subscriber.cursor = len(self)
+            return False
+        if not force and subscriber.batch_size and len(pending) < subscriber.batch_size:
+            return False
+        subscriber.cursor = len(self)  # before the call, so nothing is delivered twice
+        subscriber.callback(pending)
+        return True
+
+    def compact(self):
+        # Drop the entries every subscriber has already received.
+        keep = min((subscriber.cursor for subscriber in self._subscribers), default=len(self))
+        del self._entries[:keep - self._first]
+        self._first = keep
+
+    #### Targets ####
+    def connect(self, target, classes=None, batch_size=None, add="add", remove="remove",
+                update="update"):
+        # Keeps an index/view with add/remove/update methods in step with the log. Pass
+        # update=None for targets that don't depend on field values (e.g. ExtentIndex).
+        on_add = getattr(target, add)
+        on_remove = getattr(target, remove)
+        on_update = None if update is None else getattr(target, update)
+
+        def apply(changes):
+            for op, obj, old in coalesce(changes):
+                if op == ADD:
+                    on_add(obj)
+                elif op == REMOVE:
+                    # The target last saw the values from before the batch's updates.
+                    current = {field: getattr(obj, field) for field in old}
+                    _assign(obj, old)
+                    try:
+                        on_remove(obj)
+                    finally:
+                        _assign(obj, current)
+                elif on_update is not None:
+                    on_update(obj)
+        return self.subscribe(apply, classes, batch_size)
+
+
+def _assign(obj, values):
+    for field, value in values.items():
+        setattr(obj, field, value)
+
+
+def coalesce(changes):
+    # Net (op, object, old) per object, in order of first appearance: add + update is an
+    # add, add + remove cancels out, update + remove is a remove, remove + add is an
+    # update. `old` maps each field set() in the changes to its value before them.
+    net = {}
+    for change in changes:
+        key = id(change.obj)
+        previous = net.get(key)
+        op = change.op
+        old = {} if previous is None else previous[2]
+        if op == UPDATE and change.field is not None and (
+                change.old is not None or change.new is not None):  # not changed()
+            old.setdefault(change.field, change.old)
+        if previous is not None:
+            before = previous[0]
+            if before == ADD:
+                op = None if op == REMOVE else ADD
+            elif before == REMOVE:
+                op = UPDATE if op == ADD else REMOVE
+            elif op == ADD:
+                op = UPDATE
+        if op is None:
+            del net[key]
+        else:
+            net[key] = (op, change.obj, old)
+    return list(net.values())
@@ -0,0 +1,156 @@
+from collections import defaultdict
+
+from ontology import (Compliance, ComplianceWithRegulation, RegulatesFinancialInstrument,
+                      RegulationCompliance, RegulatoryOversight, SupervisesInstitution)
+
+
+#### Compliance view ####
+# Materialized join of supervision edges (regulator -> entity) with compliance facts
+# (entity, regulation, is_compliant):
+#
+#   view[regulator, regulation] = {entity: compliant?} for every supervised entity
+#                                 with a compliance fact on that regulation
+#
+# An entity/regulation pair with several facts is compliant only if none of them says
+# otherwise. Inserts and deletes touch only the view cells of the changed edge or fact,
+# and non-compliant counts per (regulator, regulation) are kept alongside, so dashboard
+# reads never recompute the join. Everything is keyed on object identity.
+
+SUPERVISION = {
+    SupervisesInstitution: ("regulator", "financial_institution"),
+    RegulatesFinancialInstrument: ("regulator", "financial_instrument"),
+    RegulatoryOversight: ("regulator", "entity"),
+}
+
+COMPLIANCE = (Compliance, ComplianceWithRegulation, RegulationCompliance)
+
+
+def _supervision(relation):
+    for cls, (regulator, entity) in SUPERVISION.items():
+        if isinstance(relation, cls):
+            return getattr(relation, regulator), getattr(relation, entity)
+    return None
+
+
+class ComplianceView:
+    def __init__(self, relations=()):
+        self._objects = {}                       # id -> regulator, entity or regulation
+        self._edges = {}                         # id(supervision) -> (regulator, entity)
+        self._facts = {}                         # id(compliance) -> (entity, regulation, flag)
+        self._supervisors = defaultdict(dict)    # id(entity) -> {id(regulator): edge count}
+        self._pairs = defaultdict(dict)          # id(entity) -> {id(regulation): [ok, not ok]}
+        self._view = defaultdict(dict)           # id(regulator) -> {id(regulation): {id(entity): bool}}
+        self._failing = defaultdict(int)         # (id(regulator), id(regulation)) -> non-compliant count
+        self.extend(relations)
+
+    def __len__(self):
+        return sum(len(cell) for cells in self._view.values() for cell in cells.values())
+
+    def _track(self, obj):
+        self._objects[id(obj)] = obj
+        return id(obj)
+
+    #### Maintenance ####
+    def _set(self, regulator, regulation, entity, status):
+        # status None removes the cell.
+        key = (regulator, regulation)
+        cells = self._view[regulator]
+        cell = cells.setdefault(regulation, {})
+        before = cell.pop(entity, None)
+        if before is False:
+            self._failing[key] -= 1
+        if status is not None:
+            cell[entity] = status
+            if status is False:
+                self._failing[key] += 1
+        if not cell:
+            del cells[regulation]
+            if not cells:
+                del self._view[regulator]
+        if not self._failing.get(key, 1):
+            del self._failing[key]
+
+    def _status(self, entity, regulation):
+        counts = self._pairs.get(entity, {}).get(regulation)
+        return None if counts is None else counts[1] == 0
+
+    def add(self, relation):
+        if id(relation) in self._edges or id(relation) in self._facts:
+            return False
+        supervision = _supervision(relation)
+        if supervision is not None:
+            regulator, entity = map(self._track, supervision)
+            self._edges[id(relation)] = (regulator, entity)
+            counts = self._supervisors[entity]
+            counts[regulator] = counts.get(regulator, 0) + 1
+            if counts[regulator] == 1:
+                for regulation in self._pairs.get(entity, ()):
+                    self._set(regulator, regulation, entity, self._status(entity, regulation))
+            return True
+        if isinstance(relation, COMPLIANCE):
+            entity, regulation = self._track(relation.entity), self._track(relation.regulation)
+            flag = bool(relation.is_compliant)
+            self._facts[id(relation)] = (entity, regulation, flag)
+            counts = self._pairs[entity].setdefault(regulation, [0, 0])
+            counts[0 if flag else 1] += 1
+            self._refresh(entity, regulation)
+            return True
+        raise TypeError(f"not a supervision or compliance relation: {type(relation).__name__}")
+
+    def extend(self, relations):
+        for relation in relations:
+            self.add(relation)
+
+    def remove(self, relation):
+        edge = self._edges.pop(id(relation), None)
+        if edge is not None:
+            regulator, entity = edge
+            counts = self._supervisors[entity]
+            counts[regulator] -= 1
+            if not counts[regulator]:
+                del counts[regulator]
+                if not counts:
+                    del self._supervisors[entity]
+                for regulation in self._pairs.get(entity, ()):
+                    self._set(regulator, regulation, entity, None)
+            return
+        entity, regulation, flag = self._facts.pop(id(relation))
+        counts = self._pairs[entity][regulation]
+        counts[0 if flag else 1] -= 1
+        if counts == [0, 0]:
+            del self._pairs[entity][regulation]
+            if not self._pairs[entity]:
+                del self._pairs[entity]
+        self._refresh(entity, regulation)
+
+    def update(self, relation):
+        # Call after changing is_compliant (or the entity/regulation) on a stored relation.
+        self.remove(relation)
+        self.add(relation)
+
+    def _refresh(self, entity, regulation):
+        status = self._status(entity, regulation)
+        for regulator in self._supervisors.get(entity, ()):
+            self._set(regulator, regulation, entity, status)
+
+    #### Reads ####
+    def _cell(self, regulator, regulation):
+        return self._view.get(id(regulator), {}).get(id(regulation), {})
+
+    def status(self, regulator, regulation):
+        # [(entity, is compliant)] for every entity the regulator supervises with a fact on it.
+        return [(self._objects[entity], ok)
+                for entity, ok in self._cell(regulator, regulation).items()]
+
+    def non_compliant(self, regulator, regulation):
+        cell = self._cell(regulator, regulation)
+        return [self._objects[entity] for entity, ok in cell.items() if not ok]
+
+    def count_non_compliant(self, regulator, regulation):
+        return self._failing.get((id(regulator), id(regulation)), 0)
+
+    def summary(self, regulator):
+        # [(regulation, entities covered, non-compliant)] for one regulator's dashboard.
+        key = id(regulator)
+        return [(self._objects[regulation], len(cell), self._failing.get((key, regulation), 0))
+                for regulation, cell in self._view.get(key, {}).items()]
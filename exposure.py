@@ -0,0 +1,235 @@
+import numpy as np
+
+from ontology import Derivative, IsIssuedBy, Issuance, IsTradedIn, MarketParticipation
+
+
+#### Exposure engine ####
+# Exposure of a HoldBy position is holding_amount * instrument.nominal_value. Totals are
+# kept per holder and per instrument, and pushed through "bridges" (instrument -> issuer,
+# instrument -> market, instrument -> ultimate underlyings) to the other group-bys. An
+# instrument linked to several issuers or markets counts in full for each of them.
+#
+# Batches go through np.bincount; a single changed HoldBy is applied as a scalar delta,
+# so nothing is recomputed from scratch. Everything is keyed on object identity. With an
+# UnderlyingIndex, look-through links follow the index: when a derivative's underlyings
+# change, its total moves from the old ultimate underlyings to the new ones.
+
+def _issuance(relation):
+    if isinstance(relation, IsIssuedBy):
+        return relation.instrument, relation.institution
+    if isinstance(relation, Issuance):
+        return relation.financial_instrument, relation.issuer
+    raise TypeError(f"not an issuance relation: {type(relation).__name__}")
+
+
+def _trading(relation):
+    if isinstance(relation, IsTradedIn):
+        return relation.instrument, relation.market
+    if isinstance(relation, MarketParticipation):
+        return relation.financial_instrument, relation.market
+    raise TypeError(f"not a trading relation: {type(relation).__name__}")
+
+
+class _Groups:
+    # Identity-keyed codes for one group-by and a growable totals array.
+    def __init__(self):
+        self.codes = {}
+        self.objects = []
+        self.totals = np.zeros(16)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def code(self, obj):
+        code = self.codes.get(id(obj))
+        if code is None:
+            code = self.codes[id(obj)] = len(self.objects)
+            self.objects.append(obj)
+            if code >= len(self.totals):
+                self.totals = np.concatenate([self.totals, np.zeros(len(self.totals))])
+        return code
+
+    def add(self, codes, weights):
+        self.totals[:len(self)] += np.bincount(codes, weights=weights, minlength=len(self))
+
+    def items(self):
+        return list(zip(self.objects, self.totals[:len(self)].tolist()))
+
+    def get(self, obj):
+        code = self.codes.get(id(obj))
+        return 0.0 if code is None else float(self.totals[code])
+
+
+class _Bridge:
+    # Many-to-many instrument code -> group code links.
+    def __init__(self):
+        self.groups = _Groups()
+        self.links = {}   # instrument code -> [group codes]
+        self._arrays = None
+
+    def relink(self, instrument_code, group_codes, total):
+        # Replace an instrument's links, moving its total along.
+        old = self.links.get(instrument_code, [])
+        if set(old) == set(group_codes):
+            return
+        for group_code in old:
+            self.groups.totals[group_code] -= total
+        for group_code in group_codes:
+            self.groups.totals[group_code] += total
+        self.links[instrument_code] = list(group_codes)
+        self._arrays = None
+
+    def link(self, instrument_code, group_code):
+        targets = self.links.setdefault(instrument_code, [])
+        if group_code in targets:
+            return False
+        targets.append(group_code)
+        self._arrays = None
+        return True
+
+    def arrays(self):
+        if self._arrays is None:
+            pairs = [(i, g) for i, targets in self.links.items() for g in targets]
+            pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+            self._arrays = pairs[:, 0], pairs[:, 1]
+        return self._arrays
+
+    def push(self, instrument_totals):
+        instruments, groups = self.arrays()
+        self.groups.add(groups, instrument_totals[instruments])
+
+    def push_one(self, instrument_code, delta):
+        for group_code in self.links.get(instrument_code, ()):
+            self.groups.totals[group_code] += delta
+
+
+class ExposureEngine:
+    def __init__(self, holdings=(), issuances=(), tradings=(), underlyings=None):
+        # underlyings is an optional reachability.UnderlyingIndex used for look-through.
+        self.holders = _Groups()
+        self.instruments = _Groups()
+        self.issuers = _Bridge()
+        self.markets = _Bridge()
+        self.look_through = _Bridge()
+        self._underlyings = underlyings
+        self._positions = {}  # id(holding) -> (holding, holder code, instrument code, value)
+        self._held = {}       # instrument code -> ids of the holdings of it
+        if underlyings is not None:
+            underlyings.listeners.append(self._refresh_look_through)
+        for relation in issuances:
+            self.link_issuer(*_issuance(relation))
+        for relation in tradings:
+            self.link_market(*_trading(relation))
+        self.add_many(holdings)
+
+    @property
+    def _bridges(self):
+        return self.issuers, self.markets, self.look_through
+
+    def _look_through_codes(self, instrument):
+        targets = []
+        if self._underlyings is not None and isinstance(instrument, Derivative):
+            targets = self._underlyings.ultimate_underlyings(instrument)
+        return [self.look_through.groups.code(target) for target in targets or [instrument]]
+
+    def _instrument_code(self, instrument):
+        known = len(self.instruments)
+        code = self.instruments.code(instrument)
+        if code == known:
+            for group_code in self._look_through_codes(instrument):
+                self.look_through.link(code, group_code)
+        return code
+
+    def _refresh_look_through(self, derivatives):
+        # UnderlyingIndex listener: re-resolve the derivatives already seen.
+        for derivative in derivatives:
+            code = self.instruments.codes.get(id(derivative))
+            if code is not None:
+                self.look_through.relink(code, self._look_through_codes(derivative),
+                                         self.instruments.totals[code])
+
+    def _link(self, bridge, instrument, group):
+        code = self._instrument_code(instrument)
+        group_code = bridge.groups.code(group)
+        if bridge.link(code, group_code):
+            bridge.groups.totals[group_code] += self.instruments.totals[code]
+
+    def link_issuer(self, instrument, issuer):
+        self._link(self.issuers, instrument, issuer)
+
+    def link_market(self, instrument, market):
+        self._link(self.markets, instrument, market)
+
+    #### Positions ####
+    def _position(self, holding):
+        value = holding.holding_amount * holding.financial_instrument.nominal_value
+        return (holding, self.holders.code(holding.holder),
+                self._instrument_code(holding.financial_instrument), value)
+
+    def add_many(self, holdings):
+        positions = [self._position(holding) for holding in holdings
+                     if id(holding) not in self._positions]
+        if not positions:
+            return
+        for position in positions:
+            self._positions[id(position[0])] = position
+            self._held.setdefault(position[2], set()).add(id(position[0]))
+        _, holder_codes, instrument_codes, values = zip(*positions)
+        values = np.array(values, dtype=np.float64)
+        self.holders.add(np.array(holder_codes), values)
+        before = self.instruments.totals[:len(self.instruments)].copy()
+        self.instruments.add(np.array(instrument_codes), values)
+        delta = self.instruments.totals[:len(self.instruments)] - before
+        for bridge in self._bridges:
+            bridge.push(delta)
+
+    def _apply(self, holder_code, instrument_code, delta):
+        self.holders.totals[holder_code] += delta
+        self.instruments.totals[instrument_code] += delta
+        for bridge in self._bridges:
+            bridge.push_one(instrument_code, delta)
+
+    def add(self, holding):
+        # Single holding: a scalar delta, like remove() and update(); batches use add_many.
+        if id(holding) in self._positions:
+            return
+        position = self._positions[id(holding)] = self._position(holding)
+        self._held.setdefault(position[2], set()).add(id(holding))
+        self._apply(position[1], position[2], position[3])
+
+    def remove(self, holding):
+        _, holder_code, instrument_code, value = self._positions.pop(id(holding))
+        self._held[instrument_code].discard(id(holding))
+        self._apply(holder_code, instrument_code, -value)
+
+    def update(self, holding):
+        # Call after mutating a HoldBy (amount, holder, instrument). After changing an
+        # instrument's nominal_value, call revalue(instrument) instead.
+        _, holder_code, instrument_code, value = self._positions[id(holding)]
+        self._held[instrument_code].discard(id(holding))
+        self._apply(holder_code, instrument_code, -value)
+        position = self._positions[id(holding)] = self._position(holding)
+        self._held.setdefault(position[2], set()).add(id(holding))
+        self._apply(position[1], position[2], position[3])
+
+    def revalue(self, instrument):
+        # Re-price every position in the instrument after its nominal_value changed.
+        code = self.instruments.codes.get(id(instrument))
+        for key in list(self._held.get(code, ())):
+            self.update(self._positions[key][0])
+
+    #### Results ####
+    def by_holder(self):
+        return self.holders.items()
+
+    def by_instrument(self):
+        return self.instruments.items()
+
+    def by_issuer(self):
+        return self.issuers.groups.items()
+
+    def by_market(self):
+        return self.markets.groups.items()
+
+    def by_underlying(self):
+        return self.look_through.groups.items()
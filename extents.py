@@ -0,0 +1,99 @@
+from dataclasses import is_dataclass
+
+from loader import ontology_classes
+
+
+#### Class extents ####
+# Instances are bucketed by their exact class. Classes are numbered in depth-first
+# pre-order over the dataclass hierarchy, so every class and its descendants occupy one
+# contiguous interval [low, high) of that numbering. The descendant-inclusive extent of
+# a class (all Debt: Bond, Loan, GovernmentDebt ...) is then the buckets in its interval,
+# with no isinstance checks and no scan of unrelated objects. Classes not seen before
+# (e.g. defined outside ontology.py) are added and the intervals renumbered. Objects are
+# keyed on identity.
+
+def _dataclass_bases(cls):
+    return [base for base in cls.__bases__ if is_dataclass(base)]
+
+
+class ExtentIndex:
+    def __init__(self, objects=(), classes=None):
+        self._classes = set((ontology_classes() if classes is None else classes).values())
+        self._buckets = {}   # class -> {id(obj): obj}
+        self._number()
+        self.extend(objects)
+
+    def _number(self):
+        # Pre-order numbering; a class with several dataclass bases sits under the first.
+        children = {cls: [] for cls in self._classes}
+        roots = []
+        for cls in sorted(self._classes, key=lambda cls: (cls.__module__, cls.__qualname__)):
+            bases = [base for base in _dataclass_bases(cls) if base in children]
+            (children[bases[0]] if bases else roots).append(cls)
+        self._order = []
+        self._intervals = {}   # class -> (low, high) positions in _order
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                cls, done = stack.pop()
+                if done:
+                    self._intervals[cls] = (self._intervals[cls][0], len(self._order))
+                    continue
+                self._intervals[cls] = (len(self._order), None)
+                self._order.append(cls)
+                stack.append((cls, True))
+                stack.extend((child, False) for child in reversed(children[cls]))
+
+    def _register(self, cls):
+        # A new class brings its dataclass ancestors along so the intervals stay nested.
+        added = [base for base in cls.__mro__ if is_dataclass(base) and base not in self._classes]
+        self._classes.update(added)
+        self._number()
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def __contains__(self, obj):
+        return id(obj) in self._buckets.get(type(obj), ())
+
+    def add(self, obj):
+        cls = type(obj)
+        bucket = self._buckets.get(cls)
+        if bucket is None:
+            if cls not in self._intervals:
+                self._register(cls)
+            bucket = self._buckets[cls] = {}
+        bucket[id(obj)] = obj
+
+    def extend(self, objects):
+        for obj in objects:
+            self.add(obj)
+
+    def remove(self, obj):
+        del self._buckets[type(obj)][id(obj)]
+
+    def subclasses(self, cls):
+        # cls and every known descendant, in pre-order.
+        if cls not in self._intervals:
+            if not is_dataclass(cls):
+                raise TypeError(f"{cls.__name__} is not an ontology class")
+            self._register(cls)
+        low, high = self._intervals[cls]
+        return self._order[low:high]
+
+    def _buckets_of(self, cls):
+        buckets = self._buckets
+        return [buckets[sub] for sub in self.subclasses(cls) if sub in buckets]
+
+    def extent(self, cls):
+        # Every indexed instance of cls or a subclass, grouped by exact class.
+        result = []
+        for bucket in self._buckets_of(cls):
+            result.extend(bucket.values())
+        return result
+
+    def exact(self, cls):
+        return list(self._buckets.get(cls, {}).values())
+
+    def count(self, cls):
+        return sum(len(bucket) for bucket in self._buckets_of(cls))
@@ -0,0 +1,402 @@
+import copyreg
+import csv
+import datetime
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import pickle
+from dataclasses import fields, is_dataclass
+from typing import get_origin
+
+import ontology
+from schema import field_names
+
+
+#### Streaming bulk loader ####
+# Rows come from CSV or JSONL files and are turned into ontology objects one at a time.
+#
+#   {"type": "StockExchange", "id": "nyse", "name": "New York Stock Exchange", ...}
+#   {"type": "CommonStock", "id": "aapl", "@market": "nyse", "@issued_institution": "gs", ...}
+#   {"type": "HoldBy", "@holder": "gs", "@financial_instrument": "aapl", "holding_amount": 5000}
+#
+# "type" names the dataclass (CSV files may instead pass it for the whole file), "id" is
+# optional and registers the object for later references, and a column "@field" sets
+# `field` to the object with that id. List-valued references (fields annotated List[...])
+# are a JSON array of ids, or "|"-separated ids in CSV, so a single id is a one-item
+# list. A referenced id must appear earlier in the stream, so load Things before the
+# Relations that point at them. Only objects with an id are retained.
+# With a validate.SchemaValidator, bad rows are skipped and recorded in `rejected`
+# instead of stopping the load.
+
+def ontology_classes(module=ontology):
+    return {name: obj for name, obj in vars(module).items()
+            if isinstance(obj, type) and is_dataclass(obj)}
+
+
+def _open(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, newline="", encoding="utf-8")
+
+
+def read_jsonl(path):
+    with _open(path) as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_csv(path, type_name=None):
+    with _open(path) as handle:
+        for row in csv.DictReader(handle):
+            if type_name is not None:
+                row["type"] = type_name
+            yield row
+
+
+def read_rows(path, type_name=None):
+    name = str(path)
+    if name.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+        return read_jsonl(path)
+    if name.endswith((".csv", ".csv.gz")):
+        return read_csv(path, type_name)
+    raise ValueError(f"unsupported file type: {path}")
+
+
+#### Value conversion ####
+def _to_bool(value):
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "t", "yes", "y", "1"):
+            return True
+        if lowered in ("false", "f", "no", "n", "0"):
+            return False
+        raise ValueError(f"not a boolean: {value!r}")
+    return bool(value)
+
+
+def _to_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromisoformat(value)
+
+
+_CONVERTERS = {
+    float: float,
+    int: int,
+    bool: _to_bool,
+    str: str,
+    datetime.date: _to_date,
+    datetime.datetime: _to_datetime,
+}
+
+
+def _converter(annotation):
+    convert = _CONVERTERS.get(annotation)
+    if convert is None:
+        return None
+
+    def apply(value):
+        # Empty CSV cells and JSON nulls load as None.
+        if value is None or value == "":
+            return None
+        return convert(value)
+    return apply
+
+
+class Loader:
+    def __init__(self, classes=None, validator=None):
+        self.classes = ontology_classes() if classes is None else classes
+        self.validator = validator
+        self.objects = {}    # id -> object, for reference resolution
+        self.rejected = []   # (source, row number, problems), only with a validator
+        self._plans = {}     # class -> {field name: converter or None}
+        self._lists = {}     # class -> names of the List[...] reference fields
+
+    def _plan(self, cls):
+        plan = self._plans.get(cls)
+        if plan is None:
+            plan = self._plans[cls] = {f.name: _converter(f.type) for f in fields(cls)}
+        return plan
+
+    def _list_fields(self, cls):
+        names = self._lists.get(cls)
+        if names is None:
+            names = self._lists[cls] = frozenset(f.name for f in fields(cls)
+                                                  if get_origin(f.type) is list)
+        return names
+
+    def _resolve(self, ref, many=False):
+        # `many` comes from the field's annotation, not from the shape of the cell.
+        if many:
+            if isinstance(ref, str):
+                ref = ref.split("|")
+            elif not isinstance(ref, list):
+                raise ValueError(f"expected a list of ids, got {ref!r}")
+            return [self._lookup(item) for item in ref]
+        if isinstance(ref, list):
+            raise ValueError(f"expected one id, got {ref!r}")
+        return self._lookup(ref)
+
+    def _lookup(self, ref):
+        try:
+            return self.objects[ref]
+        except KeyError:
+            raise ValueError(f"unknown reference {ref!r}") from None
+
+    def _arguments(self, row):
+        try:
+            cls = self.classes[row["type"]]
+        except KeyError:
+            raise ValueError(f"unknown type {row.get('type')!r}") from None
+        plan = self._plan(cls)
+        lists = self._list_fields(cls)
+        kwargs = {}
+        for key, value in row.items():
+            if key in ("type", "id"):
+                continue
+            if key.startswith("@"):
+                name = key[1:]
+                kwargs[name] = None if value in (None, "") else self._resolve(value, name in lists)
+            else:
+                name = key
+                convert = plan.get(name)
+                kwargs[name] = convert(value) if convert is not None else value
+            if name not in plan:
+                raise ValueError(f"{cls.__name__} has no field {name!r}")
+        return cls, kwargs
+
+    def build_one(self, row):
+        cls, kwargs = self._arguments(row)
+        obj = cls(**kwargs)
+        ident = row.get("id")
+        if ident not in (None, ""):
+            self.objects[ident] = obj
+        return obj
+
+    def build(self, rows, source="<rows>", start=1):
+        for number, row in enumerate(rows, start):
+            if self.validator is not None:
+                problems = self.validator.check(row)
+                if problems:
+                    self.rejected.append((source, number, problems))
+                    continue
+            try:
+                yield self.build_one(row)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{source}: row {number}: {exc}") from exc
+
+    def load(self, *paths, type_name=None):
+        for path in paths:
+            yield from self.build(read_rows(path, type_name), source=str(path))
+
+    def load_parallel(self, *paths, type_name=None, processes=None, shard_bytes=32 << 20):
+        # Same stream as load(), built by a process pool; see "Parallel loading" below.
+        shards = [(index, shard) for index, path in enumerate(paths)
+                  for shard in _shards(path, type_name, shard_bytes)]
+        with multiprocessing.Pool(processes, _start_worker, (self.classes, self.validator)) as pool:
+            parsed = pool.imap(_parse_shard, [shard for _, shard in shards])
+            current = base = None
+            for (index, shard), (count, *result) in zip(shards, parsed):
+                if index != current:
+                    current, base = index, 0
+                yield from self._link_shard(shard, base, *result)
+                base += count  # rows before the next shard of the file, for row numbers
+
+    def _link_shard(self, shard, base, rejected, external, deferred, payload):
+        source = shard[0]
+        if payload is None or not self._linkable(external, deferred):
+            # A row failed to build or a reference failed to check: rebuild the shard here,
+            # which rejects or raises exactly as load() would.
+            yield from self.build(_shard_rows(*shard), source, start=base + 1)
+            return
+        self.rejected.extend((source, base + number, problems) for number, problems in rejected)
+        idents, objects = _ShardUnpickler(payload, self.objects).load()
+        self.objects.update(zip(idents, objects))
+        self.objects.pop(None, None)  # rows without an id
+        if self.validator is not None:
+            self.validator.ids.update(zip(idents, map(type, objects)))
+            self.validator.ids.pop(None, None)
+        yield from objects
+
+    def _linkable(self, external, deferred):
+        if not all(ref in self.objects for ref in external):
+            return False
+        return self.validator is None or not any(
+            self.validator.check_ref(*check) for check in deferred)
+
+
+def load(*paths, type_name=None, classes=None, validator=None):
+    return Loader(classes, validator).load(*paths, type_name=type_name)
+
+
+def load_parallel(*paths, type_name=None, processes=None, shard_bytes=32 << 20, classes=None,
+                  validator=None):
+    return Loader(classes, validator).load_parallel(*paths, type_name=type_name,
+                                                    processes=processes, shard_bytes=shard_bytes)
+
+
+#### Parallel loading ####
+# Files are cut into byte-range shards on line boundaries (gzipped files are one shard).
+# Workers parse, convert, validate and construct the objects, resolving references to
+# rows earlier in the same shard. A reference to anything else becomes a placeholder, and
+# the shard goes back to the parent as one pickle of constructor calls. The parent takes
+# shards in input order, checks each distinct outside reference once, and unpickles the
+# shard with the placeholders swapped for its own objects; JudicialEntity/FinancialMarket
+# rows are reconstructed through their constructor, so they come out canonical. That
+# leaves the parent one constructor call per row, not per-row linking work. A shard with
+# a bad outside reference, or a row that doesn't build, is instead rebuilt by the parent
+# through build(), so rejections cascade and errors are raised exactly as in load(), with
+# the same row numbers. CSV shards assume one record per line.
+
+def _shards(path, type_name, shard_bytes):
+    name = str(path)
+    header = None
+    if name.endswith(".gz"):
+        yield (name, 0, None, type_name, header)
+        return
+    start = 0
+    if name.endswith(".csv"):
+        with open(name, "rb") as handle:
+            header = handle.readline()
+            start = len(header)
+    size = os.path.getsize(name)
+    while start < size:
+        end = min(start + shard_bytes, size)
+        yield (name, start, end, type_name, header)
+        start = end
+
+
+def _shard_lines(path, start, end):
+    # Lines whose first byte lies in [start, end).
+    with open(path, "rb") as handle:
+        if start:
+            handle.seek(start - 1)
+            handle.readline()  # finish the line that straddles the boundary
+        while handle.tell() < end:
+            line = handle.readline()
+            if not line:
+                break
+            yield line.decode("utf-8")
+
+
+def _shard_rows(path, start, end, type_name, header):
+    if end is None:
+        yield from read_rows(path, type_name)
+    elif path.endswith(".csv"):
+        names = next(csv.reader([header.decode("utf-8")]))
+        for row in csv.DictReader(_shard_lines(path, start, end), fieldnames=names):
+            if type_name is not None:
+                row["type"] = type_name
+            yield row
+    else:
+        for line in _shard_lines(path, start, end):
+            if line.strip():
+                yield json.loads(line)
+
+
+class _External:
+    # Reference to a row outside the shard, resolved by _ShardUnpickler.
+    __slots__ = ("ref",)
+
+    def __init__(self, ref):
+        self.ref = ref
+
+    def __reduce__(self):
+        return _external, (self.ref,)
+
+
+def _external(ref):
+    raise RuntimeError(f"reference {ref!r} unpickled outside load_parallel")
+
+
+class _ShardLoader(Loader):
+    def __init__(self, classes):
+        super().__init__(classes)
+        self.external = {}  # id -> _External
+
+    def _lookup(self, ref):
+        obj = self.objects.get(ref)
+        if obj is None:
+            obj = self.external.get(ref)
+            if obj is None:
+                obj = self.external[ref] = _External(ref)
+        return obj
+
+
+class _ShardUnpickler(pickle.Unpickler):
+    def __init__(self, payload, objects):
+        super().__init__(io.BytesIO(payload))
+        self.objects = objects
+
+    def find_class(self, module, name):
+        if module == __name__ and name == "_external":
+            return self.objects.__getitem__  # once per distinct id, the pickle memoizes it
+        return super().find_class(module, name)
+
+
+def _as_constructor(obj):
+    return type(obj), tuple(getattr(obj, name) for name in field_names(type(obj)))
+
+
+def _reducers(classes):
+    # Constructor calls unpickle faster than slots state, and go through Interned.__new__.
+    table = copyreg.dispatch_table.copy()
+    for cls in classes.values():
+        if issubclass(cls, ontology.Interned) or (
+                all(f.init for f in fields(cls)) and not hasattr(cls, "__post_init__")):
+            table[cls] = _as_constructor
+    return table
+
+
+_worker = None  # (classes, validator, reducers), set once per pool process
+
+
+def _start_worker(classes, validator):
+    global _worker
+    classes = ontology_classes() if classes is None else classes
+    _worker = classes, validator, _reducers(classes)
+
+
+def _parse_shard(shard):
+    classes, validator, reducers = _worker
+    loader = _ShardLoader(classes)
+    rejected, idents, objects = [], [], []
+    deferred, pending = set(), []  # (type, field, id) for the parent's validator
+    if validator is not None:
+        validator.ids = {}  # only this shard's ids; the parent checks the rest
+
+    def defer(field, ref):
+        pending.append((row["type"], field.name, ref))
+
+    count = 0
+    rows = _shard_rows(*shard)
+    for count, row in enumerate(rows, 1):
+        if validator is not None:
+            pending.clear()
+            problems = validator.check(row, defer)
+            if problems:
+                rejected.append((count, problems))
+                continue
+            deferred.update(pending)
+        try:
+            obj = loader.build_one(row)
+        except (TypeError, ValueError):
+            # The parent rebuilds this shard and raises with the file's row number.
+            return count + sum(1 for _ in rows), None, None, None, None
+        ident = row.get("id")
+        idents.append(None if ident == "" else ident)
+        objects.append(obj)
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = reducers
+    pickler.dump((idents, objects))
+    return count, rejected, set(loader.external), deferred, buffer.getvalue()
@@ -0,0 +1,149 @@
+import datetime
+
+import numpy as np
+
+from ontology import Equity, Forward, Future, Option
+
+
+#### Derivative pricing ####
+# Whole books of Option, Future and Forward contracts priced in one vectorized call.
+# The schema has no strike, volatility or option-type fields, so the contract columns
+# are read as follows:
+#
+#   spot        underlying's commodity_value_as_of_execution_date (via UnderlyingAsset)
+#   volatility  underlying's risk, read as annualized volatility
+#   dividends   underlying's dividend_yield for Equity underlyings, else 0
+#   strike      the contract's nominal_value (delivery price for futures/forwards)
+#   expiry      settlement_date for Future, execution_date for Option/Forward
+#   multiplier  lot_size (Option), contract_size (Future), 1 (Forward)
+#
+# Options use Black-Scholes-Merton (European, calls and puts both reported). Futures and
+# forwards use cost of carry, F = S * exp((r - q + storage) * T). A forward is worth
+# (F - K) * exp(-r * T). A future is marked to market daily, so it is worth F - K.
+# Contracts without an underlying, or already expired, price as NaN; on the expiry date
+# an option is worth its intrinsic value.
+
+_OPTION, _FUTURE, _FORWARD = 0, 1, 2
+
+_SQRT_HALF = np.sqrt(0.5)
+
+
+def normal_cdf(x):
+    # Abramowitz & Stegun 26.2.17, absolute error < 7.5e-8, with no scipy dependency.
+    x = np.asarray(x, dtype=np.float64)
+    t = 1.0 / (1.0 + 0.2316419 * np.abs(x))
+    poly = t * (0.319381530 + t * (-0.356563782 + t * (1.781477937
+                + t * (-1.821255978 + t * 1.330274429))))
+    tail = np.exp(-0.5 * x * x) * (1 / np.sqrt(2 * np.pi)) * poly
+    return np.where(x >= 0, 1.0 - tail, tail)
+
+
+def black_scholes(spot, strike, years, rate, volatility, dividend_yield=0.0):
+    # (call, put, call delta, put delta, gamma, vega) per contract unit.
+    spot, strike, years = (np.asarray(a, dtype=np.float64) for a in (spot, strike, years))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = volatility * np.sqrt(years)
+        moneyness = np.log(spot / strike) + (rate - dividend_yield) * years
+        d1 = (moneyness + 0.5 * volatility ** 2 * years) / root
+    # At expiry (or with no volatility) d1 is +-inf, or 0 at the money where both legs
+    # take half and cancel, so the prices are the intrinsic values and gamma is 0.
+    at_expiry = root == 0
+    edge = np.where(moneyness > 0, np.inf, np.where(moneyness < 0, -np.inf, 0.0))
+    d1 = np.where(at_expiry, edge, d1)
+    d2 = d1 - root
+    carry = np.exp(-dividend_yield * years)
+    discount = np.exp(-rate * years)
+    n1, n2 = normal_cdf(d1), normal_cdf(d2)
+    call = spot * carry * n1 - strike * discount * n2
+    put = strike * discount * (1 - n2) - spot * carry * (1 - n1)
+    density = np.exp(-0.5 * d1 * d1) / np.sqrt(2 * np.pi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.where(at_expiry, 0.0, carry * density / (spot * root))
+    vega = spot * carry * density * np.sqrt(years)
+    return call, put, carry * n1, carry * (n1 - 1), gamma, vega
+
+
+def cost_of_carry(spot, years, rate, dividend_yield=0.0, storage=0.0):
+    return np.asarray(spot, dtype=np.float64) * np.exp((rate - dividend_yield + storage) * years)
+
+
+def _years(start, end):
+    return (end - start).astype(np.float64) / 365.0
+
+
+class DerivativeBook:
+    def __init__(self, kind, spot, strike, expiry, volatility, dividend_yield, multiplier,
+                 objects):
+        self.kind = kind
+        self.spot = spot
+        self.strike = strike
+        self.expiry = expiry
+        self.volatility = volatility
+        self.dividend_yield = dividend_yield
+        self.multiplier = multiplier
+        self.objects = objects
+
+    @classmethod
+    def from_contracts(cls, contracts, underlying_assets):
+        # underlying_assets: UnderlyingAsset edges; a contract's first edge is used.
+        underlying = {}
+        for edge in underlying_assets:
+            underlying.setdefault(id(edge.derivative), edge.underlying_instrument)
+        contracts = list(contracts)
+        n = len(contracts)
+        kind = np.empty(n, dtype=np.int8)
+        columns = [np.full(n, np.nan) for _ in range(5)]
+        spot, strike, volatility, dividend_yield, multiplier = columns
+        expiry = np.empty(n, dtype="datetime64[D]")
+        for row, contract in enumerate(contracts):
+            if isinstance(contract, Option):
+                kind[row], when, size = _OPTION, contract.execution_date, contract.lot_size
+            elif isinstance(contract, Future):
+                kind[row], when, size = _FUTURE, contract.settlement_date, contract.contract_size
+            elif isinstance(contract, Forward):
+                kind[row], when, size = _FORWARD, contract.execution_date, 1.0
+            else:
+                raise TypeError(f"cannot price {type(contract).__name__}")
+            expiry[row] = np.datetime64("NaT") if when is None else np.datetime64(
+                when.date() if isinstance(when, datetime.datetime) else when, "D")
+            strike[row] = contract.nominal_value
+            multiplier[row] = size
+            asset = underlying.get(id(contract))
+            if asset is not None:
+                spot[row] = asset.commodity_value_as_of_execution_date
+                volatility[row] = asset.risk
+                dividend_yield[row] = asset.dividend_yield if isinstance(asset, Equity) else 0.0
+        objects = np.empty(n, dtype=object)
+        objects[:] = contracts
+        return cls(kind, spot, strike, expiry, volatility, dividend_yield, multiplier, objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def years(self, valuation):
+        years = _years(np.datetime64(valuation, "D"), self.expiry)
+        return np.where(years >= 0, years, np.nan)
+
+    def options(self, valuation, rate):
+        # Black-Scholes for the option rows (NaN elsewhere): dict of per-unit arrays.
+        years = np.where(self.kind == _OPTION, self.years(valuation), np.nan)
+        names = ("call", "put", "call_delta", "put_delta", "gamma", "vega")
+        return dict(zip(names, black_scholes(self.spot, self.strike, years, rate,
+                                             self.volatility, self.dividend_yield)))
+
+    def forward_prices(self, valuation, rate, storage=0.0):
+        # Cost-of-carry fair delivery prices for every row.
+        return cost_of_carry(self.spot, self.years(valuation), rate, self.dividend_yield,
+                             storage)
+
+    def value(self, valuation, rate, storage=0.0, puts=False):
+        # Mark-to-model value per contract: option premium (calls, or puts where `puts`
+        # is true) or carry value, times the multiplier.
+        years = self.years(valuation)
+        option = self.kind == _OPTION
+        call, put, *_ = black_scholes(self.spot, self.strike, np.where(option, years, np.nan),
+                                      rate, self.volatility, self.dividend_yield)
+        premium = np.where(puts, put, call)
+        carry = self.forward_prices(valuation, rate, storage) - self.strike
+        carry = np.where(self.kind == _FORWARD, carry * np.exp(-rate * years), carry)
+        return np.where(option, premium, carry) * self.multiplier
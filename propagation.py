@@ -0,0 +1,219 @@
+from array import array
+
+import numpy as np
+
+from ontology import (FinancialInstruments, FinancialMarket, GovernmentPolicy, HoldBy,
+                      InfluencesMarketThroughPolicy, IsAffectedBy, IsTradedIn,
+                      MarketParticipation, PolicyImpact, PolicyInstrumentEffect,
+                      PolicyMarketEffect, SetsPolicyForMarket)
+
+
+#### Policy shock propagation ####
+# A shock flows along relation edges, oriented from cause to effect:
+#
+#   policy     -> market       SetsPolicyForMarket, InfluencesMarketThroughPolicy, PolicyMarketEffect
+#   policy     -> instrument   IsAffectedBy, PolicyInstrumentEffect
+#   policy     -> anything     PolicyImpact.affected_entities
+#   market     -> instrument   IsTradedIn, MarketParticipation
+#   instrument -> holder       HoldBy
+#
+# Nodes are numbered on first sight (by identity) and the edges are kept as CSR
+# adjacency arrays. A shock is a breadth-first walk that expands a whole frontier with
+# a few array operations per hop. New edges are buffered and the CSR is rebuilt on the
+# next shock. Removed edges are cancelled against added ones at that rebuild; remove()
+# checks them against the current edges first and raises KeyError for an edge that
+# isn't there, buffering nothing.
+
+EDGES = {
+    SetsPolicyForMarket: (("policy", "market"),),
+    InfluencesMarketThroughPolicy: (("policy", "market"),),
+    PolicyMarketEffect: (("policy", "market"),),
+    IsAffectedBy: (("policy", "instrument"),),
+    PolicyInstrumentEffect: (("policy", "financial_instrument"),),
+    PolicyImpact: (("policy", "affected_entities"),),
+    IsTradedIn: (("market", "instrument"),),
+    MarketParticipation: (("market", "financial_instrument"),),
+    HoldBy: (("financial_instrument", "holder"),),
+}
+
+POLICY, MARKET, INSTRUMENT, ENTITY = range(4)
+KINDS = ("policies", "markets", "instruments", "entities")
+
+
+def _kind(obj):
+    if isinstance(obj, GovernmentPolicy):
+        return POLICY
+    if isinstance(obj, FinancialMarket):
+        return MARKET
+    if isinstance(obj, FinancialInstruments):
+        return INSTRUMENT
+    return ENTITY
+
+
+class PolicyGraph:
+    def __init__(self, relations=()):
+        self._codes = {}            # id(node) -> code
+        self._nodes = []            # code -> node
+        self._kinds = array("b")    # code -> POLICY / MARKET / INSTRUMENT / ENTITY
+        self._sources = array("i")  # added edges, parallel arrays of codes
+        self._targets = array("i")
+        self._removed_sources = array("i")
+        self._removed_targets = array("i")
+        self._removing = {}         # (source, target) -> buffered removals
+        self._built = 0             # len(self._sources) at the last rebuild
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._dirty = False
+        self._fields = {}           # relation class -> edge field pairs, MRO resolved
+        self.extend(relations)
+
+    def __len__(self):
+        # Edges, counting removals that are still buffered.
+        return len(self._sources) - len(self._removed_sources)
+
+    def code(self, node):
+        code = self._codes.get(id(node))
+        if code is None:
+            code = self._codes[id(node)] = len(self._nodes)
+            self._nodes.append(node)
+            self._kinds.append(_kind(node))
+        return code
+
+    def _edge_fields(self, cls):
+        pairs = self._fields.get(cls)
+        if pairs is None:
+            pairs = self._fields[cls] = next(
+                (EDGES[base] for base in cls.__mro__ if base in EDGES), None)
+            if pairs is None:
+                raise TypeError(f"{cls.__name__} is not a propagation edge")
+        return pairs
+
+    def _ends(self, relation):
+        for source, target in self._edge_fields(type(relation)):
+            head = getattr(relation, source)
+            tails = getattr(relation, target)
+            if head is None:
+                continue
+            for tail in tails if isinstance(tails, list) else (tails,):
+                if tail is not None:
+                    yield head, tail
+
+    def _edges(self, relation):
+        for head, tail in self._ends(relation):
+            yield self.code(head), self.code(tail)
+
+    #### Maintenance ####
+    def add(self, relation):
+        for source, target in self._edges(relation):
+            self._sources.append(source)
+            self._targets.append(target)
+        self._dirty = True
+
+    def extend(self, relations):
+        for relation in relations:
+            self.add(relation)
+
+    def remove(self, relation):
+        wanted = {}
+        for head, tail in self._ends(relation):
+            # Unseen nodes aren't numbered: they can't be on an added edge.
+            source, target = self._codes.get(id(head)), self._codes.get(id(tail))
+            if source is None or target is None:
+                raise KeyError(f"{type(relation).__name__} edge was never added")
+            wanted[source, target] = wanted.get((source, target), 0) + 1
+        if len(self._sources) > self._built:
+            self._rebuild()  # so the check below only has to look at the CSR
+        for (source, target), count in wanted.items():
+            if self._edge_count(source, target) - self._removing.get((source, target), 0) < count:
+                raise KeyError(f"{type(relation).__name__} edge was never added")
+        for (source, target), count in wanted.items():
+            self._removing[source, target] = self._removing.get((source, target), 0) + count
+            for _ in range(count):
+                self._removed_sources.append(source)
+                self._removed_targets.append(target)
+        self._dirty = True
+
+    def _edge_count(self, source, target):
+        if source + 1 >= len(self._indptr):
+            return 0
+        tails = self._indices[self._indptr[source]:self._indptr[source + 1]]
+        return int(np.count_nonzero(tails == target))
+
+    def add_code_edges(self, sources, targets):
+        # Bulk path: parallel arrays of node codes from code().
+        self._sources.frombytes(np.asarray(sources, dtype=np.int32).tobytes())
+        self._targets.frombytes(np.asarray(targets, dtype=np.int32).tobytes())
+        self._dirty = True
+
+    def _rebuild(self):
+        sources = np.frombuffer(self._sources, dtype=np.int32)
+        targets = np.frombuffer(self._targets, dtype=np.int32)
+        if len(self._removed_sources):
+            keys = sources.astype(np.int64) << 32 | targets
+            removed = (np.frombuffer(self._removed_sources, dtype=np.int32).astype(np.int64) << 32
+                       | np.frombuffer(self._removed_targets, dtype=np.int32))
+            # Cancel each removal against one matching addition.
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            removed.sort()
+            first = np.searchsorted(keys, removed, side="left")
+            rank = np.arange(len(removed)) - np.searchsorted(removed, removed, side="left")
+            drop = first + rank  # remove() checked that every removal has its addition
+            keep = np.ones(len(keys), dtype=bool)
+            keep[drop] = False
+            keys = keys[keep]
+            sources = (keys >> 32).astype(np.int32)
+            targets = (keys & 0xFFFFFFFF).astype(np.int32)
+            self._sources, self._targets = array("i", sources.tobytes()), array("i", targets.tobytes())
+            self._removed_sources, self._removed_targets = array("i"), array("i")
+            self._removing = {}
+        order = np.argsort(sources, kind="stable")
+        self._indices = targets[order]
+        counts = np.bincount(sources, minlength=len(self._nodes))
+        self._indptr = np.zeros(len(self._nodes) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._indptr[1:])
+        self._built = len(self._sources)
+        self._dirty = False
+
+    #### Shocks ####
+    def reach(self, *origins):
+        # Codes of every node reachable from the origins (origins excluded), in hop order.
+        if self._dirty:
+            self._rebuild()
+        node_count = len(self._nodes)
+        visited = np.zeros(node_count, dtype=bool)
+        frontier = np.array([self._codes[id(origin)] for origin in origins
+                             if id(origin) in self._codes], dtype=np.int64)
+        frontier = frontier[frontier < len(self._indptr) - 1]
+        visited[frontier] = True
+        reached = []
+        indptr, indices = self._indptr, self._indices
+        while len(frontier):
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # Flat positions of every out-edge of the frontier.
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            neighbours = indices[positions]
+            neighbours = np.unique(neighbours[~visited[neighbours]])
+            visited[neighbours] = True
+            reached.append(neighbours)
+            frontier = neighbours
+        return np.concatenate(reached) if reached else np.empty(0, dtype=np.int64)
+
+    def shock(self, *policies):
+        # {"markets": [...], "instruments": [...], "entities": [...], "policies": [...]}
+        # affected by the given policies, nearest first.
+        codes = self.reach(*policies)
+        kinds = np.frombuffer(self._kinds, dtype=np.int8)[codes]
+        nodes = self._nodes
+        return {name: [nodes[code] for code in codes[kinds == kind].tolist()]
+                for kind, name in enumerate(KINDS)}
+
+    def count(self, *policies):
+        # Affected node counts per kind, without building the object lists.
+        codes = self.reach(*policies)
+        counts = np.bincount(np.frombuffer(self._kinds, dtype=np.int8)[codes], minlength=len(KINDS))
+        return dict(zip(KINDS, counts.tolist()))
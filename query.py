@@ -0,0 +1,210 @@
+from dataclasses import fields
+from itertools import product
+
+from schema import is_thing
+
+
+#### Pattern queries ####
+# A query is a list of relation patterns over a store.TripleStore:
+#
+#   inst, h = Var("inst"), Var("h")
+#   query(store, [Pattern(IsTradedIn, inst, nyse),
+#                 Pattern(ProvidesRating, moodys, inst, "Aaa"),
+#                 Pattern(HoldBy, h, inst)], select=[inst, h])
+#
+# Terms bind to the relation's fields in declaration order (or by keyword), and
+# unspecified fields are wildcards. A constant Thing matches by identity, any other
+# constant by equality, and a Thing inside a list field matches if it is in the list.
+# A variable on a list field binds to each element. A pattern also matches
+# subclasses of its relation (PolicyImpact matches MonetaryPolicyImpact).
+#
+# Planning is greedy. The first pattern is the one with the smallest cardinality
+# estimate (the smallest store bucket among its constants). After that, the next
+# pattern is the cheapest one that shares a variable with what is already bound.
+# Patterns are joined with hash joins on the shared variables. If the bound side has
+# fewer distinct values for a shared Thing variable than the pattern's estimate, the
+# pattern's candidates are fetched per value from the store indexes instead of from
+# its whole bucket.
+
+class Var:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"?{self.name}"
+
+    # Variables are their names: Var("inst") in two patterns is one variable.
+    def __eq__(self, other):
+        if not isinstance(other, Var):
+            return NotImplemented
+        return self.name == other.name
+
+    def __hash__(self):
+        return hash((Var, self.name))
+
+
+def _key(value):
+    # Join key: Things by identity, plain values by value.
+    return id(value) if is_thing(value) else value
+
+
+class Pattern:
+    def __init__(self, relation, *terms, **named):
+        names = [f.name for f in fields(relation)]
+        if len(terms) > len(names):
+            raise TypeError(f"{relation.__name__} has {len(names)} fields, got {len(terms)} terms")
+        self.relation = relation
+        self.terms = dict(zip(names, terms))
+        for name, term in named.items():
+            if name not in names:
+                raise TypeError(f"{relation.__name__} has no field {name!r}")
+            if name in self.terms:
+                raise TypeError(f"{relation.__name__}.{name} given twice")
+            self.terms[name] = term
+        self.subject_field = names[0]
+        self.vars = []
+        for term in self.terms.values():
+            if isinstance(term, Var) and term not in self.vars:
+                self.vars.append(term)
+
+    def __repr__(self):
+        terms = ", ".join(f"{name}={term!r}" for name, term in self.terms.items())
+        return f"Pattern({self.relation.__name__}, {terms})"
+
+    def _lookups(self):
+        # (subject, object) constants usable as store index keys.
+        subject = self.terms.get(self.subject_field)
+        subject = subject if is_thing(subject) else None
+        objects = [term for name, term in self.terms.items()
+                   if name != self.subject_field and is_thing(term)]
+        return subject, objects
+
+    def estimate(self, store):
+        subject, objects = self._lookups()
+        counts = [store.count(predicate=self.relation)]
+        if subject is not None:
+            counts.append(store.count(subject=subject))
+        counts.extend(store.count(object=obj) for obj in objects)
+        return min(counts)
+
+    def candidates(self, store):
+        subject, objects = self._lookups()
+        options = [dict(predicate=self.relation)]
+        if subject is not None:
+            options.append(dict(subject=subject))
+        options.extend(dict(object=obj) for obj in objects)
+        best = min(options, key=lambda option: store.count(**option))
+        if "predicate" not in best:
+            best["predicate"] = self.relation
+        return store.match(**best)
+
+    def candidates_for(self, store, var, values):
+        # Candidates where `var` is one of `values` (Things), via the store indexes.
+        at_subject = self.terms.get(self.subject_field) == var
+        seen, result = set(), []
+        for value in values:
+            found = (store.match(subject=value, predicate=self.relation) if at_subject
+                     else store.match(predicate=self.relation, object=value))
+            for relation in found:
+                if id(relation) not in seen:
+                    seen.add(id(relation))
+                    result.append(relation)
+        return result
+
+    def bindings(self, relation):
+        # Every assignment of this pattern's variables matched by one relation.
+        choices = {}
+        for name, term in self.terms.items():
+            value = getattr(relation, name)
+            if isinstance(term, Var):
+                options = value if isinstance(value, list) else [value]
+                if term in choices:
+                    current = {_key(option) for option in choices[term]}
+                    options = [option for option in options if _key(option) in current]
+                choices[term] = options
+                if not options:
+                    return []
+            elif isinstance(value, list) and is_thing(term):
+                if not any(item is term for item in value):
+                    return []
+            elif is_thing(term):
+                if value is not term:
+                    return []
+            elif value != term:
+                return []
+        return list(product(*(choices[var] for var in self.vars)))
+
+
+def _plan(store, patterns):
+    estimates = {id(pattern): pattern.estimate(store) for pattern in patterns}
+    remaining = sorted(patterns, key=lambda pattern: estimates[id(pattern)])
+    order, bound = [], set()
+    while remaining:
+        connected = [pattern for pattern in remaining if bound & set(pattern.vars)]
+        chosen = (connected or remaining)[0]
+        remaining.remove(chosen)
+        order.append(chosen)
+        bound.update(chosen.vars)
+    return order, estimates
+
+
+def explain(store, patterns):
+    # The join order query() would use, with each pattern's cardinality estimate.
+    order, estimates = _plan(store, patterns)
+    return [(pattern, estimates[id(pattern)]) for pattern in order]
+
+
+def query(store, patterns, select=None):
+    # Without select: one {variable name: value} dict per solution. With select: distinct
+    # tuples of the selected variables' values.
+    order, estimates = _plan(store, patterns)
+    columns = []     # bound variables, in binding-tuple order
+    rows = [()]
+    for pattern in order:
+        shared = [var for var in pattern.vars if var in columns]
+        candidates = None
+        for var in shared:
+            at = columns.index(var)
+            values = {}
+            for row in rows:
+                if not is_thing(row[at]):
+                    break
+                values.setdefault(id(row[at]), row[at])
+            else:
+                if len(values) < estimates[id(pattern)]:
+                    candidates = pattern.candidates_for(store, var, values.values())
+                    break
+        if candidates is None:
+            candidates = pattern.candidates(store)
+
+        new = [var for var in pattern.vars if var not in columns]
+        shared_at = [pattern.vars.index(var) for var in shared]
+        new_at = [pattern.vars.index(var) for var in new]
+        table = {}
+        for relation in candidates:
+            for binding in pattern.bindings(relation):
+                key = tuple(_key(binding[i]) for i in shared_at)
+                table.setdefault(key, []).append(tuple(binding[i] for i in new_at))
+        row_at = [columns.index(var) for var in shared]
+        joined = []
+        for row in rows:
+            for extension in table.get(tuple(_key(row[i]) for i in row_at), ()):
+                joined.append(row + extension)
+        rows = joined
+        columns.extend(new)
+        if not rows:
+            return []
+
+    if select is None:
+        return [{var.name: value for var, value in zip(columns, row)} for row in rows]
+    at = [columns.index(var) for var in select]
+    seen, result = set(), []
+    for row in rows:
+        picked = tuple(row[i] for i in at)
+        key = tuple(_key(value) for value in picked)
+        if key not in seen:
+            seen.add(key)
+            result.append(picked)
+    return result
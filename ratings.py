@@ -0,0 +1,178 @@
+import datetime
+from array import array
+from bisect import bisect_right, insort
+
+import numpy as np
+
+from schema import day_ordinal
+
+
+#### Rating history ####
+# ProvidesRating has no date, so each rating is recorded with the date it took effect.
+# Per (agency, instrument) the full history is kept sorted by date, and the newest
+# rating is cached so "current rating" is a dict lookup. A rating of None means the
+# rating was withdrawn. For bulk questions, each agency also keeps its history as
+# columns (instrument code, day ordinal, rating code), sorted on demand like
+# temporal.py. "Every instrument's rating on date d" is then a mask and a shift over
+# those arrays, and a migration matrix is a single bincount.
+
+MOODYS = ("Aaa", "Aa1", "Aa2", "Aa3", "A1", "A2", "A3", "Baa1", "Baa2", "Baa3", "Ba1", "Ba2",
+          "Ba3", "B1", "B2", "B3", "Caa1", "Caa2", "Caa3", "Ca", "C")
+SP = ("AAA", "AA+", "AA", "AA-", "A+", "A", "A-", "BBB+", "BBB", "BBB-", "BB+", "BB", "BB-",
+      "B+", "B", "B-", "CCC+", "CCC", "CCC-", "CC", "C", "D")
+
+_WITHDRAWN = 0  # rating code of None
+
+
+class _AgencyColumns:
+    def __init__(self):
+        self.instruments = array("i")   # instrument code per rating event
+        self.ordinals = array("i")
+        self.ratings = array("i")
+        self._sorted = None             # (instruments, ordinals, ratings) numpy arrays
+
+    def append(self, instrument, ordinal, rating):
+        self.instruments.append(instrument)
+        self.ordinals.append(ordinal)
+        self.ratings.append(rating)
+        self._sorted = None
+
+    def sorted(self):
+        if self._sorted is None:
+            instruments = np.frombuffer(self.instruments, dtype=np.int32).copy()
+            ordinals = np.frombuffer(self.ordinals, dtype=np.int32).copy()
+            ratings = np.frombuffer(self.ratings, dtype=np.int32).copy()
+            # Stable, so of two ratings on the same day the later recorded one wins.
+            order = np.lexsort((ordinals, instruments))
+            self._sorted = instruments[order], ordinals[order], ratings[order]
+        return self._sorted
+
+    def as_of(self, ordinal):
+        # (instrument codes, rating codes) of the rating in force on that day.
+        instruments, ordinals, ratings = self.sorted()
+        effective = ordinals <= ordinal
+        superseded = np.zeros(len(effective), dtype=bool)
+        superseded[:-1] = effective[1:] & (instruments[1:] == instruments[:-1])
+        last = effective & ~superseded
+        return instruments[last], ratings[last]
+
+
+class RatingHistory:
+    def __init__(self):
+        self._objects = {}                  # id -> agency or instrument
+        self._codes = {}                    # id(instrument) -> code
+        self._instruments = []              # code -> instrument
+        self._rating_codes = {None: _WITHDRAWN}
+        self._ratings = [None]              # rating code -> rating string
+        self._history = {}                  # (id(agency), id(instrument)) -> [(ordinal, seq, rating)]
+        self._latest = {}                   # id(agency) -> {id(instrument): (ordinal, seq, rating)}
+        self._columns = {}                  # id(agency) -> _AgencyColumns
+        self._sequence = 0
+
+    def __len__(self):
+        return self._sequence
+
+    def _code(self, instrument):
+        code = self._codes.get(id(instrument))
+        if code is None:
+            code = self._codes[id(instrument)] = len(self._instruments)
+            self._instruments.append(instrument)
+        return code
+
+    def _rating_code(self, rating):
+        code = self._rating_codes.get(rating)
+        if code is None:
+            code = self._rating_codes[rating] = len(self._ratings)
+            self._ratings.append(rating)
+        return code
+
+    #### Recording ####
+    def record(self, agency, instrument, rating, when):
+        self._objects[id(agency)] = agency
+        self._objects[id(instrument)] = instrument
+        ordinal = day_ordinal(when)
+        self._sequence += 1
+        entry = (ordinal, self._sequence, rating)
+        insort(self._history.setdefault((id(agency), id(instrument)), []), entry)
+        latest = self._latest.setdefault(id(agency), {})
+        current = latest.get(id(instrument))
+        if current is None or entry >= current:
+            latest[id(instrument)] = entry
+        columns = self._columns.get(id(agency))
+        if columns is None:
+            columns = self._columns[id(agency)] = _AgencyColumns()
+        columns.append(self._code(instrument), ordinal, self._rating_code(rating))
+
+    def add(self, relation, when):
+        # A ProvidesRating that took effect on `when`.
+        self.record(relation.rating_agency, relation.financial_instrument, relation.rating, when)
+
+    def extend(self, dated_relations):
+        for relation, when in dated_relations:
+            self.add(relation, when)
+
+    def withdraw(self, agency, instrument, when):
+        self.record(agency, instrument, None, when)
+
+    #### Lookups ####
+    def latest(self, agency, instrument):
+        entry = self._latest.get(id(agency), {}).get(id(instrument))
+        return None if entry is None else entry[2]
+
+    def current(self, agency, cls=None):
+        # [(instrument, rating)] for everything the agency currently rates.
+        objects = self._objects
+        return [(objects[key], entry[2]) for key, entry in self._latest.get(id(agency), {}).items()
+                if entry[2] is not None and (cls is None or isinstance(objects[key], cls))]
+
+    def history(self, agency, instrument):
+        return [(datetime.date.fromordinal(ordinal), rating)
+                for ordinal, _, rating in self._history.get((id(agency), id(instrument)), ())]
+
+    def rating_on(self, agency, instrument, when):
+        entries = self._history.get((id(agency), id(instrument)), ())
+        position = bisect_right(entries, (day_ordinal(when), float("inf")))
+        return entries[position - 1][2] if position else None
+
+    #### Bulk queries ####
+    def ratings_on(self, agency, when):
+        # (instruments as an object array, ratings as an object array), withdrawn excluded.
+        columns = self._columns.get(id(agency))
+        if columns is None:
+            return np.empty(0, dtype=object), np.empty(0, dtype=object)
+        codes, ratings = columns.as_of(day_ordinal(when))
+        rated = ratings != _WITHDRAWN
+        instruments = np.empty(int(rated.sum()), dtype=object)
+        instruments[:] = [self._instruments[code] for code in codes[rated].tolist()]
+        names = np.array(self._ratings, dtype=object)[ratings[rated]]
+        return instruments, names
+
+    def migration_matrix(self, agency, start, end, scale=MOODYS, normalize=False):
+        # Counts (or row-normalized frequencies) of instruments moving from their rating on
+        # `start` to their rating on `end`. Rows and columns follow `scale`; the extra last
+        # state is "not rated" (no rating yet, withdrawn, or not on the scale).
+        states = len(scale) + 1
+        columns = self._columns.get(id(agency))
+        if columns is None:
+            return np.zeros((states, states))
+        # rating code -> state index, with every unknown rating mapped to "not rated".
+        lookup = np.full(len(self._ratings), len(scale), dtype=np.int64)
+        for index, rating in enumerate(scale):
+            code = self._rating_codes.get(rating)
+            if code is not None:
+                lookup[code] = index
+        before = np.full(len(self._instruments), len(scale), dtype=np.int64)
+        after = before.copy()
+        for target, when in ((before, start), (after, end)):
+            codes, ratings = columns.as_of(day_ordinal(when))
+            target[codes] = lookup[ratings]
+        involved = np.zeros(len(self._instruments), dtype=bool)
+        involved[np.frombuffer(columns.instruments, dtype=np.int32)] = True
+        cells = before[involved] * states + after[involved]
+        matrix = np.bincount(cells, minlength=states * states).reshape(states, states)
+        matrix[-1, -1] = 0  # instruments unrated at both dates are not a migration
+        if not normalize:
+            return matrix
+        totals = matrix.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(totals > 0, matrix / totals, 0.0)
@@ -0,0 +1,493 @@
+import datetime
+import math
+import re
+from dataclasses import fields, is_dataclass
+from typing import Union, get_args, get_origin
+
+from loader import Loader, ontology_classes
+from schema import field_names, is_relation
+from serialize import RowWriter
+
+#### RDF export and import ####
+# Objects are written as N-Triples or Turtle, one node per object, in the same
+# dependency order as serialize.py (every referenced object before its first use):
+#
+#   ex:o4 a ex:CommonStock ;
+#       ex:FinancialInstruments.name "Apple Inc. Common Stock" ;
+#       ex:FinancialInstruments.market ex:o0 .
+#
+# Classes keep their names, and each field becomes the property
+# "DeclaringClass.field". Relation instances are nodes like any other object. Each one
+# also gets a direct edge from its subject (first field) to every Thing it points at,
+# e.g. ex:o1 ex:holdBy ex:o4. Those edges are what triple-store tools query. The
+# optional schema maps the dataclass hierarchy to rdfs:subClassOf and declares every
+# property with its domain and range.
+#
+# Output is written in chunks of lines and never as one graph string. The importer
+# streams too. It expects each subject's triples to be contiguous and referenced
+# nodes to come first, as written here. Direct relation edges and schema triples are
+# skipped on import. Fields that are absent come back as None ([] for lists).
+
+NAMESPACE = "http://example.org/ontology#"
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+RDF_TYPE = RDF + "type"
+
+_DATATYPES = {
+    bool: XSD + "boolean",
+    int: XSD + "integer",
+    float: XSD + "double",
+    str: XSD + "string",
+    datetime.date: XSD + "date",
+    datetime.datetime: XSD + "dateTime",
+}
+
+_PARSERS = {
+    XSD + "boolean": lambda text: text in ("true", "1"),
+    XSD + "integer": int,
+    XSD + "double": float,
+    XSD + "decimal": float,
+    XSD + "date": datetime.date.fromisoformat,
+    XSD + "dateTime": datetime.datetime.fromisoformat,
+}
+
+
+def _declaring_class(cls, name):
+    for base in reversed(cls.__mro__):
+        if name in base.__dict__.get("__annotations__", {}):
+            return base
+    return cls
+
+
+def _relation_property(cls):
+    return cls.__name__[0].lower() + cls.__name__[1:]
+
+
+class _Terms:
+    # Per-class property IRIs, cached: field name -> IRI.
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._properties = {}
+
+    def properties(self, cls):
+        properties = self._properties.get(cls)
+        if properties is None:
+            properties = self._properties[cls] = {
+                f.name: f"{self.namespace}{_declaring_class(cls, f.name).__name__}.{f.name}"
+                for f in fields(cls)}
+        return properties
+
+
+#### Writing ####
+_ESCAPES = {ord("\\"): "\\\\", ord('"'): '\\"', ord("\n"): "\\n", ord("\r"): "\\r",
+            ord("\t"): "\\t"}
+
+
+def _literal(value):
+    if isinstance(value, str):
+        return '"' + value.translate(_ESCAPES) + '"'
+    if isinstance(value, bool):
+        return f'"{"true" if value else "false"}"^^<{XSD}boolean>'
+    if isinstance(value, int):
+        return f'"{value}"^^<{XSD}integer>'
+    if isinstance(value, float):
+        text = "NaN" if math.isnan(value) else "INF" if value == math.inf else \
+            "-INF" if value == -math.inf else repr(value)
+        return f'"{text}"^^<{XSD}double>'
+    if isinstance(value, datetime.datetime):
+        return f'"{value.isoformat()}"^^<{XSD}dateTime>'
+    if isinstance(value, datetime.date):
+        return f'"{value.isoformat()}"^^<{XSD}date>'
+    return '"' + str(value).translate(_ESCAPES) + '"'
+
+
+class _TripleWriter(RowWriter):
+    # Keeps dates as date objects so they get a typed literal, and the class of each
+    # row type, since relations are gone from the writer once written.
+    def __init__(self):
+        super().__init__()
+        self.classes = {}
+
+    def _write(self, obj):
+        self.classes[type(obj).__name__] = type(obj)
+        return super()._write(obj)
+
+    @staticmethod
+    def _literal(value):
+        return value
+
+
+def _statements(objects, namespace):
+    # Per object: (subject, [(predicate, object term), ...]), terms already serialized.
+    terms = _Terms(namespace)
+    writer = _TripleWriter()
+
+    def node(ident):
+        return f"<{namespace}o{ident}>"
+
+    for obj in objects:
+        for row in writer.rows(obj):
+            cls = writer.classes[row["type"]]
+            properties = terms.properties(cls)
+            subject = node(row["id"])
+            pairs = [(f"<{RDF_TYPE}>", f"<{namespace}{row['type']}>")]
+            links = []
+            for key, value in row.items():
+                if key == "type" or key == "id" or value is None:
+                    continue
+                if key[0] == "@":
+                    predicate = f"<{properties[key[1:]]}>"
+                    for ident in value if isinstance(value, list) else (value,):
+                        pairs.append((predicate, node(ident)))
+                        links.append(node(ident))
+                else:
+                    predicate = f"<{properties[key]}>"
+                    for item in value if isinstance(value, list) else (value,):
+                        pairs.append((predicate, _literal(item)))
+            yield subject, pairs
+            if is_relation(cls) and links:
+                head = row.get("@" + field_names(cls)[0])
+                if isinstance(head, str):
+                    predicate = f"<{namespace}{_relation_property(cls)}>"
+                    yield node(head), [(predicate, link) for link in links
+                                       if link != node(head)]
+
+
+def _range(annotation):
+    if get_origin(annotation) is list:
+        annotation = (get_args(annotation) or (object,))[0]
+    options = get_args(annotation) if get_origin(annotation) is Union else (annotation,)
+    things = [option for option in options if isinstance(option, type) and is_dataclass(option)]
+    values = [_DATATYPES[option] for option in options if option in _DATATYPES]
+    return things, values
+
+
+def _schema_statements(classes, namespace):
+    declared = set()
+    for cls in classes.values():
+        iri = f"<{namespace}{cls.__name__}>"
+        pairs = [(f"<{RDF_TYPE}>", f"<{OWL}Class>")]
+        for base in cls.__bases__:
+            if is_dataclass(base):
+                pairs.append((f"<{RDFS}subClassOf>", f"<{namespace}{base.__name__}>"))
+        yield iri, pairs
+        for f in fields(cls):
+            owner = _declaring_class(cls, f.name)
+            if (owner, f.name) in declared:
+                continue
+            declared.add((owner, f.name))
+            things, values = _range(f.type)
+            kind = "ObjectProperty" if things and not values else "DatatypeProperty"
+            pairs = [(f"<{RDF_TYPE}>", f"<{OWL}{kind}>"),
+                     (f"<{RDFS}domain>", f"<{namespace}{owner.__name__}>")]
+            if len(things) + len(values) == 1:
+                target = f"<{namespace}{things[0].__name__}>" if things else f"<{values[0]}>"
+                pairs.append((f"<{RDFS}range>", target))
+            yield f"<{namespace}{owner.__name__}.{f.name}>", pairs
+        if is_relation(cls) and cls.__bases__ == (object,):
+            pairs = [(f"<{RDF_TYPE}>", f"<{OWL}ObjectProperty>")]
+            things, _ = _range(fields(cls)[0].type)
+            if len(things) == 1:
+                pairs.append((f"<{RDFS}domain>", f"<{namespace}{things[0].__name__}>"))
+            yield f"<{namespace}{_relation_property(cls)}>", pairs
+        elif is_relation(cls):
+            for base in cls.__bases__:
+                if is_relation(base):
+                    yield f"<{namespace}{_relation_property(cls)}>", [
+                        (f"<{RDF_TYPE}>", f"<{OWL}ObjectProperty>"),
+                        (f"<{RDFS}subPropertyOf>", f"<{namespace}{_relation_property(base)}>")]
+
+
+def _chunked_write(path, lines, chunk_lines):
+    count = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                handle.write("".join(chunk))
+                count += len(chunk)
+                chunk.clear()
+        handle.write("".join(chunk))
+        count += len(chunk)
+    return count
+
+
+def iter_ntriples(objects, namespace=NAMESPACE, schema=False, classes=None):
+    if schema:
+        for subject, pairs in _schema_statements(classes or ontology_classes(), namespace):
+            for predicate, term in pairs:
+                yield f"{subject} {predicate} {term} .\n"
+    for subject, pairs in _statements(objects, namespace):
+        for predicate, term in pairs:
+            yield f"{subject} {predicate} {term} .\n"
+
+
+def write_ntriples(path, objects, namespace=NAMESPACE, schema=False, chunk_lines=65536):
+    # Returns the number of triples written.
+    return _chunked_write(path, iter_ntriples(objects, namespace, schema), chunk_lines)
+
+
+def _prefixed(prefixes, term):
+    if term[0] == "<":
+        iri = term[1:-1]
+        for prefix, base in prefixes:
+            local = iri[len(base):]
+            if iri.startswith(base) and _LOCAL_NAME.fullmatch(local):
+                return f"{prefix}:{local}"
+        return term
+    if term.endswith(">") and "^^<" in term:
+        lexical, datatype = term.rsplit("^^", 1)
+        return f"{lexical}^^{_prefixed(prefixes, datatype)}"
+    return term
+
+
+def iter_turtle(objects, namespace=NAMESPACE, schema=False, classes=None):
+    prefixes = [("ex", namespace), ("rdf", RDF), ("rdfs", RDFS), ("owl", OWL), ("xsd", XSD)]
+    for prefix, base in prefixes:
+        yield f"@prefix {prefix}: <{base}> .\n"
+    statements = _statements(objects, namespace)
+    if schema:
+        statements = _chain(_schema_statements(classes or ontology_classes(), namespace),
+                            statements)
+    for subject, pairs in statements:
+        body = []
+        for predicate, term in pairs:
+            predicate = "a" if predicate == f"<{RDF_TYPE}>" else _prefixed(prefixes, predicate)
+            body.append(f"{predicate} {_prefixed(prefixes, term)}")
+        yield f"\n{_prefixed(prefixes, subject)} " + " ;\n    ".join(body) + " .\n"
+
+
+def _chain(*iterables):
+    for iterable in iterables:
+        yield from iterable
+
+
+def write_turtle(path, objects, namespace=NAMESPACE, schema=False, chunk_lines=16384):
+    # Returns the number of statements (subject blocks and prefixes) written.
+    return _chunked_write(path, iter_turtle(objects, namespace, schema), chunk_lines)
+
+
+#### Reading ####
+_LOCAL_NAME = re.compile(r"[A-Za-z_][\w.-]*(?<!\.)")
+
+_TOKEN = re.compile(r"""
+    \s+|\#[^\n]*
+  | (?P<iri><[^>]*>)
+  | (?P<literal>"(?:[^"\\]|\\.)*")(?:\^\^(?P<datatype><[^>]*>|[\w-]*:[\w.-]*(?<!\.))|@(?P<language>[\w-]+))?
+  | (?P<blank>_:[\w.-]*(?<!\.))
+  | (?P<name>[\w-]*:(?:[\w.-]*(?<!\.))?)
+  | (?P<number>[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?)
+  | (?P<boolean>true|false)
+  | (?P<a>a)(?=\s)
+  | (?P<punct>[.;,])
+""", re.VERBOSE)
+
+_PREFIX = re.compile(r"\s*(?:@prefix|PREFIX)\s+([\w-]*):\s*<([^>]*)>\s*\.?\s*$")
+
+_UNESCAPE = re.compile(r"\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)")
+_SIMPLE = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f"}
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+
+    def replace(match):
+        code = match.group(1)
+        if code[0] in "uU" and len(code) > 1:
+            return chr(int(code[1:], 16))
+        return _SIMPLE.get(code, code)
+    return _UNESCAPE.sub(replace, text)
+
+
+def _literal_value(lexical, datatype):
+    text = _unescape(lexical[1:-1])
+    if datatype is None or datatype == XSD + "string":
+        return text
+    parse = _PARSERS.get(datatype)
+    if parse is None:
+        return text
+    if datatype == XSD + "double":
+        text = {"INF": "inf", "-INF": "-inf"}.get(text, text)
+    return parse(text)
+
+
+class _Iri(str):
+    # Marks IRI and blank node terms among parsed objects.
+    __slots__ = ()
+
+
+def _terms(text, prefixes):
+    # Tokens of one N-Triples line or Turtle statement as (kind, value).
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"cannot parse RDF near {text[position:position + 40]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        if kind == "literal" or kind == "datatype" or kind == "language":
+            datatype = match.group("datatype")
+            if datatype is not None:
+                datatype = _expand(datatype, prefixes)
+            yield "term", _literal_value(match.group("literal"), datatype)
+        elif kind == "iri":
+            yield "term", _Iri(_unescape(match.group("iri")[1:-1]))
+        elif kind == "blank":
+            yield "term", _Iri(match.group("blank"))
+        elif kind == "name":
+            yield "term", _Iri(_expand(match.group("name"), prefixes))
+        elif kind == "number":
+            number = match.group("number")
+            yield "term", float(number) if any(c in number for c in ".eE") else int(number)
+        elif kind == "boolean":
+            yield "term", match.group("boolean") == "true"
+        elif kind == "a":
+            yield "term", _Iri(RDF_TYPE)
+        else:
+            yield kind, match.group(kind)
+
+
+def _expand(name, prefixes):
+    if name.startswith("<"):
+        return name[1:-1]
+    prefix, _, local = name.partition(":")
+    try:
+        return prefixes[prefix] + local
+    except KeyError:
+        raise ValueError(f"undeclared prefix {prefix!r}") from None
+
+
+def _statement_end(line):
+    # True if a Turtle line ends a statement: a "." outside strings, IRIs and comments.
+    in_string = in_iri = escaped = False
+    end = False
+    for char in line:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if in_iri:
+            in_iri = char != ">"
+            continue
+        if char == '"':
+            in_string = True
+        elif char == "<":
+            in_iri = True
+        elif char == "#":
+            break
+        elif not char.isspace():
+            end = char == "."
+    return end
+
+
+def iter_triples(path):
+    # (subject, predicate, object) from an N-Triples (.nt) or Turtle (.ttl) file. IRIs
+    # are str subclasses; literals are converted by datatype. Turtle is limited to
+    # prefixes, "a", ";" and "," lists, which is everything write_turtle produces.
+    prefixes = {}
+    with open(path, encoding="utf-8") as handle:
+        statement = []
+        for line in handle:
+            if not statement:
+                declaration = _PREFIX.match(line)
+                if declaration is not None:
+                    prefixes[declaration.group(1)] = declaration.group(2)
+                    continue
+            statement.append(line)
+            if not _statement_end(line):
+                continue
+            text = "".join(statement)
+            statement.clear()
+            subject = predicate = None
+            for kind, value in _terms(text, prefixes):
+                if kind == "term":
+                    if subject is None:
+                        subject = value
+                    elif predicate is None:
+                        predicate = value
+                    else:
+                        yield subject, predicate, value
+                elif value == ";":
+                    predicate = None
+                elif value == ".":
+                    subject = predicate = None
+        if "".join(statement).strip():
+            raise ValueError(f"{path}: unterminated statement at end of file")
+
+
+class _Fields:
+    # Property IRI -> (field name, is list) for one class.
+    def __init__(self, cls, terms):
+        many = {f.name: get_origin(f.type) is list for f in fields(cls)}
+        self.many = many
+        self.by_property = {iri: (name, many[name])
+                            for name, iri in terms.properties(cls).items()}
+
+
+def _rows(triples, classes, namespace):
+    terms = _Terms(namespace)
+    layouts = {}
+    subject = None
+    group = []
+
+    def row_of(subject, group):
+        type_name = None
+        for predicate, value in group:
+            if predicate == RDF_TYPE and isinstance(value, _Iri) and \
+                    value.startswith(namespace) and value[len(namespace):] in classes:
+                type_name = value[len(namespace):]
+        if type_name is None:
+            return None
+        cls = classes[type_name]
+        layout = layouts.get(cls)
+        if layout is None:
+            layout = layouts[cls] = _Fields(cls, terms)
+        values = {name: [] if many else None for name, many in layout.many.items()}
+        refs = set()
+        for predicate, value in group:
+            entry = layout.by_property.get(predicate)
+            if entry is None:
+                continue
+            name, many = entry
+            if isinstance(value, _Iri):
+                refs.add(name)
+                value = str(value)
+            if many:
+                values[name].append(value)
+            else:
+                values[name] = value
+        row = {"type": type_name, "id": str(subject)}
+        for name, value in values.items():
+            row["@" + name if name in refs else name] = value
+        return row
+
+    for triple in triples:
+        if triple[0] != subject:
+            if group:
+                row = row_of(subject, group)
+                if row is not None:
+                    yield row
+            subject, group = triple[0], []
+        group.append(triple[1:])
+    if group:
+        row = row_of(subject, group)
+        if row is not None:
+            yield row
+
+
+def read_rdf(path, namespace=NAMESPACE, classes=None):
+    # Every object in document order, as Loader builds them.
+    loader = Loader(classes)
+    return loader.build(_rows(iter_triples(path), loader.classes, namespace),
+                        source=str(path))
@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+
+#### UnderlyingAsset reachability ####
+# Transitive closure of UnderlyingAsset edges (derivative -> underlying_instrument),
+# maintained in both directions as edges are added, so "all underlyings of this option"
+# and "all derivatives exposed to this stock" are set lookups. Instruments are keyed on
+# identity. An edge that would close a cycle is rejected with ValueError. Callables in
+# `listeners` are called with the derivatives whose underlyings changed.
+
+class UnderlyingIndex:
+    def __init__(self, edges=()):
+        self._objects = {}                # id -> instrument
+        self._direct = defaultdict(dict)  # id(derivative) -> {id(underlying): edge count}
+        self._down = defaultdict(set)     # id(derivative) -> ids of every transitive underlying
+        self._up = defaultdict(set)       # id(instrument) -> ids of every derivative exposed to it
+        self.listeners = []
+        for edge in edges:
+            self.add(edge)
+
+    def _track(self, instrument):
+        self._objects[id(instrument)] = instrument
+        return id(instrument)
+
+    def add(self, edge):
+        derivative = self._track(edge.derivative)
+        underlying = self._track(edge.underlying_instrument)
+        if derivative == underlying or derivative in self._down.get(underlying, ()):
+            raise ValueError(f"UnderlyingAsset cycle: {edge.derivative.name!r} is already "
+                             f"an underlying of {edge.underlying_instrument.name!r}")
+        counts = self._direct[derivative]
+        counts[underlying] = counts.get(underlying, 0) + 1
+        if counts[underlying] > 1:
+            return
+        sources = self._up.get(derivative, set()) | {derivative}
+        targets = self._down.get(underlying, set()) | {underlying}
+        for source in sources:
+            self._down[source] |= targets
+        for target in targets:
+            self._up[target] |= sources
+        self._notify(sources)
+
+    def remove(self, edge):
+        derivative, underlying = id(edge.derivative), id(edge.underlying_instrument)
+        counts = self._direct.get(derivative, {})
+        if underlying not in counts:
+            raise KeyError(edge)
+        counts[underlying] -= 1
+        if counts[underlying]:
+            return
+        del counts[underlying]
+        if not counts:
+            del self._direct[derivative]
+        # Deletions can't be patched in place (another path may still reach a target),
+        # so recompute the closure of every derivative that could reach the edge.
+        sources = self._up.get(derivative, set()) | {derivative}
+        for source in sources:
+            before = self._down.pop(source, set())
+            after = self._walk(source)
+            if after:
+                self._down[source] = after
+            for target in before - after:
+                self._up[target].discard(source)
+                if not self._up[target]:
+                    del self._up[target]
+        self._notify(sources)
+
+    def _notify(self, sources):
+        if self.listeners:
+            derivatives = self._resolve(sources)
+            for listener in self.listeners:
+                listener(derivatives)
+
+    def _walk(self, source):
+        seen, stack = set(), [source]
+        while stack:
+            for target in self._direct.get(stack.pop(), ()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+    def _resolve(self, ids):
+        return [self._objects[key] for key in ids]
+
+    def underlyings(self, derivative):
+        return self._resolve(self._down.get(id(derivative), ()))
+
+    def ultimate_underlyings(self, derivative):
+        # Underlyings that are not themselves written on anything.
+        return self._resolve(key for key in self._down.get(id(derivative), ())
+                             if key not in self._direct)
+
+    def exposed_derivatives(self, instrument):
+        return self._resolve(self._up.get(id(instrument), ()))
+
+    def is_exposed(self, derivative, instrument):
+        return id(instrument) in self._down.get(id(derivative), ())
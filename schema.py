@@ -0,0 +1,36 @@
+import datetime
+from dataclasses import fields, is_dataclass
+
+import ontology
+
+
+#### Schema helpers ####
+# Questions about ontology classes and values that the storage and index modules share.
+# A "thing" here is any dataclass instance, as opposed to a plain field value; the
+# relations are the dataclasses outside the four Thing hierarchies.
+
+THING_ROOTS = (ontology.JudicialEntity, ontology.FinancialMarket,
+               ontology.GovernmentPolicy, ontology.FinancialInstruments)
+
+_field_names = {}
+
+
+def field_names(cls):
+    names = _field_names.get(cls)
+    if names is None:
+        names = _field_names[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def is_thing(value):
+    return hasattr(type(value), "__dataclass_fields__")
+
+
+def is_relation(cls):
+    return is_dataclass(cls) and not issubclass(cls, THING_ROOTS)
+
+
+def day_ordinal(value):
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.toordinal()
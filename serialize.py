@@ -0,0 +1,129 @@
+import datetime
+import json
+
+from loader import Loader, read_rows
+from schema import field_names, is_relation, is_thing
+
+try:
+    import msgpack
+except ImportError:  # MessagePack support is optional
+    msgpack = None
+
+
+#### Reference-aware serialization ####
+# Objects are written as loader rows (see loader.py), one per object, each shared Thing
+# or Relation once: the first time an object is met its references are written first,
+# then its own row with a fresh "id"; later occurrences are just "@field": id. Reading a
+# stream back is a plain Loader pass, so referenced entities come back as one object
+# (and interned ones as the canonical instance). Output is streamed row by row as JSONL
+# or as a sequence of MessagePack maps. Reference cycles can't be written and raise
+# ValueError. Nothing in the schema points at a Relation, so a Relation passed in is
+# forgotten once its rows are out and a long stream of them doesn't pile up in memory.
+
+_PLAIN = (str, int, float, bool, type(None))
+
+
+class RowWriter:
+    def __init__(self):
+        self.ids = {}        # id(object) -> row id
+        self._keep = []      # written objects, so their id() stays unique
+        self._count = 0
+        self._open = set()   # ids of objects whose references are being written
+        self._rows = []
+
+    def _ref(self, obj):
+        ident = self.ids.get(id(obj))
+        if ident is None:
+            if id(obj) in self._open:
+                raise ValueError(f"reference cycle through {type(obj).__name__}")
+            ident = self._write(obj)
+        return ident
+
+    def _write(self, obj):
+        self._open.add(id(obj))
+        row = {"type": type(obj).__name__, "id": None}
+        for name in field_names(type(obj)):
+            value = getattr(obj, name)
+            if type(value) in _PLAIN:
+                row[name] = value
+            elif is_thing(value):
+                row["@" + name] = self._ref(value)
+            elif isinstance(value, list) and value and all(map(is_thing, value)):
+                row["@" + name] = [self._ref(item) for item in value]
+            else:
+                row[name] = self._literal(value)
+        self._open.discard(id(obj))
+        ident = row["id"] = self._ident()
+        self.ids[id(obj)] = ident
+        self._keep.append(obj)
+        self._rows.append(row)
+        return ident
+
+    def _ident(self):
+        self._count += 1
+        return str(self._count - 1)
+
+    @staticmethod
+    def _literal(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return value
+
+    def rows(self, obj):
+        # Rows needed to add obj to the stream: none if it was written already.
+        if id(obj) not in self.ids:
+            self._write(obj)
+            if is_relation(type(obj)):
+                del self.ids[id(obj)]
+                self._keep.pop()
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def iter_rows(objects):
+    writer = RowWriter()
+    for obj in objects:
+        yield from writer.rows(obj)
+
+
+#### JSON lines ####
+def write_jsonl(path, objects):
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    count = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        for row in iter_rows(objects):
+            handle.write(encode(row))
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def read_jsonl(path, classes=None):
+    # Every object in stream order; referenced objects come before the rows using them.
+    return Loader(classes).build(read_rows(path), source=str(path))
+
+
+#### MessagePack ####
+def _require_msgpack():
+    if msgpack is None:
+        raise ImportError("MessagePack serialization needs the msgpack package")
+
+
+def write_msgpack(path, objects):
+    _require_msgpack()
+    packer = msgpack.Packer()
+    count = 0
+    with open(path, "wb") as handle:
+        for row in iter_rows(objects):
+            handle.write(packer.pack(row))
+            count += 1
+    return count
+
+
+def read_msgpack(path, classes=None):
+    _require_msgpack()
+
+    def rows():
+        with open(path, "rb") as handle:
+            yield from msgpack.Unpacker(handle, raw=False)
+    return Loader(classes).build(rows(), source=str(path))
@@ -0,0 +1,191 @@
+import datetime
+import re
+import zoneinfo
+
+import numpy as np
+
+from ontology import CryptocurrencyMarket
+
+
+#### Trading sessions ####
+# Each FinancialMarket's timezone/opening_time/closing_time strings are compiled once into
+# a bitmap of the 10080 minutes of a local week, plus a table of minutes until the next
+# open. Every query is then a timezone conversion and an array lookup:
+#
+#   is_open      minute bitmap
+#   next_open    minutes-until-open table (holidays are skipped day by day)
+#   open_markets one conversion per distinct timezone, then a bitmap column
+#   overlaps     the two bitmaps rotated to UTC for a given week and ANDed
+#
+# Sessions run Monday to Friday, every day for CryptocurrencyMarket, and around the clock
+# when any of the fields says "24/7". A closing time before the opening time is an
+# overnight session. "23:59" closes at the end of the day. Naive datetimes are read
+# as UTC. Common abbreviations ("EST", "GMT", "JST" ...) map to IANA zones. So do
+# fixed offsets like "UTC+05:30".
+
+WEEK = 7 * 24 * 60
+
+ZONES = {
+    "EST": "America/New_York", "EDT": "America/New_York", "ET": "America/New_York",
+    "CST": "America/Chicago", "CDT": "America/Chicago", "CT": "America/Chicago",
+    "MST": "America/Denver", "PST": "America/Los_Angeles", "PT": "America/Los_Angeles",
+    "GMT": "Europe/London", "BST": "Europe/London", "UTC": "UTC",
+    "CET": "Europe/Paris", "CEST": "Europe/Paris", "EET": "Europe/Athens",
+    "MSK": "Europe/Moscow", "IST": "Asia/Kolkata", "SGT": "Asia/Singapore",
+    "HKT": "Asia/Hong_Kong", "CCT": "Asia/Shanghai", "JST": "Asia/Tokyo", "KST": "Asia/Seoul",
+    "AEST": "Australia/Sydney", "AEDT": "Australia/Sydney", "NZST": "Pacific/Auckland",
+}
+
+_ALWAYS = "24/7"
+_OFFSET = re.compile(r"(?:UTC|GMT)?\s*([+-])(\d{1,2})(?::?(\d{2}))?$")
+
+
+def parse_zone(name):
+    name = name.strip()
+    if not name or name == _ALWAYS:
+        return datetime.timezone.utc
+    match = _OFFSET.match(name.upper())
+    if match is not None:
+        sign, hours, minutes = match.groups()
+        offset = datetime.timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return datetime.timezone(-offset if sign == "-" else offset)
+    try:
+        return zoneinfo.ZoneInfo(ZONES.get(name.upper(), name))
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"unknown timezone {name!r}") from None
+
+
+def _minute(text):
+    hours, _, minutes = text.strip().partition(":")
+    value = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"not a time of day: {text!r}")
+    return value
+
+
+class _Session:
+    __slots__ = ("market", "zone", "bits", "open", "until_open", "holidays")
+
+    def __init__(self, market, holidays=()):
+        self.market = market
+        self.zone = parse_zone(market.timezone)
+        self.holidays = frozenset(holidays)
+        bits = np.zeros(WEEK, dtype=bool)
+        if _ALWAYS in (market.timezone, market.opening_time, market.closing_time):
+            bits[:] = True
+        else:
+            start, end = _minute(market.opening_time), _minute(market.closing_time)
+            if end == 23 * 60 + 59:
+                end = 24 * 60
+            days = range(7) if isinstance(market, CryptocurrencyMarket) else range(5)
+            length = (end - start) % (24 * 60) or 24 * 60
+            for day in days:
+                first = day * 24 * 60 + start
+                bits[np.arange(first, first + length) % WEEK] = True
+        self.bits = bits
+        self.open = bits.tobytes()  # one byte per minute, for scalar lookups
+        # Minutes from each minute of the week to the next open minute (cyclic), -1 if never.
+        opens = np.flatnonzero(bits)
+        if len(opens):
+            positions = np.concatenate([opens, opens + WEEK])
+            minutes = np.arange(WEEK)
+            self.until_open = (positions[np.searchsorted(positions, minutes)] - minutes).tolist()
+        else:
+            self.until_open = [-1] * WEEK
+
+    def local(self, when):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)
+        return when.astimezone(self.zone)
+
+    def is_open(self, when):
+        local = self.local(when)
+        if self.holidays and local.date() in self.holidays:
+            return False
+        return self.open[local.weekday() * 1440 + local.hour * 60 + local.minute] == 1
+
+    def next_open(self, when):
+        local = self.local(when)
+        wall = local.replace(tzinfo=None)
+        for _ in range(len(self.holidays) + 2):
+            minute = wall.weekday() * 1440 + wall.hour * 60 + wall.minute
+            delta = self.until_open[minute]
+            if delta < 0:
+                return None
+            if delta:
+                wall = wall.replace(second=0, microsecond=0) + datetime.timedelta(minutes=delta)
+            if wall.date() not in self.holidays:
+                return wall.replace(tzinfo=self.zone).astimezone(datetime.timezone.utc)
+            wall = datetime.datetime.combine(wall.date() + datetime.timedelta(days=1),
+                                             datetime.time())
+        return None
+
+    def utc_week(self, monday):
+        # Open minutes of the UTC week starting at `monday` 00:00 UTC, using the zone's
+        # offset at the start of that week.
+        start = datetime.datetime.combine(monday, datetime.time(), datetime.timezone.utc)
+        offset = int(start.astimezone(self.zone).utcoffset().total_seconds() // 60)
+        bits = np.roll(self.bits, -offset)
+        if self.holidays:
+            for holiday in self.holidays:
+                day = (holiday - monday).days
+                if -1 <= day <= 7:
+                    first = day * 1440 - offset
+                    closed = np.arange(first, first + 1440)
+                    bits[closed[(closed >= 0) & (closed < WEEK)]] = False
+        return bits
+
+
+class TradingCalendar:
+    def __init__(self, markets=(), holidays=None):
+        # holidays: optional {market: iterable of local dates the market is closed}
+        self._holidays = holidays or {}
+        self._sessions = {}     # id(market) -> _Session
+        self._by_zone = {}      # zone -> [session]
+        for market in markets:
+            self.add(market)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, market):
+        session = self._sessions.get(id(market))
+        if session is None:
+            session = self._sessions[id(market)] = _Session(market,
+                                                            self._holidays.get(market, ()))
+            self._by_zone.setdefault(session.zone, []).append(session)
+        return session
+
+    def _session(self, market):
+        session = self._sessions.get(id(market))
+        return self.add(market) if session is None else session
+
+    def is_open(self, market, when):
+        return self._session(market).is_open(when)
+
+    def next_open(self, market, when):
+        # `when` itself (in UTC) if the market is open, else the next opening instant.
+        return self._session(market).next_open(when)
+
+    def open_markets(self, when):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)
+        result = []
+        for zone, sessions in self._by_zone.items():
+            local = when.astimezone(zone)
+            minute = local.weekday() * 1440 + local.hour * 60 + local.minute
+            day = local.date()
+            result.extend(session.market for session in sessions
+                          if session.open[minute] and day not in session.holidays)
+        return result
+
+    def overlaps(self, first, second, week_of):
+        # [(start, end)] UTC intervals in the week (Monday to Monday, UTC) containing
+        # `week_of` during which both markets are open.
+        monday = week_of - datetime.timedelta(days=week_of.weekday())
+        both = self._session(first).utc_week(monday) & self._session(second).utc_week(monday)
+        edges = np.flatnonzero(np.diff(np.concatenate([[False], both, [False]]).astype(np.int8)))
+        start = datetime.datetime.combine(monday, datetime.time(), datetime.timezone.utc)
+        return [(start + datetime.timedelta(minutes=int(begin)),
+                 start + datetime.timedelta(minutes=int(end)))
+                for begin, end in zip(edges[::2], edges[1::2])]
@@ -0,0 +1,357 @@
+import datetime
+import json
+import mmap
+import struct
+
+from loader import ontology_classes
+from schema import field_names, is_thing
+
+
+#### Binary snapshot ####
+# One file holds every object reachable from the given roots (Things and Relations),
+# each stored once and referenced by index. Layout, all little endian:
+#
+#   magic "ONTSNAP\x01" | u64 header length | JSON header | pad to 8
+#   u64 record offsets [count + 1] | u64 string offsets [strings + 1] | u64 roots [roots]
+#   u16 record classes [count] | pad to 8 | string blob | record blob
+#
+# A record is the object's field values in declaration order, each a tag byte followed
+# by its payload. Strings are deduplicated into the string table. Snapshot mmaps the file
+# read-only (workers share the pages) and builds objects only when they are accessed.
+
+MAGIC = b"ONTSNAP\x01"
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _DATE, _DATETIME, _REF, _LIST, _BIGINT = range(11)
+
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+
+def _pad(size):
+    return -size % 8
+
+
+class _Writer:
+    def __init__(self):
+        self.index = {}      # id(object) -> record index
+        self.objects = []
+        self.strings = {}    # str -> string index
+        self._encoders = {
+            type(None): self._none,
+            bool: self._bool,
+            int: self._int,
+            float: self._float,
+            str: self._str,
+            datetime.date: self._date,
+            datetime.datetime: self._datetime,
+        }
+
+    def add(self, obj):
+        # Iterative walk so long reference chains don't hit the recursion limit.
+        stack = [obj]
+        while stack:
+            current = stack.pop()
+            if id(current) in self.index:
+                continue
+            self.index[id(current)] = len(self.objects)
+            self.objects.append(current)
+            for name in field_names(type(current)):
+                value = getattr(current, name)
+                if isinstance(value, (list, tuple)):
+                    stack.extend(item for item in value if is_thing(item))
+                elif is_thing(value):
+                    stack.append(value)
+        return self.index[id(obj)]
+
+    def string(self, value):
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def _none(self, value, out):
+        out.append(_NONE)
+
+    def _bool(self, value, out):
+        out.append(_TRUE if value else _FALSE)
+
+    def _int(self, value, out):
+        if -2**63 <= value < 2**63:
+            out.append(_INT)
+            out += _I64.pack(value)
+        else:
+            out.append(_BIGINT)
+            out += _U32.pack(self.string(str(value)))
+
+    def _float(self, value, out):
+        out.append(_FLOAT)
+        out += _F64.pack(value)
+
+    def _str(self, value, out):
+        out.append(_STR)
+        out += _U32.pack(self.string(value))
+
+    def _date(self, value, out):
+        out.append(_DATE)
+        out += _I32.pack(value.toordinal())
+
+    def _datetime(self, value, out):
+        out.append(_DATETIME)
+        out += _U32.pack(self.string(value.isoformat()))
+
+    def encode(self, value, out):
+        encoder = self._encoders.get(type(value))
+        if encoder is not None:
+            encoder(value, out)
+        elif isinstance(value, (list, tuple)):
+            out.append(_LIST)
+            out += _U32.pack(len(value))
+            for item in value:
+                self.encode(item, out)
+        elif is_thing(value):
+            out.append(_REF)
+            out += _U32.pack(self.index[id(value)])
+        else:
+            # Subclasses of the plain types (e.g. IntEnum) take the slow path.
+            for base in type(value).__mro__[1:]:
+                if base in self._encoders:
+                    self._encoders[base](value, out)
+                    return
+            raise TypeError(f"cannot snapshot value of type {type(value).__name__}")
+
+    def record(self, obj):
+        out = bytearray()
+        for name in field_names(type(obj)):
+            self.encode(getattr(obj, name), out)
+        return bytes(out)
+
+
+def write_snapshot(path, objects):
+    # objects is an iterable of roots, or a mapping name -> root to keep the names.
+    writer = _Writer()
+    names = {}
+    if hasattr(objects, "items"):
+        roots = []
+        for name, obj in objects.items():
+            names[name] = writer.add(obj)
+            roots.append(names[name])
+    else:
+        roots = [writer.add(obj) for obj in objects]
+
+    classes, class_ids = [], {}
+    record_classes, records = [], []
+    for obj in writer.objects:
+        name = type(obj).__name__
+        if name not in class_ids:
+            class_ids[name] = len(classes)
+            classes.append(name)
+        record_classes.append(class_ids[name])
+        records.append(writer.record(obj))
+
+    strings = [value.encode("utf-8") for value in writer.strings]
+    header = json.dumps({
+        "classes": classes,
+        "names": names,
+        "count": len(records),
+        "strings": len(strings),
+        "roots": len(roots),
+    }).encode("utf-8")
+
+    def offsets(chunks):
+        table, position = [0], 0
+        for chunk in chunks:
+            position += len(chunk)
+            table.append(position)
+        return struct.pack(f"<{len(table)}Q", *table)
+
+    with open(path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("<Q", len(header)))
+        handle.write(header)
+        handle.write(b"\0" * _pad(len(MAGIC) + 8 + len(header)))
+        handle.write(offsets(records))
+        handle.write(offsets(strings))
+        handle.write(struct.pack(f"<{len(roots)}Q", *roots))
+        handle.write(struct.pack(f"<{len(record_classes)}H", *record_classes))
+        handle.write(b"\0" * _pad(2 * len(record_classes)))
+        for chunk in strings:
+            handle.write(chunk)
+        for chunk in records:
+            handle.write(chunk)
+
+
+class Snapshot:
+    def __init__(self, path, classes=None):
+        known = ontology_classes() if classes is None else classes
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an ontology snapshot")
+        (header_length,) = struct.unpack_from("<Q", view, len(MAGIC))
+        position = len(MAGIC) + 8
+        header = json.loads(bytes(view[position:position + header_length]))
+        position += header_length + _pad(position + header_length)
+
+        self.classes = [known[name] for name in header["classes"]]
+        self.names = header["names"]
+        count, strings, roots = header["count"], header["strings"], header["roots"]
+
+        def take(size, fmt):
+            nonlocal position
+            array = view[position:position + size * struct.calcsize(fmt)].cast(fmt)
+            position += size * struct.calcsize(fmt)
+            return array
+
+        self._record_offsets = take(count + 1, "Q")
+        self._string_offsets = take(strings + 1, "Q")
+        self._roots = take(roots, "Q")
+        self._record_classes = take(count, "H")
+        position += _pad(2 * count)
+        self._string_base = position
+        self._record_base = position + self._string_offsets[strings]
+        self._view = view
+        self._strings = {}
+        self._objects = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._objects.clear()
+        for array in (self._record_offsets, self._string_offsets, self._roots,
+                      self._record_classes, self._view):
+            array.release()
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return len(self._record_classes)
+
+    def __getitem__(self, index):
+        obj = self._objects.get(index)
+        if obj is None:
+            obj = self._materialize(index)
+        return obj
+
+    def get(self, name):
+        return self[self.names[name]]
+
+    def roots(self):
+        for index in self._roots:
+            yield self[index]
+
+    def indices(self, cls):
+        # Record indices of cls and its subclasses, read from the class column only.
+        wanted = {i for i, candidate in enumerate(self.classes) if issubclass(candidate, cls)}
+        return [i for i, class_id in enumerate(self._record_classes) if class_id in wanted]
+
+    def of_type(self, cls):
+        for index in self.indices(cls):
+            yield self[index]
+
+    def _string(self, index):
+        value = self._strings.get(index)
+        if value is None:
+            start = self._string_base + self._string_offsets[index]
+            end = self._string_base + self._string_offsets[index + 1]
+            value = self._strings[index] = str(self._view[start:end], "utf-8")
+        return value
+
+    def _decode(self, data, position, refs):
+        tag = data[position]
+        position += 1
+        if tag == _NONE:
+            return None, position
+        if tag == _FALSE:
+            return False, position
+        if tag == _TRUE:
+            return True, position
+        if tag == _INT:
+            return _I64.unpack_from(data, position)[0], position + 8
+        if tag == _FLOAT:
+            return _F64.unpack_from(data, position)[0], position + 8
+        if tag == _DATE:
+            return datetime.date.fromordinal(_I32.unpack_from(data, position)[0]), position + 4
+        (number,) = _U32.unpack_from(data, position)
+        position += 4
+        if tag == _STR:
+            return self._string(number), position
+        if tag == _DATETIME:
+            return datetime.datetime.fromisoformat(self._string(number)), position
+        if tag == _BIGINT:
+            return int(self._string(number)), position
+        if tag == _REF:
+            obj = self._objects.get(number)
+            if obj is None:
+                obj = _Ref(number)
+                refs.append(number)
+            return obj, position
+        if tag == _LIST:
+            items = []
+            for _ in range(number):
+                item, position = self._decode(data, position, refs)
+                items.append(item)
+            return items, position
+        raise ValueError(f"corrupt snapshot: unknown tag {tag}")
+
+    def _record(self, index):
+        # (class, field values, indices of the records still to build), with _Ref markers
+        # standing in for those records.
+        cls = self.classes[self._record_classes[index]]
+        start = self._record_base + self._record_offsets[index]
+        end = self._record_base + self._record_offsets[index + 1]
+        data = self._view[start:end]
+        values, refs, position = [], [], 0
+        for _ in field_names(cls):
+            value, position = self._decode(data, position, refs)
+            values.append(value)
+        return cls, values, refs
+
+    def _resolve(self, value):
+        if type(value) is _Ref:
+            return self._objects[value.index]
+        if type(value) is list:
+            return [self._resolve(item) for item in value]
+        return value
+
+    def _materialize(self, index):
+        # Explicit stack so long reference chains don't hit the recursion limit: a record
+        # is built once the records it references are.
+        cls, values, refs = self._record(index)
+        if not refs:
+            obj = self._objects[index] = cls(*values)
+            return obj
+        stack = [(index, cls, values, refs, True)]
+        building = {index}
+        while stack:
+            current, cls, values, refs, marked = stack[-1]
+            while refs and refs[-1] in self._objects:
+                refs.pop()
+            if refs:
+                ref = refs.pop()
+                if ref in building:
+                    raise ValueError(f"corrupt snapshot: reference cycle through record {ref}")
+                building.add(ref)
+                cls, values, refs = self._record(ref)
+                stack.append((ref, cls, values, refs, bool(refs)))
+                continue
+            stack.pop()
+            building.discard(current)
+            if marked:
+                values = [self._resolve(value) for value in values]
+            # Going through the constructor keeps JudicialEntity/FinancialMarket interned.
+            self._objects[current] = cls(*values)
+        return self._objects[index]
+
+
+class _Ref:
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
@@ -0,0 +1,413 @@
+import datetime
+import json
+import sqlite3
+import typing
+from dataclasses import fields
+
+from loader import ontology_classes
+from ontology import Interned
+from schema import field_names, is_relation, is_thing
+from serialize import RowWriter
+
+
+#### SQLite store ####
+# Each ontology dataclass gets its own table, created the first time one is stored:
+#
+#   objects    (oid INTEGER PRIMARY KEY, type TEXT)      every stored object, any class
+#   "<Class>"  (oid, <field> ...)                        one column per dataclass field
+#
+# Objects are flattened with serialize.RowWriter, so shared Things are stored once.
+# The schema's annotations don't always match what fields hold: Debt.market is
+# annotated str but holds a FinancialMarket, and share_payment_status names a class
+# that doesn't exist and holds a string. So columns are declared without affinity,
+# and a cell is read back by its storage class:
+#
+#   value field (str, float, date ...)   the value (dates as ISO text); BLOB: oid of an object
+#   reference field                      INTEGER: oid; TEXT: a plain value as JSON
+#   list-of-references field             JSON array of oids
+#
+# Rows are buffered per table and written with executemany, batch_size rows per
+# transaction. The name, issuer, regulator and market columns are indexed, and the
+# JudicialEntity/FinancialMarket tables get one composite index over their fields, which
+# is how oid() finds an equal entity stored earlier.
+#
+# Reads page through a cursor, page_size rows at a time. The Things a page references
+# are loaded with a few IN queries per page and shared within the page. Only the
+# interned JudicialEntity/FinancialMarket objects stay cached by oid across pages; other
+# Things are built again for each page that needs them, so any scan runs in constant
+# memory, and inserting one that was read back stores a copy. forget() drops the cache.
+# Each insert() call writes every object it meets once, but only JudicialEntity/FinancialMarket
+# objects are recognised across calls, so another Thing, or a relation, passed to two
+# insert() calls is stored twice; insert everything that shares Things in one call.
+
+INDEXED = ("name", "issuer", "issued_institution", "regulator", "market", "financial_market")
+
+_VALUE, _REF, _REFS = range(3)
+
+_VALUE_TYPES = (int, float, bool, str, datetime.date, datetime.datetime)
+
+_CHUNK = 900  # bound variables per IN query, under SQLite's oldest limit
+
+
+def _kind(annotation):
+    if annotation in _VALUE_TYPES:
+        return _VALUE
+    if typing.get_origin(annotation) is list:
+        return _REFS
+    return _REF
+
+
+def _iso_decoder(parse):
+    def decode(value):
+        try:
+            return parse(value)
+        except (TypeError, ValueError):  # not a date after all
+            return value
+    return decode
+
+
+_DECODERS = {
+    bool: lambda value: bool(value) if type(value) is int else value,
+    datetime.date: _iso_decoder(datetime.date.fromisoformat),
+    datetime.datetime: _iso_decoder(datetime.datetime.fromisoformat),
+}
+
+
+def _chunks(items):
+    for start in range(0, len(items), _CHUNK):
+        yield items[start:start + _CHUNK]
+
+
+def _marks(count):
+    return ", ".join("?" * count)
+
+
+def _blob(oid):
+    return str(oid).encode()
+
+
+def _reader(kind, decode, get):
+    # Stored (non-NULL) cell -> field value.
+    if kind == _REFS:
+        return lambda value: [get(oid) for oid in json.loads(value)]
+    if kind == _REF:
+        return lambda value: get(value) if type(value) is int else json.loads(value)
+    if decode is None:
+        return lambda value: get(int(value)) if type(value) is bytes else value
+    return lambda value: get(int(value)) if type(value) is bytes else decode(value)
+
+
+class _Table:
+    def __init__(self, cls, store):
+        self.cls = cls
+        self.name = cls.__name__
+        self.thing = not is_relation(cls)
+        self.columns = field_names(cls)
+        annotations = [f.type for f in fields(cls)]
+        self.kinds = tuple(_kind(annotation) for annotation in annotations)
+        self.readers = tuple(_reader(kind, _DECODERS.get(annotation), store._get)
+                             for kind, annotation in zip(self.kinds, annotations))
+        # Fields that identify an interned entity, for SqlStore.oid().
+        self.identity = tuple(name for name, kind in zip(self.columns, self.kinds)
+                              if kind == _VALUE) if issubclass(cls, Interned) else ()
+        self.insert = f'INSERT INTO "{self.name}" VALUES ({_marks(len(self.columns) + 1)})'
+        self.rows = []  # buffered parameter tuples
+
+    def create(self, db):
+        columns = "".join(f', "{name}"' for name in self.columns)
+        db.execute(f'CREATE TABLE IF NOT EXISTS "{self.name}" (oid INTEGER PRIMARY KEY{columns})')
+        for name in INDEXED:
+            if name in self.columns:
+                db.execute(f'CREATE INDEX IF NOT EXISTS "{self.name}.{name}" '
+                           f'ON "{self.name}" ("{name}")')
+        if self.identity:
+            columns = ", ".join(f'"{name}"' for name in self.identity)
+            db.execute(f'CREATE INDEX IF NOT EXISTS "{self.name}.identity" '
+                       f'ON "{self.name}" ({columns})')
+
+    def params(self, row):
+        # Loader row from RowWriter -> parameter tuple for self.insert.
+        values = [row["id"]]
+        for name, kind in zip(self.columns, self.kinds):
+            ref = row.get("@" + name)
+            value = row.get(name)
+            if kind == _REFS:
+                if ref is None and value not in (None, []):
+                    raise ValueError(f"{self.name}.{name} holds {value!r}, expected a list")
+                ref = [] if value == [] else ref
+                if isinstance(ref, int):
+                    ref = [ref]
+                values.append(None if ref is None else json.dumps(ref))
+            elif isinstance(ref, list):
+                raise ValueError(f"{self.name}.{name} holds a list of objects")
+            elif kind == _REF:
+                values.append(ref if ref is not None else None if value is None
+                              else json.dumps(value))
+            else:
+                values.append(value if ref is None else _blob(ref))
+        return tuple(values)
+
+    def references(self, rows):
+        # oids referenced from a page of rows, read column by column.
+        found = []
+        for position, kind in enumerate(self.kinds, 1):
+            column = [row[position] for row in rows]
+            if kind == _REF:
+                found += [value for value in column if type(value) is int]
+            elif kind == _REFS:
+                for value in column:
+                    if value is not None:
+                        found += json.loads(value)
+            else:
+                found += [int(value) for value in column if type(value) is bytes]
+        return found
+
+    def build(self, row):
+        # Going through the constructor keeps JudicialEntity/FinancialMarket interned.
+        return self.cls(*[None if value is None else read(value)
+                          for read, value in zip(self.readers, row[1:])])
+
+
+class _StoreWriter(RowWriter):
+    # RowWriter whose row ids are the store's oids.
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def _ident(self):
+        oid = self.store._next
+        self.store._next += 1
+        return oid
+
+    def _known(self, obj):
+        # An entity stored earlier, by any insert(), is referenced instead of written again.
+        if id(obj) not in self.ids and isinstance(obj, Interned):
+            oid = self.store.oid(obj)
+            if oid is not None:
+                self.ids[id(obj)] = oid
+
+    def _ref(self, obj):
+        self._known(obj)
+        return super()._ref(obj)
+
+    def rows(self, obj):
+        self._known(obj)
+        return super().rows(obj)
+
+    def _write(self, obj):
+        oid = super()._write(obj)
+        if isinstance(obj, Interned):
+            self.store._remember(oid, obj)
+        return oid
+
+
+class SqlStore:
+    def __init__(self, path, classes=None):
+        self.classes = ontology_classes() if classes is None else classes
+        self._db = sqlite3.connect(str(path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS objects (oid INTEGER PRIMARY KEY, type TEXT NOT NULL)")
+        self._tables = {}   # class name -> _Table, for the tables that exist
+        for (name,) in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'"):
+            if name in self.classes:
+                table = self._tables[name] = _Table(self.classes[name], self)
+                table.create(self._db)  # adds indexes missing from older files
+        (last,) = self._db.execute("SELECT max(oid) FROM objects").fetchone()
+        self._next = (last or 0) + 1
+        self._things = {}   # oid -> JudicialEntity/FinancialMarket
+        self._oids = {}     # id() of those -> oid
+        self._loaded = {}   # oid -> other Things, for the page being read
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._things.clear()
+        self._oids.clear()
+        self._loaded = {}
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT count(*) FROM objects").fetchone()[0]
+
+    def _table(self, name):
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = _Table(self.classes[name], self)
+            table.create(self._db)
+        return table
+
+    #### Writing ####
+    def insert(self, objects, batch_size=100_000):
+        # Stores the objects and everything they reference that isn't stored yet.
+        # Returns the number of rows written.
+        writer = _StoreWriter(self)
+        pending = written = 0
+        for obj in objects:
+            for row in writer.rows(obj):
+                table = self._table(row["type"])
+                table.rows.append(table.params(row))
+                pending += 1
+            if pending >= batch_size:
+                written += self._flush()
+                pending = 0
+        return written + self._flush()
+
+    def _flush(self):
+        written = 0
+        with self._db:
+            for table in self._tables.values():
+                if not table.rows:
+                    continue
+                self._db.executemany(table.insert, table.rows)
+                self._db.executemany("INSERT INTO objects VALUES (?, ?)",
+                                     [(row[0], table.name) for row in table.rows])
+                written += len(table.rows)
+                table.rows = []
+        return written
+
+    def forget(self):
+        # Drops the cached entities; oid() still finds them by their fields.
+        self._things.clear()
+        self._oids.clear()
+
+    #### Reading ####
+    def oid(self, obj):
+        # Oid of a stored JudicialEntity/FinancialMarket, or None; other objects aren't tracked.
+        oid = self._oids.get(id(obj))
+        if oid is None and isinstance(obj, Interned) and type(obj).__name__ in self._tables:
+            table = self._tables[type(obj).__name__]
+            where = " AND ".join(f'"{name}" IS ?' for name in table.identity)
+            found = self._db.execute(f'SELECT oid FROM "{table.name}" WHERE {where} LIMIT 1',
+                                     [RowWriter._literal(getattr(obj, name))
+                                      for name in table.identity]).fetchone()
+            if found is not None:
+                oid = found[0]
+                self._remember(oid, obj)
+        return oid
+
+    def _remember(self, oid, obj):
+        if isinstance(obj, Interned):
+            self._things[oid] = obj
+            self._oids.setdefault(id(obj), oid)
+        else:
+            self._loaded[oid] = obj
+
+    def _cached(self, oid):
+        obj = self._things.get(oid)
+        return self._loaded.get(oid) if obj is None else obj
+
+    def get(self, oid):
+        try:
+            return self._get(oid)
+        finally:
+            self._loaded = {}
+
+    def _get(self, oid):
+        obj = self._cached(oid)
+        if obj is None:
+            obj = self._fetch([oid]).get(oid)
+            if obj is None:
+                raise KeyError(oid)
+        return obj
+
+    def _fetch(self, oids):
+        # Loads the uncached objects among `oids` (and the Things they reference) with a
+        # few IN queries per class. Returns {oid: object} for what was loaded.
+        missing = sorted({oid for oid in oids if self._cached(oid) is None})
+        if not missing:
+            return {}
+        by_type = {}
+        for chunk in _chunks(missing):
+            for oid, name in self._db.execute(
+                    f"SELECT oid, type FROM objects WHERE oid IN ({_marks(len(chunk))})", chunk):
+                by_type.setdefault(name, []).append(oid)
+        loaded = []
+        for name, group in by_type.items():
+            table = self._tables[name]
+            rows = []
+            for chunk in _chunks(group):
+                rows += self._db.execute(
+                    f'SELECT * FROM "{name}" WHERE oid IN ({_marks(len(chunk))})', chunk)
+            loaded.append((table, rows))
+        self._fetch([ref for table, rows in loaded for ref in table.references(rows)])
+        found = {}
+        for table, rows in loaded:
+            for row in rows:
+                obj = found[row[0]] = table.build(row)
+                if table.thing:
+                    self._remember(row[0], obj)
+        return found
+
+    def _page(self, table, sql, params, page_size):
+        cursor = self._db.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            self._loaded = {}
+            self._fetch(table.references(rows))
+            if not table.thing:
+                objects = list(map(table.build, rows))
+            else:
+                objects = []
+                for row in rows:
+                    obj = self._cached(row[0])
+                    if obj is None:
+                        obj = table.build(row)
+                        self._remember(row[0], obj)
+                    objects.append(obj)
+            self._loaded = {}
+            yield from objects
+
+    def _tables_for(self, cls):
+        return [table for table in self._tables.values() if cls is None or issubclass(table.cls, cls)]
+
+    def count(self, cls=None):
+        # Stored instances of cls and its subclasses.
+        if cls is None:
+            return len(self)
+        return sum(self._db.execute(f'SELECT count(*) FROM "{table.name}"').fetchone()[0]
+                   for table in self._tables_for(cls))
+
+    def of_type(self, cls, page_size=1000):
+        for table in self._tables_for(cls):
+            yield from self._page(table, f'SELECT * FROM "{table.name}"', (), page_size)
+
+    #### Indexed lookups ####
+    def _lookup(self, columns, value, cls, page_size):
+        # Objects (of cls) with `value` in one of `columns`. An object is found by its
+        # oid, so it must be stored (see oid()).
+        if is_thing(value):
+            oid = self.oid(value)
+            if oid is None:
+                return
+            keys = {_VALUE: _blob(oid), _REF: oid}
+        else:
+            literal = RowWriter._literal(value)
+            keys = {_VALUE: literal, _REF: json.dumps(literal)}
+        for table in self._tables_for(cls):
+            matches = [(name, keys[kind]) for name, kind in zip(table.columns, table.kinds)
+                       if name in columns and kind in keys]
+            if matches:
+                where = " OR ".join(f'"{name}" = ?' for name, _ in matches)
+                yield from self._page(table, f'SELECT * FROM "{table.name}" WHERE {where}',
+                                      [key for _, key in matches], page_size)
+
+    def by_name(self, name, cls=None, page_size=1000):
+        return self._lookup(("name",), name, cls, page_size)
+
+    def by_issuer(self, issuer, cls=None, page_size=1000):
+        # Instruments by issued_institution (or Debt.issuer text) and Issuance relations.
+        return self._lookup(("issuer", "issued_institution"), issuer, cls, page_size)
+
+    def by_regulator(self, regulator, cls=None, page_size=1000):
+        return self._lookup(("regulator",), regulator, cls, page_size)
+
+    def by_market(self, market, cls=None, page_size=1000):
+        # Instruments by market (or Debt.market text) and relations naming the market.
+        return self._lookup(("market", "financial_market"), market, cls, page_size)
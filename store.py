@@ -0,0 +1,123 @@
+from collections import defaultdict
+from dataclasses import fields, is_dataclass
+
+
+#### Triple store ####
+# Every relation dataclass is stored as one edge: the first field is the subject,
+# the class (and its relation superclasses) is the predicate, and every other field
+# holding a Thing (or a list of Things) is an object. Plain values (dates, amounts,
+# descriptions) stay on the relation instance and are not indexed.
+#
+# Things are plain dataclasses that compare by value and are not hashable, so all
+# indexes are keyed on object identity.
+
+def _things(value):
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if is_dataclass(item)]
+    if is_dataclass(value) and not isinstance(value, type):
+        return [value]
+    return []
+
+
+def _predicates(relation):
+    return [cls for cls in type(relation).__mro__ if is_dataclass(cls)]
+
+
+class TripleStore:
+    def __init__(self, relations=()):
+        self._relations = {}                   # id(relation) -> relation
+        self._by_subject = defaultdict(dict)   # id(subject) -> {id(relation): relation}
+        self._by_predicate = defaultdict(dict) # relation class -> {id(relation): relation}
+        self._by_object = defaultdict(dict)    # id(object) -> {id(relation): relation}
+        self.update(relations)
+
+    def __len__(self):
+        return len(self._relations)
+
+    def __iter__(self):
+        return iter(self._relations.values())
+
+    def __contains__(self, relation):
+        return id(relation) in self._relations
+
+    @staticmethod
+    def subject_of(relation):
+        return getattr(relation, fields(relation)[0].name)
+
+    @staticmethod
+    def objects_of(relation):
+        objects = []
+        for field in fields(relation)[1:]:
+            objects.extend(_things(getattr(relation, field.name)))
+        return objects
+
+    def add(self, relation):
+        key = id(relation)
+        if key in self._relations:
+            return False
+        self._relations[key] = relation
+        self._by_subject[id(self.subject_of(relation))][key] = relation
+        for predicate in _predicates(relation):
+            self._by_predicate[predicate][key] = relation
+        for obj in self.objects_of(relation):
+            self._by_object[id(obj)][key] = relation
+        return True
+
+    def update(self, relations):
+        for relation in relations:
+            self.add(relation)
+
+    def remove(self, relation):
+        key = id(relation)
+        if self._relations.pop(key, None) is None:
+            raise KeyError(relation)
+        self._discard(self._by_subject, id(self.subject_of(relation)), key)
+        for predicate in _predicates(relation):
+            self._discard(self._by_predicate, predicate, key)
+        for obj in self.objects_of(relation):
+            self._discard(self._by_object, id(obj), key)
+
+    @staticmethod
+    def _discard(index, bucket_key, key):
+        bucket = index.get(bucket_key)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del index[bucket_key]
+
+    def _buckets(self, subject, predicate, obj):
+        buckets = []
+        if subject is not None:
+            buckets.append(self._by_subject.get(id(subject), {}))
+        if predicate is not None:
+            buckets.append(self._by_predicate.get(predicate, {}))
+        if obj is not None:
+            buckets.append(self._by_object.get(id(obj), {}))
+        return buckets
+
+    def match(self, subject=None, predicate=None, object=None):
+        # Walk the smallest matching bucket and probe the others, so the cost is
+        # bounded by the most selective of the given terms rather than the store size.
+        buckets = self._buckets(subject, predicate, object)
+        if not buckets:
+            return list(self._relations.values())
+        buckets.sort(key=len)
+        smallest, rest = buckets[0], buckets[1:]
+        return [relation for key, relation in smallest.items()
+                if all(key in bucket for bucket in rest)]
+
+    def count(self, subject=None, predicate=None, object=None):
+        buckets = self._buckets(subject, predicate, object)
+        if not buckets:
+            return len(self._relations)
+        if len(buckets) == 1:
+            return len(buckets[0])
+        return len(self.match(subject, predicate, object))
+
+    def objects(self, subject, predicate=None):
+        return [obj for relation in self.match(subject=subject, predicate=predicate)
+                for obj in self.objects_of(relation)]
+
+    def subjects(self, object, predicate=None):
+        return [self.subject_of(relation)
+                for relation in self.match(predicate=predicate, object=object)]
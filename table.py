@@ -0,0 +1,119 @@
+import numpy as np
+
+from ontology import Equity
+
+
+#### Columnar instrument table ####
+# Numeric FinancialInstruments fields as NumPy columns, one row per instrument.
+# Markets are factorized into integer codes so group-bys are a single bincount: interned
+# FinancialMarkets by identity, plain values (Debt.market is a str) by value. Rows keep a
+# reference to their source object.
+
+NUMERIC_COLUMNS = (
+    "annual_return",
+    "risk",
+    "nominal_value",
+    "commodity_value_as_of_execution_date",
+    "dividend_yield",  # NaN for non-Equity rows
+)
+
+
+def _market_key(market):
+    # Unhashable values (non-interned dataclasses) fall back to identity.
+    return market if type(market).__hash__ is not None else id(market)
+
+
+class InstrumentTable:
+    def __init__(self, columns, market_codes, markets, objects):
+        self.columns = columns
+        self.market_codes = market_codes
+        self.markets = markets
+        self.objects = objects
+
+    @classmethod
+    def from_instruments(cls, instruments):
+        instruments = list(instruments)
+        n = len(instruments)
+        columns = {name: np.empty(n, dtype=np.float64) for name in NUMERIC_COLUMNS}
+        market_codes = np.empty(n, dtype=np.int64)
+        markets, market_index = [], {}
+        for row, instrument in enumerate(instruments):
+            columns["annual_return"][row] = instrument.annual_return
+            columns["risk"][row] = instrument.risk
+            columns["nominal_value"][row] = instrument.nominal_value
+            columns["commodity_value_as_of_execution_date"][row] = \
+                instrument.commodity_value_as_of_execution_date
+            columns["dividend_yield"][row] = \
+                instrument.dividend_yield if isinstance(instrument, Equity) else np.nan
+            key = _market_key(instrument.market)
+            code = market_index.get(key)
+            if code is None:
+                code = market_index[key] = len(markets)
+                markets.append(instrument.market)
+            market_codes[row] = code
+        objects = np.empty(n, dtype=object)
+        objects[:] = instruments
+        return cls(columns, market_codes, markets, objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def to_instruments(self):
+        return list(self.objects)
+
+    #### Filtering ####
+    def select(self, rows):
+        # rows is a boolean mask or an integer index array.
+        columns = {name: values[rows] for name, values in self.columns.items()}
+        return InstrumentTable(columns, self.market_codes[rows], self.markets, self.objects[rows])
+
+    def where(self, **bounds):
+        # where(risk=(None, 0.2), annual_return=(0.05, None)) -> inclusive ranges.
+        mask = np.ones(len(self), dtype=bool)
+        for name, (low, high) in bounds.items():
+            values = self.columns[name]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return self.select(mask)
+
+    def in_market(self, market):
+        key = _market_key(market)
+        for code, candidate in enumerate(self.markets):
+            if _market_key(candidate) == key:
+                return self.select(self.market_codes == code)
+        return self.select(np.zeros(len(self), dtype=bool))
+
+    #### Aggregation ####
+    def _by_market(self, weights):
+        return np.bincount(self.market_codes, weights=weights, minlength=len(self.markets))
+
+    def mean_return_by_market(self):
+        counts = self._by_market(None)
+        totals = self._by_market(self.columns["annual_return"])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = totals / counts
+        return list(zip(self.markets, means))
+
+    def risk_weighted_nominal(self):
+        return float(np.dot(self.columns["risk"], self.columns["nominal_value"]))
+
+    def risk_weighted_nominal_by_market(self):
+        totals = self._by_market(self.columns["risk"] * self.columns["nominal_value"])
+        return list(zip(self.markets, totals))
+
+    def top_k(self, column, k, largest=True):
+        values = self.columns[column]
+        k = min(k, len(values))
+        if k == 0:
+            return self.select(np.empty(0, dtype=np.int64))
+        keys = -values if largest else values
+        # NaNs sort last either way.
+        keys = np.where(np.isnan(keys), np.inf, keys)
+        rows = np.argpartition(keys, k - 1)[:k]
+        rows = rows[np.argsort(keys[rows], kind="stable")]
+        return self.select(rows)
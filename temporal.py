@@ -0,0 +1,133 @@
+import numpy as np
+
+from ontology import (HoldBy, IsAffectedBy, IsIssuedBy, IsRegulatedBy, IsTradedIn,
+                      RegulatoryImpactAssessment, RegulatoryReview)
+from schema import day_ordinal
+
+
+#### Point-in-time index ####
+# Dated relations are kept per class in arrays sorted by date ordinal, so "as of" and
+# date-range questions are two binary searches plus a slice. Inserts are buffered and
+# merged into the sorted arrays on the next query. Relations whose date is None are
+# not indexed.
+
+DATE_FIELDS = {
+    IsIssuedBy: "issue_date",
+    IsRegulatedBy: "regulation_effective_date",
+    IsTradedIn: "trading_start_date",
+    IsAffectedBy: "policy_effect_date",
+    RegulatoryReview: "review_date",
+    HoldBy: "holding_date",
+    RegulatoryImpactAssessment: "assessment_date",
+}
+
+
+class _Timeline:
+    def __init__(self):
+        self.ordinals = np.empty(0, dtype=np.int64)
+        self.edges = np.empty(0, dtype=object)
+        self._pending_ordinals = []
+        self._pending_edges = []
+
+    def __len__(self):
+        return len(self.ordinals) + sum(len(batch) for batch in self._pending_ordinals)
+
+    def extend(self, ordinals, edges):
+        self._pending_ordinals.append(np.asarray(ordinals, dtype=np.int64))
+        pending = np.empty(len(edges), dtype=object)
+        pending[:] = edges
+        self._pending_edges.append(pending)
+
+    def _flush(self):
+        if not self._pending_ordinals:
+            return
+        ordinals = np.concatenate([self.ordinals, *self._pending_ordinals])
+        edges = np.concatenate([self.edges, *self._pending_edges])
+        self._pending_ordinals, self._pending_edges = [], []
+        # Stable sort of (sorted run + new runs); timsort merges the runs in O(n log runs).
+        order = np.argsort(ordinals, kind="stable")
+        self.ordinals, self.edges = ordinals[order], edges[order]
+
+    def bounds(self, start, end):
+        self._flush()
+        low = 0 if start is None else np.searchsorted(self.ordinals, start, side="left")
+        high = len(self.ordinals) if end is None else np.searchsorted(self.ordinals, end, side="right")
+        return int(low), int(high)
+
+    def remove(self, ordinal, edge):
+        low, high = self.bounds(ordinal, ordinal)
+        for position in range(low, high):
+            if self.edges[position] is edge:
+                self.ordinals = np.delete(self.ordinals, position)
+                self.edges = np.delete(self.edges, position)
+                return
+        raise KeyError(edge)
+
+
+class TemporalIndex:
+    def __init__(self, relations=(), date_fields=None):
+        self.date_fields = DATE_FIELDS if date_fields is None else date_fields
+        self._timelines = {cls: _Timeline() for cls in self.date_fields}
+        self.extend(relations)
+
+    def __len__(self):
+        return sum(len(timeline) for timeline in self._timelines.values())
+
+    def _field(self, cls):
+        for base in cls.__mro__:
+            if base in self.date_fields:
+                return base, self.date_fields[base]
+        raise TypeError(f"{cls.__name__} has no indexed date field")
+
+    def extend(self, relations):
+        batches = {}
+        for relation in relations:
+            cls, field = self._field(type(relation))
+            value = getattr(relation, field)
+            if value is not None:
+                ordinals, edges = batches.setdefault(cls, ([], []))
+                ordinals.append(day_ordinal(value))
+                edges.append(relation)
+        for cls, (ordinals, edges) in batches.items():
+            self._timelines[cls].extend(ordinals, edges)
+
+    def add(self, relation):
+        self.extend([relation])
+
+    def add_ordinals(self, cls, ordinals, edges):
+        # Bulk path for loaders that already hold the dates as day ordinals.
+        self._timelines[self._field(cls)[0]].extend(ordinals, edges)
+
+    def remove(self, relation):
+        cls, field = self._field(type(relation))
+        value = getattr(relation, field)
+        if value is not None:  # undated relations were never indexed, as in extend()
+            self._timelines[cls].remove(day_ordinal(value), relation)
+
+    def _select(self, cls):
+        if cls is None:
+            return list(self._timelines.values())
+        return [self._timelines[self._field(cls)[0]]]
+
+    def between(self, start=None, end=None, cls=None):
+        # Relations dated in [start, end], both inclusive and optional, oldest first per class.
+        start = None if start is None else day_ordinal(start)
+        end = None if end is None else day_ordinal(end)
+        slices = []
+        for timeline in self._select(cls):
+            low, high = timeline.bounds(start, end)
+            slices.append(timeline.edges[low:high])
+        return slices[0] if len(slices) == 1 else np.concatenate(slices)
+
+    def as_of(self, when, cls=None):
+        # Every relation that had taken effect by `when`.
+        return self.between(None, when, cls)
+
+    def count_between(self, start=None, end=None, cls=None):
+        start = None if start is None else day_ordinal(start)
+        end = None if end is None else day_ordinal(end)
+        total = 0
+        for timeline in self._select(cls):
+            low, high = timeline.bounds(start, end)
+            total += high - low
+        return total
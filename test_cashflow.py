@@ -0,0 +1,79 @@
+import calendar
+import datetime
+import math
+import random
+
+import numpy as np
+
+from cashflow import DebtBook
+from testdata import make_loan
+
+
+def _coupon_date(maturity, months_back):
+    month = maturity.year * 12 + maturity.month - 1 - months_back
+    year, month = divmod(month, 12)
+    day = min(maturity.day, calendar.monthrange(year, month + 1)[1])
+    return datetime.date(year, month + 1, day)
+
+
+def _reference(loan, valuation, frequency):
+    # One loan at a time, date by date: (present value, Macaulay duration, accrued).
+    face, rate, start = loan.principal_amount, loan.interest_rate, loan.disbursement_date
+    cutoff, step = max(valuation, start), 12 // frequency
+    paid, k = [], 0
+    while True:
+        date = _coupon_date(loan.maturity_date, k * step)
+        if date <= cutoff:
+            previous = max(date, start)
+            break
+        paid.append(date)
+        k += 1
+    value = weighted = 0.0
+    for date in paid:
+        flow = face * rate / frequency + (face if date == loan.maturity_date else 0.0)
+        years = (date - valuation).days / 365.0
+        discounted = flow * (1 + rate / frequency) ** (-frequency * years)
+        value += discounted
+        weighted += discounted * years
+    upcoming = paid[-1] if paid else previous
+    period = (upcoming - previous).days
+    accrued = face * rate / frequency * (valuation - previous).days / period if period else 0.0
+    return value, weighted / value if value else math.nan, accrued
+
+
+def test_matches_scalar_reference():
+    rng = random.Random(0)
+    loans = []
+    for _ in range(200):
+        loan = make_loan("NYSE", 0.02)
+        loan.principal_amount = rng.uniform(1e3, 1e6)
+        loan.interest_rate = rng.uniform(0.0, 0.12)
+        loan.disbursement_date = datetime.date(2015, 1, 1) + datetime.timedelta(rng.randrange(4000))
+        loan.maturity_date = loan.disbursement_date + datetime.timedelta(rng.randrange(30, 11000))
+        loans.append(loan)
+    undated = make_loan("NYSE", 0.02)
+    undated.maturity_date = None
+    valuation = datetime.date(2024, 5, 31)
+    for frequency in (1, 2, 4, 12):
+        book = DebtBook.from_instruments(loans + [undated], frequency=frequency)
+        value = book.present_value(valuation)
+        macaulay, modified = book.duration(valuation)
+        accrued = book.accrued_interest(valuation)
+        for row, loan in enumerate(loans):
+            expected = _reference(loan, valuation, frequency)
+            assert math.isclose(value[row], expected[0], rel_tol=1e-9, abs_tol=1e-6)
+            if expected[0]:
+                assert math.isclose(macaulay[row], expected[1], rel_tol=1e-9)
+                assert math.isclose(modified[row] * (1 + loan.interest_rate / frequency),
+                                    expected[1], rel_tol=1e-9)
+            assert math.isclose(accrued[row], expected[2], rel_tol=1e-9, abs_tol=1e-6)
+        assert np.isnan(value[-1]) and np.isnan(accrued[-1])
+
+
+def test_yield_reprices_to_the_given_price():
+    loans = [make_loan("NYSE", 0.02) for _ in range(3)]
+    book = DebtBook.from_instruments(loans)
+    valuation = datetime.date(2024, 3, 15)
+    target = np.array([0.01, 0.05, 0.09])
+    prices = book.present_value(valuation, rates=target)
+    assert np.allclose(book.yield_to_maturity(valuation, prices), target, rtol=0, atol=1e-10)
@@ -0,0 +1,46 @@
+import datetime
+
+import ontology
+from changelog import ADD, REMOVE, UPDATE, ChangeLog, coalesce
+from temporal import TemporalIndex
+from testdata import make_loan
+
+
+def _holding(amount, when=datetime.date(2024, 1, 1)):
+    return ontology.HoldBy(ontology.Banks("USA", "OCC", "Federal"), make_loan("NYSE", 0.02),
+                           amount, when)
+
+
+def test_changes_recorded_during_delivery_are_delivered_once():
+    log = ChangeLog()
+    first, second = [], []
+    holdings = [_holding(1.0), _holding(2.0)]
+
+    def mirror(changes):
+        first.extend(changes)
+        for change in changes:
+            if change.op == ADD:
+                log.changed(change.obj, "holding_amount")
+
+    log.subscribe(mirror)
+    log.subscribe(second.extend)
+    with log.batch():
+        for holding in holdings:
+            log.add(holding)
+    assert [change.op for change in first] == [ADD, ADD, UPDATE, UPDATE]
+    assert [change.sequence for change in second] == [0, 1, 2, 3]
+
+
+def test_update_then_remove_reaches_the_target_with_the_old_values():
+    log, index = ChangeLog(), TemporalIndex()
+    log.connect(index, update=None)
+    holding = _holding(1.0)
+    log.add(holding)
+    with log.batch():
+        log.set(holding, "holding_date", datetime.date(2025, 6, 30))
+        log.set(holding, "holding_date", datetime.date(2026, 1, 1))
+        log.remove(holding)
+    assert len(index) == 0
+    assert holding.holding_date == datetime.date(2026, 1, 1)
+    (op, obj, old), = coalesce(log.since(1))
+    assert (op, obj, old) == (REMOVE, holding, {"holding_date": datetime.date(2024, 1, 1)})
@@ -0,0 +1,83 @@
+import random
+from collections import defaultdict
+
+import ontology
+from compliance import ComplianceView
+from testdata import make_loan
+
+
+def _join(relations):
+    # The view recomputed from scratch: {(regulator, regulation, entity) ids: compliant?}.
+    supervisors = defaultdict(set)
+    flags = defaultdict(list)
+    for relation in relations:
+        if isinstance(relation, ontology.SupervisesInstitution):
+            supervisors[id(relation.financial_institution)].add(id(relation.regulator))
+        elif isinstance(relation, ontology.RegulatesFinancialInstrument):
+            supervisors[id(relation.financial_instrument)].add(id(relation.regulator))
+        elif isinstance(relation, ontology.RegulatoryOversight):
+            supervisors[id(relation.entity)].add(id(relation.regulator))
+        else:
+            flags[id(relation.entity), id(relation.regulation)].append(relation.is_compliant)
+    return {(regulator, regulation, entity): all(found)
+            for (entity, regulation), found in flags.items()
+            for regulator in supervisors[entity]}
+
+
+def _cells(view, regulators, regulations):
+    cells = {}
+    for regulator in regulators:
+        for regulation in regulations:
+            for entity, ok in view.status(regulator, regulation):
+                cells[id(regulator), id(regulation), id(entity)] = ok
+            failing = [entity for entity, ok in view.status(regulator, regulation) if not ok]
+            assert view.count_non_compliant(regulator, regulation) == len(failing)
+            assert [id(entity) for entity in view.non_compliant(regulator, regulation)] == \
+                [id(entity) for entity in failing]
+    return cells
+
+
+def test_random_updates_match_a_fresh_join():
+    rng = random.Random(0)
+    regulators = [ontology.Regulators("USA", f"Regulator {i}", "Federal") for i in range(4)]
+    regulations = [ontology.FinancialRegulation() for _ in range(5)]
+    institutions = [ontology.Banks("USA", f"Bank {i}", "Federal") for i in range(6)]
+    instruments = [make_loan("NYSE", 0.01 * i) for i in range(6)]
+
+    def supervision():
+        kind = rng.randrange(3)
+        regulator = rng.choice(regulators)
+        if kind == 0:
+            return ontology.SupervisesInstitution(regulator, rng.choice(institutions))
+        if kind == 1:
+            return ontology.RegulatesFinancialInstrument(regulator, rng.choice(instruments))
+        return ontology.RegulatoryOversight(regulator, rng.choice(institutions + instruments))
+
+    def fact():
+        entity = rng.choice(institutions + instruments)
+        regulation, flag = rng.choice(regulations), rng.random() < 0.7
+        kind = rng.randrange(3)
+        if kind == 0:
+            return ontology.Compliance(entity, regulation, flag, "")
+        if kind == 1:
+            return ontology.ComplianceWithRegulation(entity, regulation, flag)
+        return ontology.RegulationCompliance(entity, regulation, flag, "")
+
+    view, live = ComplianceView(), []
+    for _ in range(1500):
+        step = rng.random()
+        if step < 0.5 or not live:
+            relation = supervision() if rng.random() < 0.4 else fact()
+            assert view.add(relation)
+            live.append(relation)
+        elif step < 0.75:
+            view.remove(live.pop(rng.randrange(len(live))))
+        else:
+            facts = [relation for relation in live if hasattr(relation, "is_compliant")]
+            if facts:
+                relation = rng.choice(facts)
+                relation.is_compliant = not relation.is_compliant
+                view.update(relation)
+        expected = _join(live)
+        assert _cells(view, regulators, regulations) == expected
+        assert len(view) == len(expected)
@@ -0,0 +1,79 @@
+import datetime
+
+import ontology
+from exposure import ExposureEngine
+from reachability import UnderlyingIndex
+from testdata import make_loan
+
+
+def _option(name, nominal_value):
+    return ontology.Option(
+        name=name, annual_return=0.0, risk=0.2, issued_institution=None, market="CBOE",
+        commodity_value_as_of_execution_date=0.0, nominal_value=nominal_value,
+        principal_executive_office_address="N/A", redemption_terms="N/A",
+        effective_date=datetime.date(2024, 1, 1), execution_date=datetime.date(2025, 1, 1),
+        lot_size=100.0)
+
+
+def _holding(holder, instrument, amount):
+    return ontology.HoldBy(holder, instrument, amount, datetime.date(2024, 1, 1))
+
+
+def _close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert abs(actual[key] - value) < 1e-9, key
+
+
+def _totals(pairs):
+    return {id(obj): total for obj, total in pairs if total}
+
+
+def test_edges_added_later_reach_by_underlying():
+    loan, option = make_loan("NYSE", 0.02), _option("Call", 10.0)
+    edge = ontology.UnderlyingAsset(option, loan, "call on loan")
+    index = UnderlyingIndex()
+    engine = ExposureEngine([_holding("fund", option, 3.0)], underlyings=index)
+    _close(_totals(engine.by_underlying()), {id(option): 30.0})
+    index.add(edge)
+    _close(_totals(engine.by_underlying()), {id(loan): 30.0})
+    engine.add(_holding("fund", option, 1.0))
+    _close(_totals(engine.by_underlying()), {id(loan): 40.0})
+    index.remove(edge)
+    _close(_totals(engine.by_underlying()), {id(option): 40.0})
+
+
+def test_nested_edge_moves_to_new_ultimate_underlying():
+    loan, inner, outer = make_loan("NYSE", 0.02), _option("Inner", 5.0), _option("Outer", 10.0)
+    index = UnderlyingIndex([ontology.UnderlyingAsset(outer, inner, "")])
+    engine = ExposureEngine([_holding("fund", outer, 1.0)], underlyings=index)
+    _close(_totals(engine.by_underlying()), {id(inner): 10.0})
+    index.add(ontology.UnderlyingAsset(inner, loan, ""))
+    _close(_totals(engine.by_underlying()), {id(loan): 10.0})
+
+
+def test_revalue_matches_fresh_engine():
+    loan, option = make_loan("NYSE", 0.02), _option("Call", 10.0)
+    holdings = [_holding("a", loan, 2.0), _holding("b", loan, 5.0), _holding("a", option, 1.0)]
+    index = UnderlyingIndex([ontology.UnderlyingAsset(option, loan, "")])
+    tradings = [ontology.IsTradedIn(loan, "NYSE", datetime.date(2020, 1, 1), 0.0)]
+    engine = ExposureEngine(holdings, tradings=tradings, underlyings=index)
+    loan.nominal_value = 250.0
+    engine.revalue(loan)
+    fresh = ExposureEngine(holdings, tradings=tradings,
+                           underlyings=UnderlyingIndex([ontology.UnderlyingAsset(option, loan, "")]))
+    for name in ("by_holder", "by_instrument", "by_market", "by_underlying"):
+        _close(_totals(getattr(engine, name)()), _totals(getattr(fresh, name)()))
+
+
+def test_single_adds_match_a_batch():
+    loans = [make_loan("NYSE", 0.01 * i) for i in range(5)]
+    holdings = [_holding(holder, loan, 1.0 + i) for i, loan in enumerate(loans)
+                for holder in ("a", "b")]
+    tradings = [ontology.IsTradedIn(loan, "NYSE", datetime.date(2020, 1, 1), 0.0) for loan in loans]
+    engine = ExposureEngine(holdings[:3], tradings=tradings)
+    for holding in holdings[3:] + holdings[:1]:
+        engine.add(holding)
+    batch = ExposureEngine(holdings, tradings=tradings)
+    for name in ("by_holder", "by_instrument", "by_market", "by_underlying"):
+        _close(_totals(getattr(engine, name)()), _totals(getattr(batch, name)()))
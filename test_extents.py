@@ -0,0 +1,35 @@
+from dataclasses import dataclass, fields
+
+import ontology
+from extents import ExtentIndex
+from loader import ontology_classes
+from testdata import make_loan
+
+
+@dataclass(slots=True)
+class Mortgage(ontology.Loan):
+    collateral: str = "house"
+
+
+def test_extents_match_isinstance():
+    objects = list(ontology.load_sample().values())
+    index = ExtentIndex(objects)
+    assert len(index) == len({id(obj) for obj in objects})
+    for cls in ontology_classes().values():
+        expected = {id(obj) for obj in objects if isinstance(obj, cls)}
+        assert {id(obj) for obj in index.extent(cls)} == expected, cls.__name__
+        assert index.count(cls) == len(expected)
+        assert index.subclasses(cls)[0] is cls
+
+
+def test_new_subclass_joins_its_ancestors_extents():
+    loan = make_loan("NYSE", 0.02)
+    mortgage = Mortgage(**{f.name: getattr(loan, f.name) for f in fields(loan)})
+    index = ExtentIndex([loan, mortgage])
+    assert Mortgage in index.subclasses(ontology.Debt)
+    assert [id(obj) for obj in index.extent(ontology.Loan)] == [id(loan), id(mortgage)]
+    assert index.count(ontology.FinancialInstruments) == 2
+    assert index.exact(Mortgage) == [mortgage]
+    index.remove(loan)
+    assert loan not in index and mortgage in index
+    assert index.extent(ontology.Debt) == [mortgage]
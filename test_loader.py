@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import ontology
+from loader import Loader, load
+from validate import SchemaValidator
+
+CSV_ENTITIES = """type,id,Jurisdiction,RegulatoryAuthority,LegalSystem
+SecuritiesFirms,gs,USA,SEC,Federal
+Banks,jpm,USA,OCC,Federal
+Government,us,USA,Congress,Federal
+"""
+
+NYSE = ('{"type": "StockExchange", "id": "nyse", "name": "NYSE", "country": "USA", '
+        '"currency": "USD", "timezone": "EST", "opening_time": "09:30", "closing_time": "16:00"}\n')
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+@pytest.mark.parametrize("cell, expected", [("gs", ["gs"]), ("gs|jpm", ["gs", "jpm"])])
+def test_csv_list_field_follows_annotation(tmp_path, cell, expected):
+    entities = _write(tmp_path, "entities.csv", CSV_ENTITIES)
+    scopes = _write(tmp_path, "scopes.csv",
+                    f"type,@jurisdiction,@applicable_entities\nJurisdictionalScope,us,{cell}\n")
+    validator = SchemaValidator()
+    loader = Loader(validator=validator)
+    objects = list(loader.load(entities, scopes))
+    assert loader.rejected == []
+    scope = objects[-1]
+    assert isinstance(scope, ontology.JurisdictionalScope)
+    assert scope.applicable_entities == [loader.objects[ident] for ident in expected]
+
+
+def test_scalar_field_rejects_a_list(tmp_path):
+    entities = _write(tmp_path, "entities.jsonl",
+                      '{"type": "Regulators", "id": "sec", "Jurisdiction": "USA", '
+                      '"RegulatoryAuthority": "SEC", "LegalSystem": "Federal"}\n'
+                      '{"type": "FinancialRegulation", "id": "dfa"}\n'
+                      '{"type": "EnforcesRegulation", "@regulator": ["sec"], "@regulation": "dfa"}\n')
+    with pytest.raises(ValueError, match="expected one id"):
+        list(load(entities))
+
+
+def _instrument(ident, market):
+    return ('{"type": "FinancialInstruments", "id": "%s", "name": "%s", "annual_return": 0.1, '
+            '"risk": 0.2, "@issued_institution": null, "@market": "%s", "commodity_value_as_of_execution_date": 1.0, '
+            '"nominal_value": 100.0, "principal_executive_office_address": "N/A", '
+            '"redemption_terms": "N/A"}\n' % (ident, ident, market))
+
+
+@pytest.mark.parametrize("shard_bytes", [1024, 1 << 20])
+def test_parallel_load_matches_sequential(tmp_path, shard_bytes):
+    rows = [NYSE]
+    rows += [_instrument(f"i{i}", "nyse") for i in range(40)]
+    rows.append('{"type": "FinancialInstruments", "id": "bad", "name": "Bad", "risk": "high"}\n')
+    rows.append(_instrument("orphan", "lse"))
+    rows.append('{"type": "HoldBy", "@holder": "nyse", "@financial_instrument": "orphan", '
+                '"holding_amount": 1, "holding_date": "2024-01-01"}\n')
+    path = _write(tmp_path, "feed.jsonl", "".join(rows))
+    sequential = Loader(validator=SchemaValidator())
+    expected = list(sequential.load(path))
+    parallel = Loader(validator=SchemaValidator())
+    objects = list(parallel.load_parallel(path, processes=2, shard_bytes=shard_bytes))
+    assert len(objects) == len(expected) == 41
+    assert [obj.name for obj in objects] == [obj.name for obj in expected]
+    assert objects[0] is ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    assert all(obj.market is objects[0] for obj in objects[1:])
+    # Bad value, unknown market, and the HoldBy on the rejected "orphan", by file row.
+    assert len(parallel.rejected) == 3
+    assert parallel.rejected == sequential.rejected
+
+
+def test_parallel_load_raises_with_the_file_row(tmp_path):
+    rows = [NYSE] + [_instrument(f"i{i}", "nyse") for i in range(20)]
+    rows[15] = '{"type": "FinancialInstruments", "id": "bad", "@market": ["nyse"]}\n'
+    path = _write(tmp_path, "feed.jsonl", "".join(rows))
+    with pytest.raises(ValueError, match=r"feed.jsonl: row 16: expected one id"):
+        list(Loader().load_parallel(path, processes=2, shard_bytes=1024))
+
+
+def test_field_given_twice_does_not_hide_a_missing_one(tmp_path):
+    row = ('{"type": "Regulators", "id": "s", "Jurisdiction": "USA", "@Jurisdiction": "x", '
+           '"LegalSystem": "F"}')
+    problems = SchemaValidator().check(json.loads(row))
+    assert "missing RegulatoryAuthority" in problems
+    assert "field given both as a value and as a reference" in problems
+    loader = Loader(validator=SchemaValidator())
+    assert list(loader.load(_write(tmp_path, "entities.jsonl", row + "\n"))) == []
+    assert [problems for _, _, problems in loader.rejected] == [problems]
+
+
+@pytest.mark.parametrize("value, ok", [("5", True), ("-5", True), ("+5", True), ("+-5", False),
+                                       ("--5", False)])
+def test_int_field_takes_one_sign(value, ok):
+    problems = SchemaValidator().check({"type": "CommonStock", "floating_shares": value})
+    assert (f"floating_shares: {value!r} is not a valid int" not in problems) == ok
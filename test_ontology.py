@@ -0,0 +1,8 @@
+import ontology
+
+
+def test_sample_instances_are_built_once():
+    nyse = ontology.nyse
+    assert ontology.nyse is nyse
+    assert "nyse" in vars(ontology)
+    assert ontology.load_sample()["nyse"] is nyse
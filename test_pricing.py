@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+
+import ontology
+from pricing import DerivativeBook, black_scholes
+
+
+def _option(strike, expiry, lot_size=100.0):
+    return ontology.Option(
+        name="Option", annual_return=0.0, risk=0.0, issued_institution=None, market=None,
+        commodity_value_as_of_execution_date=0.0, nominal_value=strike,
+        principal_executive_office_address="N/A", redemption_terms="N/A",
+        effective_date=datetime.date(2024, 1, 1), execution_date=expiry, lot_size=lot_size)
+
+
+def test_textbook_value():
+    call, put, *_ = black_scholes(100.0, 100.0, 1.0, 0.05, 0.2)
+    assert np.isclose(call, 10.4506, atol=1e-4)
+    assert np.isclose(put, 5.5735, atol=1e-4)
+
+
+def test_put_call_parity():
+    rng = np.random.default_rng(0)
+    spot, strike = rng.uniform(50, 150, 1000), rng.uniform(50, 150, 1000)
+    years, volatility = rng.uniform(0.01, 5, 1000), rng.uniform(0.05, 0.8, 1000)
+    call, put, call_delta, put_delta, *_ = black_scholes(spot, strike, years, 0.03, volatility,
+                                                         0.01)
+    forward = spot * np.exp(-0.01 * years) - strike * np.exp(-0.03 * years)
+    assert np.allclose(call - put, forward, atol=1e-5)
+    assert np.allclose(call_delta - put_delta, np.exp(-0.01 * years))
+
+
+def test_expiry_is_worth_the_intrinsic_value():
+    spot = np.array([90.0, 100.0, 110.0])
+    call, put, call_delta, _, gamma, vega = black_scholes(spot, 100.0, 0.0, 0.05, 0.2)
+    assert np.array_equal(call, [0.0, 0.0, 10.0])
+    assert np.array_equal(put, [10.0, 0.0, 0.0])
+    assert np.allclose(call_delta, [0.0, 0.5, 1.0])
+    assert np.array_equal(gamma, [0.0, 0.0, 0.0]) and np.array_equal(vega, [0.0, 0.0, 0.0])
+
+
+def test_value_masks_expired_rows():
+    valuation = datetime.date(2024, 6, 3)
+    live = _option(100.0, valuation + datetime.timedelta(365))
+    today = _option(100.0, valuation)
+    expired = _option(100.0, valuation - datetime.timedelta(1))
+    unpriced = _option(100.0, valuation + datetime.timedelta(365))
+    stock = ontology.FinancialInstruments(
+        name="Stock", annual_return=0.0, risk=0.2, issued_institution=None, market=None,
+        commodity_value_as_of_execution_date=110.0, nominal_value=1.0,
+        principal_executive_office_address="N/A", redemption_terms="N/A")
+    edges = [ontology.UnderlyingAsset(option, stock, "") for option in (live, today, expired)]
+    book = DerivativeBook.from_contracts([live, today, expired, unpriced], edges)
+    value = book.value(valuation, 0.05)
+    assert np.isclose(value[0], 100.0 * black_scholes(110.0, 100.0, 1.0, 0.05, 0.2)[0])
+    assert value[1] == 100.0 * 10.0
+    assert np.isnan(value[2]) and np.isnan(value[3])
@@ -0,0 +1,37 @@
+import datetime
+
+import pytest
+
+import ontology
+from propagation import PolicyGraph
+from testdata import make_loan
+
+
+def _graph():
+    policy = ontology.MonetaryPolicy()
+    nyse = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    loan = make_loan(nyse, 0.02)
+    bank = ontology.Banks("USA", "OCC", "Federal")
+    sets = ontology.SetsPolicyForMarket(policy, nyse)
+    traded = ontology.IsTradedIn(loan, nyse, datetime.date(2020, 1, 1), 1e6)
+    held = ontology.HoldBy(bank, loan, 1.0, datetime.date(2024, 1, 1))
+    return PolicyGraph([sets, traded, held]), policy, nyse, loan, bank, held
+
+
+def test_removing_an_edge_that_was_never_added_raises_and_keeps_the_graph():
+    graph, policy, nyse, loan, bank, held = _graph()
+    stranger = ontology.Banks("USA", "FDIC", "Federal")
+    with pytest.raises(KeyError):
+        graph.remove(ontology.HoldBy(stranger, loan, 1.0, datetime.date(2024, 1, 1)))
+    with pytest.raises(KeyError):
+        graph.remove(ontology.HoldBy(nyse, loan, 1.0, datetime.date(2024, 1, 1)))
+    assert graph.count(policy) == {"policies": 0, "markets": 1, "instruments": 1, "entities": 1}
+    graph.remove(held)
+    with pytest.raises(KeyError):
+        graph.remove(held)
+    assert len(graph) == 2
+    assert graph.count(policy)["entities"] == 0
+    graph.add(held)
+    graph.add(held)
+    graph.remove(held)
+    assert graph.shock(policy)["entities"] == [bank]
@@ -0,0 +1,32 @@
+import datetime
+
+import ontology
+from query import Pattern, Var, query
+from store import TripleStore
+from testdata import make_loan
+
+
+def _store():
+    nyse = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    moodys = ontology.CreditRatingAgency("USA", "SEC", "Federal")
+    loans = [make_loan(nyse, 0.02), make_loan(nyse, 0.03)]
+    relations = [ontology.IsTradedIn(loan, nyse, datetime.date(2020, 1, 1), 1e6) for loan in loans]
+    relations.append(ontology.ProvidesRating(moodys, loans[0], "Aaa"))
+    return TripleStore(relations), nyse, moodys, loans
+
+
+def test_vars_with_the_same_name_are_one_variable():
+    store, nyse, moodys, loans = _store()
+    patterns = [Pattern(ontology.IsTradedIn, Var("inst"), nyse),
+                Pattern(ontology.ProvidesRating, moodys, Var("inst"), "Aaa")]
+    assert Var("inst") == Var("inst") and len({Var("inst"), Var("inst")}) == 1
+    assert query(store, patterns, select=[Var("inst")]) == [(loans[0],)]
+
+
+def test_select_without_solutions_is_empty():
+    store, nyse, moodys, _ = _store()
+    inst, market = Var("inst"), Var("market")
+    patterns = [Pattern(ontology.ProvidesRating, moodys, inst, "Baa1"),
+                Pattern(ontology.IsTradedIn, inst, market)]
+    assert query(store, patterns, select=[inst, market]) == []
+    assert query(store, patterns) == []
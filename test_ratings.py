@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+
+import ontology
+from ratings import MOODYS, RatingHistory
+from testdata import make_loan
+
+D = datetime.date
+NOT_RATED = len(MOODYS)
+
+
+def _history():
+    moodys = ontology.CreditRatingAgency("USA", "Moody's", "Federal")
+    a, b, c = (make_loan("NYSE", 0.01 * i) for i in range(3))
+    history = RatingHistory()
+    history.extend([(ontology.ProvidesRating(moodys, a, "Aa1"), D(2021, 6, 1)),
+                    (ontology.ProvidesRating(moodys, a, "Aaa"), D(2020, 1, 1)),
+                    (ontology.ProvidesRating(moodys, b, "Baa1"), D(2020, 3, 1)),
+                    (ontology.ProvidesRating(moodys, c, "A1"), D(2021, 1, 1)),
+                    (ontology.ProvidesRating(moodys, c, "A2"), D(2021, 1, 1))])
+    history.withdraw(moodys, b, D(2022, 1, 1))
+    return history, moodys, (a, b, c)
+
+
+def test_rating_on():
+    history, moodys, (a, b, c) = _history()
+    assert history.rating_on(moodys, a, D(2019, 12, 31)) is None
+    assert history.rating_on(moodys, a, D(2020, 1, 1)) == "Aaa"
+    assert history.rating_on(moodys, a, D(2021, 5, 31)) == "Aaa"
+    assert history.rating_on(moodys, a, D(2021, 6, 1)) == "Aa1"
+    assert history.rating_on(moodys, b, D(2022, 1, 1)) is None
+    assert history.rating_on(moodys, c, D(2021, 1, 1)) == "A2"  # the later record that day
+    assert history.latest(moodys, a) == "Aa1"
+    assert history.history(moodys, a) == [(D(2020, 1, 1), "Aaa"), (D(2021, 6, 1), "Aa1")]
+
+
+def test_ratings_on_matches_rating_on():
+    history, moodys, loans = _history()
+    for when in (D(2019, 1, 1), D(2020, 6, 1), D(2021, 1, 1), D(2021, 7, 1), D(2022, 6, 1)):
+        instruments, ratings = history.ratings_on(moodys, when)
+        found = {id(instrument): rating for instrument, rating in zip(instruments, ratings)}
+        expected = {id(loan): history.rating_on(moodys, loan, when) for loan in loans}
+        assert found == {key: rating for key, rating in expected.items() if rating is not None}
+
+
+def test_migration_matrix():
+    history, moodys, _ = _history()
+    matrix = history.migration_matrix(moodys, D(2020, 6, 1), D(2022, 6, 1))
+    expected = np.zeros((NOT_RATED + 1, NOT_RATED + 1), dtype=np.int64)
+    expected[MOODYS.index("Aaa"), MOODYS.index("Aa1")] = 1
+    expected[MOODYS.index("Baa1"), NOT_RATED] = 1
+    expected[NOT_RATED, MOODYS.index("A2")] = 1
+    assert np.array_equal(matrix, expected)
+    frequencies = history.migration_matrix(moodys, D(2020, 6, 1), D(2022, 6, 1), normalize=True)
+    assert np.array_equal(frequencies, expected.astype(float))
+    other = ontology.CreditRatingAgency("UK", "Other", "Common")
+    assert not history.migration_matrix(other, D(2020, 1, 1), D(2021, 1, 1)).any()
@@ -0,0 +1,19 @@
+import pytest
+
+import ontology
+from rdf import read_rdf, write_ntriples, write_turtle
+from serialize import read_jsonl, write_jsonl
+
+
+@pytest.mark.parametrize("write, suffix", [(write_ntriples, ".nt"), (write_turtle, ".ttl")])
+def test_sample_round_trip(tmp_path, write, suffix):
+    sample = list(ontology.load_sample().values())
+    write(tmp_path / ("sample" + suffix), sample)
+    objects = list(read_rdf(tmp_path / ("sample" + suffix)))
+    # Every object reachable from the sample, in the same order as a JSONL round trip.
+    write_jsonl(tmp_path / "sample.jsonl", sample)
+    expected = list(read_jsonl(tmp_path / "sample.jsonl"))
+    assert len(objects) == len(expected) == 101
+    for obj, other in zip(objects, expected):
+        assert type(obj) is type(other) and obj == other
+    assert all(any(obj == found for found in objects) for obj in sample)
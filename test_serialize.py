@@ -0,0 +1,38 @@
+import datetime
+import gc
+import weakref
+
+import ontology
+from serialize import RowWriter, iter_rows, read_jsonl, write_jsonl
+from testdata import make_loan
+
+
+def _holdings(n):
+    bank = ontology.Banks("USA", "OCC", "Federal")
+    loan = make_loan("NYSE", 0.02)
+    return bank, loan, [ontology.HoldBy(bank, loan, float(i), datetime.date(2024, 1, 1))
+                        for i in range(n)]
+
+
+def test_relations_are_released_once_written():
+    bank, loan, holdings = _holdings(50)
+    writer = RowWriter()
+    released = [weakref.ref(holding) for holding in holdings]
+    rows = []
+    while holdings:
+        rows += writer.rows(holdings.pop())
+    gc.collect()
+    assert all(ref() is None for ref in released)
+    assert len(rows) == 52
+    assert len({row["id"] for row in rows}) == len(rows)
+    # The Things they point at are still shared.
+    assert writer.rows(bank) == [] and writer.rows(loan) == []
+
+
+def test_round_trip_with_released_relations(tmp_path):
+    _, _, holdings = _holdings(5)
+    path = tmp_path / "holdings.jsonl"
+    assert write_jsonl(path, holdings) == len(list(iter_rows(holdings))) == 7
+    loaded = [obj for obj in read_jsonl(path) if isinstance(obj, ontology.HoldBy)]
+    assert [holding.holding_amount for holding in loaded] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert len({id(holding.financial_instrument) for holding in loaded}) == 1
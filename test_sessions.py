@@ -0,0 +1,50 @@
+import datetime
+
+import ontology
+from sessions import TradingCalendar
+
+UTC = datetime.timezone.utc
+
+
+def _at(*fields):
+    return datetime.datetime(*fields, tzinfo=UTC)
+
+
+NYSE = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+LSE = ontology.StockExchange("LSE", "UK", "GBP", "GMT", "08:00", "16:30")
+NIGHT = ontology.StockExchange("Night", "N/A", "USD", "UTC", "22:00", "06:00")
+
+
+def test_daylight_saving_moves_the_utc_open():
+    calendar = TradingCalendar([NYSE])
+    assert not calendar.is_open(NYSE, _at(2024, 1, 8, 14, 0))   # EST: opens 14:30 UTC
+    assert calendar.is_open(NYSE, _at(2024, 7, 8, 14, 0))       # EDT: opens 13:30 UTC
+    assert calendar.next_open(NYSE, _at(2024, 3, 9, 12, 0)) == _at(2024, 3, 11, 13, 30)
+    assert calendar.next_open(NYSE, _at(2024, 11, 2, 12, 0)) == _at(2024, 11, 4, 14, 30)
+    # US clocks change three weeks before the UK's, so the overlap is an hour longer.
+    calendar.add(LSE)
+    assert calendar.overlaps(NYSE, LSE, datetime.date(2024, 3, 6))[0] == \
+        (_at(2024, 3, 4, 14, 30), _at(2024, 3, 4, 16, 30))
+    overlaps = calendar.overlaps(NYSE, LSE, datetime.date(2024, 3, 20))
+    assert len(overlaps) == 5
+    assert overlaps[0] == (_at(2024, 3, 18, 13, 30), _at(2024, 3, 18, 16, 30))
+
+
+def test_holidays_are_closed():
+    calendar = TradingCalendar([NYSE, LSE], holidays={NYSE: [datetime.date(2024, 7, 4)]})
+    assert not calendar.is_open(NYSE, _at(2024, 7, 4, 15, 0))
+    assert calendar.is_open(LSE, _at(2024, 7, 4, 15, 0))
+    assert calendar.open_markets(_at(2024, 7, 4, 15, 0)) == [LSE]
+    assert calendar.next_open(NYSE, _at(2024, 7, 3, 21, 0)) == _at(2024, 7, 5, 13, 30)
+    overlaps = calendar.overlaps(NYSE, LSE, datetime.date(2024, 7, 1))
+    assert [start.day for start, _ in overlaps] == [1, 2, 3, 5]
+
+
+def test_overnight_session_runs_past_midnight():
+    calendar = TradingCalendar([NIGHT])
+    assert calendar.is_open(NIGHT, _at(2024, 1, 8, 23, 0))      # Monday night
+    assert calendar.is_open(NIGHT, _at(2024, 1, 9, 5, 59))      # into Tuesday
+    assert not calendar.is_open(NIGHT, _at(2024, 1, 9, 6, 0))
+    assert calendar.is_open(NIGHT, _at(2024, 1, 13, 3, 0))      # Friday's session, Saturday
+    assert not calendar.is_open(NIGHT, _at(2024, 1, 14, 23, 0))  # no Sunday session
+    assert calendar.next_open(NIGHT, _at(2024, 1, 13, 12, 0)) == _at(2024, 1, 15, 22, 0)
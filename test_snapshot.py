@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+import ontology
+from snapshot import Snapshot, write_snapshot
+
+
+@dataclass
+class Node:
+    value: int
+    next: object
+
+
+def test_sample_round_trip(tmp_path):
+    sample = ontology.load_sample()
+    write_snapshot(tmp_path / "sample.snap", sample)
+    with Snapshot(tmp_path / "sample.snap") as snapshot:
+        assert set(snapshot.names) == set(sample)
+        for name, obj in sample.items():
+            assert snapshot.get(name) == obj, name
+        assert len(snapshot) >= len(sample)
+
+
+def test_long_reference_chain(tmp_path):
+    head = None
+    for value in range(20_000):
+        head = Node(value, head)
+    write_snapshot(tmp_path / "chain.snap", [head])
+    with Snapshot(tmp_path / "chain.snap", classes={"Node": Node}) as snapshot:
+        node, length = next(snapshot.roots()), 0
+        while node is not None:
+            assert node.value == 19_999 - length
+            node, length = node.next, length + 1
+    assert length == 20_000
@@ -0,0 +1,64 @@
+import datetime
+import gc
+import sqlite3
+import weakref
+from contextlib import closing
+
+import ontology
+from sqlstore import SqlStore
+from testdata import make_loan
+
+
+def _holdings(nyse, banks, loans_per_bank=30):
+    loans = [make_loan(nyse, 0.01 * i) for i in range(loans_per_bank)]
+    return [ontology.HoldBy(bank, loan, 1.0, datetime.date(2024, 1, 1))
+            for bank in banks for loan in loans]
+
+
+def test_interned_entities_are_found_through_the_identity_index(tmp_path):
+    path = tmp_path / "store.db"
+    nyse = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    bank = ontology.Banks("USA", "OCC", "Federal")
+    with SqlStore(path) as store:
+        store.insert(_holdings(nyse, [bank], 2))
+    with closing(sqlite3.connect(path)) as db:
+        plan = " ".join(row[-1] for row in db.execute(
+            'EXPLAIN QUERY PLAN SELECT oid FROM "StockExchange" WHERE "name" IS ? AND '
+            '"country" IS ? AND "currency" IS ? AND "timezone" IS ? AND "opening_time" IS ? '
+            'AND "closing_time" IS ?', ["NYSE", "USA", "USD", "EST", "09:30", "16:00"]))
+    assert "StockExchange.identity" in plan
+    with SqlStore(path) as store:
+        store.insert([ontology.IsTradedIn(make_loan(nyse, 0.05), nyse, datetime.date(2020, 1, 1), 1.0)])
+        assert store.count(ontology.StockExchange) == 1
+        assert store.get(store.oid(nyse)) is nyse
+
+
+def test_scans_cache_only_interned_entities(tmp_path):
+    nyse = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    banks = [ontology.Banks("USA", f"Bank {i}", "Federal") for i in range(3)]
+    with SqlStore(tmp_path / "store.db") as store:
+        store.insert(_holdings(nyse, banks))
+        store.forget()
+        holdings = list(store.of_type(ontology.HoldBy, page_size=40))
+        assert len(holdings) == 90
+        assert {id(holding.holder) for holding in holdings} == {id(bank) for bank in banks}
+        assert all(holding.financial_instrument.market is nyse for holding in holdings)
+        # Within a page a shared Thing is one object; pages build their own.
+        first, second = holdings[0].financial_instrument, holdings[30].financial_instrument
+        assert first is second
+        assert holdings[0].financial_instrument is not holdings[60].financial_instrument
+        assert store.count(ontology.Loan) == 30
+
+
+def test_insert_keeps_only_interned_entities_between_calls(tmp_path):
+    sec = ontology.Regulators("USA", "SEC", "Federal")
+    regulation = ontology.FinancialRegulation()
+    with SqlStore(tmp_path / "store.db") as store:
+        store.insert([ontology.EnforcesRegulation(sec, regulation)])
+        released = weakref.ref(regulation)
+        del regulation
+        gc.collect()
+        assert released() is None
+        store.insert([ontology.EnforcesRegulation(sec, ontology.FinancialRegulation())])
+        assert store.count(ontology.Regulators) == 1
+        assert store.count(ontology.FinancialRegulation) == 2
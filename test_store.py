@@ -0,0 +1,32 @@
+import datetime
+
+import ontology
+from store import TripleStore
+from testdata import make_loan
+
+
+def test_insert_lookup_and_delete():
+    banks = [ontology.Banks("USA", f"Bank {i}", "Federal") for i in range(2)]
+    loans = [make_loan("NYSE", 0.01 * i) for i in range(3)]
+    holdings = [ontology.HoldBy(bank, loan, 1.0, datetime.date(2024, 1, 1))
+                for bank in banks for loan in loans]
+    sec = ontology.Regulators("USA", "SEC", "Federal")
+    oversight = ontology.RegulatoryOversight(sec, loans[0])
+    store = TripleStore(holdings)
+    assert store.add(oversight) and not store.add(oversight)
+    assert len(store) == 7
+
+    assert store.match(subject=banks[0]) == holdings[:3]
+    assert store.match(predicate=ontology.HoldBy, object=loans[0]) == [holdings[0], holdings[3]]
+    assert store.count(object=loans[0]) == 3
+    assert [id(obj) for obj in store.objects(banks[1])] == [id(loan) for loan in loans]
+    assert [id(bank) for bank in store.subjects(loans[2], ontology.HoldBy)] == \
+        [id(bank) for bank in banks]
+
+    store.remove(holdings[0])
+    assert holdings[0] not in store and len(store) == 6
+    assert store.match(subject=banks[0], object=loans[0]) == []
+    assert store.match(object=loans[0]) == [holdings[3], oversight]
+    for relation in list(store):
+        store.remove(relation)
+    assert len(store) == 0 and store.match(subject=banks[0]) == []
@@ -0,0 +1,25 @@
+import ontology
+from table import InstrumentTable
+from testdata import make_loan
+
+
+def test_string_markets_group_by_value():
+    # Two equal strings that are distinct objects, as a loaded feed produces them.
+    first, second = "".join(["NY", "SE"]), "".join(["NYS", "E"])
+    assert first is not second
+    table = InstrumentTable.from_instruments([make_loan(first, 0.02), make_loan(second, 0.04),
+                                              make_loan("LSE", 0.10)])
+    means = dict(table.mean_return_by_market())
+    assert means.keys() == {"NYSE", "LSE"}
+    assert abs(means["NYSE"] - 0.03) < 1e-12
+    assert len(table.in_market("NYSE")) == 2
+    totals = dict(table.risk_weighted_nominal_by_market())
+    assert abs(totals["NYSE"] - 20.0) < 1e-9
+
+
+def test_interned_markets_group_by_identity():
+    nyse = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    again = ontology.StockExchange("NYSE", "USA", "USD", "EST", "09:30", "16:00")
+    table = InstrumentTable.from_instruments([make_loan(nyse, 0.02), make_loan(again, 0.04)])
+    assert len(table.markets) == 1
+    assert len(table.in_market(nyse)) == 2
@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+
+import ontology
+from temporal import TemporalIndex
+from testdata import make_loan
+
+
+def _holding(amount, when):
+    return ontology.HoldBy("fund", make_loan("NYSE", 0.02), amount, when)
+
+
+def test_as_of_and_between():
+    dated = [_holding(float(day), datetime.date(2024, 1, day)) for day in (5, 1, 20, 10)]
+    index = TemporalIndex(dated)
+    assert [h.holding_amount for h in index.as_of(datetime.date(2024, 1, 10))] == [1.0, 5.0, 10.0]
+    assert index.count_between(datetime.date(2024, 1, 2), datetime.date(2024, 1, 19)) == 2
+    index.remove(dated[0])
+    assert [h.holding_amount for h in index.between(cls=ontology.HoldBy)] == [1.0, 10.0, 20.0]
+    with pytest.raises(KeyError):
+        index.remove(dated[0])
+
+
+def test_undated_relations_can_be_added_and_removed():
+    undated = _holding(1.0, None)
+    dated = _holding(2.0, datetime.date(2024, 1, 1))
+    index = TemporalIndex([undated, dated])
+    assert len(index) == 1
+    index.remove(undated)
+    assert [h.holding_amount for h in index.as_of(datetime.date(2024, 12, 31))] == [2.0]
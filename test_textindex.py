@@ -0,0 +1,54 @@
+import math
+import random
+
+import ontology
+from textindex import TextIndex, tokenize
+
+WORDS = "rate hike inflation bond yield equity credit default swap liquidity risk".split()
+
+
+def _brute_force(documents, text, k1=1.2, b=0.75):
+    # BM25 straight from the definition, over the live documents.
+    docs = [tokenize(document.relation_description) for document in documents]
+    average = sum(map(len, docs)) / len(docs) or 1.0
+    scores = {}
+    for term in set(tokenize(text)):
+        having = sum(term in doc for doc in docs)
+        if not having:
+            continue
+        idf = math.log(1 + (len(docs) - having + 0.5) / (having + 0.5))
+        for document, doc in zip(documents, docs):
+            tf = doc.count(term)
+            if tf:
+                norm = k1 * (1 - b + b * len(doc) / average)
+                scores[id(document)] = scores.get(id(document), 0.0) + \
+                    idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def test_search_matches_brute_force_bm25():
+    rng = random.Random(0)
+
+    def document():
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+        return ontology.UnderlyingAsset(None, None, text)
+
+    index, live = TextIndex(), []
+    for step in range(600):
+        if live and rng.random() < 0.4:
+            index.remove(live.pop(rng.randrange(len(live))))
+        else:
+            live.append(document())
+            index.add(live[-1])
+        if step % 20 or not live:
+            continue
+        query = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+        expected = _brute_force(live, query)
+        found = index.search(query, k=5)
+        assert len(found) == min(5, len(expected))
+        for relation, score in found:
+            assert math.isclose(score, expected[id(relation)], rel_tol=1e-9)
+        best = sorted(expected.values(), reverse=True)[:5]
+        assert all(math.isclose(a, b, rel_tol=1e-9) for a, b in
+                   zip([score for _, score in found], best))
+    assert len(index) == len(live)
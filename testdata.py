@@ -0,0 +1,15 @@
+import datetime
+
+import ontology
+
+
+#### Test data ####
+# Builders shared by the test_*.py modules.
+
+def make_loan(market, annual_return, risk=0.1, nominal_value=100.0):
+    return ontology.Loan(
+        name="Loan", annual_return=annual_return, risk=risk, issued_institution=None,
+        market=market, commodity_value_as_of_execution_date=0.0, nominal_value=nominal_value,
+        principal_executive_office_address="N/A", redemption_terms="Bullet", interest_rate=0.05,
+        issuer="Bank", maturity_date=datetime.date(2030, 1, 1), negative_amortization=False,
+        principal_amount=1e5, disbursement_date=datetime.date(2020, 1, 1))
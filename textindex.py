@@ -0,0 +1,188 @@
+import math
+import re
+from array import array
+
+import numpy as np
+
+from ontology import (AdvisoryRole, Compliance, InfluencesMarketThroughPolicy, IsAffectedBy,
+                      OffersInsurance, PolicyImpact, PolicyInstrumentEffect, PolicyMarketEffect,
+                      RegulationCompliance, RegulatoryImpactAssessment, RegulatoryReview,
+                      UnderlyingAsset)
+
+
+#### Full-text index ####
+# BM25 over the prose fields of relations; a relation's text fields form one document.
+# Postings are compact per-term arrays of (document, term frequency), appended on
+# insert and read as numpy views at query time. A query scores every posting of its
+# terms in one vectorized pass and picks the top k with argpartition. Removed documents
+# are tombstoned (masked out of scores and statistics) and squeezed out once they make
+# up half of the index.
+
+TEXT_FIELDS = {
+    PolicyImpact: ("effect_analysis",),
+    Compliance: ("compliance_details",),
+    RegulationCompliance: ("compliance_details",),
+    RegulatoryReview: ("review_outcome",),
+    IsAffectedBy: ("policy_impact_description",),
+    OffersInsurance: ("policy_details",),
+    AdvisoryRole: ("advisory_purpose",),
+    InfluencesMarketThroughPolicy: ("impact_description",),
+    UnderlyingAsset: ("relation_description",),
+    PolicyInstrumentEffect: ("effect_analysis",),
+    RegulatoryImpactAssessment: ("impact_assessment",),
+    PolicyMarketEffect: ("effect_analysis",),
+}
+
+STOPWORDS = frozenset("a an and are as at be by for from has in is it its of on or that the "
+                      "to was were will with".split())
+
+_WORD = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+class _Postings:
+    __slots__ = ("docs", "freqs")
+
+    def __init__(self):
+        self.docs = array("i")
+        self.freqs = array("i")
+
+
+class TextIndex:
+    def __init__(self, relations=(), text_fields=None, k1=1.2, b=0.75):
+        self.text_fields = TEXT_FIELDS if text_fields is None else text_fields
+        self.k1, self.b = k1, b
+        self._postings = {}          # term -> _Postings
+        self._documents = []         # document number -> relation, None once removed
+        self._numbers = {}           # id(relation) -> document number
+        self._lengths = array("i")   # document number -> token count
+        self._alive = bytearray()    # document number -> 1 while indexed
+        self._live_length = 0
+        self._fields = {}            # class -> text field names
+        self.extend(relations)
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __contains__(self, relation):
+        return id(relation) in self._numbers
+
+    def _text(self, relation):
+        cls = type(relation)
+        names = self._fields.get(cls)
+        if names is None:
+            names = self._fields[cls] = tuple(
+                name for base in cls.__mro__ for name in self.text_fields.get(base, ()))
+            if not names:
+                raise TypeError(f"{cls.__name__} has no indexed text fields")
+        return " ".join(value for value in (getattr(relation, name) for name in names)
+                        if isinstance(value, str))
+
+    #### Maintenance ####
+    def add(self, relation):
+        if id(relation) in self._numbers:
+            return False
+        tokens = tokenize(self._text(relation))
+        number = len(self._documents)
+        self._documents.append(relation)
+        self._numbers[id(relation)] = number
+        self._lengths.append(len(tokens))
+        self._alive.append(1)
+        self._live_length += len(tokens)
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        postings = self._postings
+        for term, count in counts.items():
+            entry = postings.get(term)
+            if entry is None:
+                entry = postings[term] = _Postings()
+            entry.docs.append(number)
+            entry.freqs.append(count)
+        return True
+
+    def extend(self, relations):
+        for relation in relations:
+            self.add(relation)
+
+    def remove(self, relation):
+        number = self._numbers.pop(id(relation))
+        self._documents[number] = None
+        self._alive[number] = 0
+        self._live_length -= self._lengths[number]
+        if len(self._numbers) * 2 < len(self._documents):
+            self._compact()
+
+    def update(self, relation):
+        # Call after editing a relation's text.
+        self.remove(relation)
+        self.add(relation)
+
+    def _compact(self):
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        renumber = np.cumsum(alive) - 1
+        for term in list(self._postings):
+            entry = self._postings[term]
+            docs = np.frombuffer(entry.docs, dtype=np.int32)
+            keep = alive[docs]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            entry.docs = array("i", renumber[docs[keep]].astype(np.int32).tobytes())
+            entry.freqs = array("i", np.frombuffer(entry.freqs, dtype=np.int32)[keep].tobytes())
+        self._documents = [relation for relation in self._documents if relation is not None]
+        self._numbers = {id(relation): number for number, relation in enumerate(self._documents)}
+        self._lengths = array("i", np.frombuffer(self._lengths, dtype=np.int32)[alive].tobytes())
+        self._alive = bytearray(b"\x01" * len(self._documents))
+
+    #### Search ####
+    def search(self, text, k=10, cls=None):
+        # Top k (relation, score) pairs, best first; cls keeps only its instances.
+        terms = set(tokenize(text))
+        total = len(self._numbers)
+        if not terms or not total:
+            return []
+        alive = np.frombuffer(self._alive, dtype=np.uint8)
+        lengths = np.frombuffer(self._lengths, dtype=np.int32)
+        average = self._live_length / total or 1.0
+        all_docs, all_scores = [], []
+        for term in terms:
+            entry = self._postings.get(term)
+            if entry is None:
+                continue
+            docs = np.frombuffer(entry.docs, dtype=np.int32)
+            freqs = np.frombuffer(entry.freqs, dtype=np.int32)
+            live = alive[docs].view(bool)
+            if not live.all():
+                docs, freqs = docs[live], freqs[live]
+            if not len(docs):
+                continue
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / average)
+            all_docs.append(docs)
+            all_scores.append(idf * freqs * (self.k1 + 1) / (freqs + norm))
+        if not all_docs:
+            return []
+        docs = np.concatenate(all_docs)
+        scores = np.concatenate(all_scores)
+        if len(all_docs) > 1 and len(docs) * 8 > len(self._documents):
+            # Many postings: sum into a dense score array instead of sorting them.
+            scores = np.bincount(docs, weights=scores, minlength=len(self._documents))
+            docs = np.flatnonzero(scores)
+            scores = scores[docs]
+        elif len(all_docs) > 1:
+            docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores)
+        if cls is not None:
+            keep = np.fromiter((isinstance(self._documents[doc], cls) for doc in docs.tolist()),
+                               dtype=bool, count=len(docs))
+            docs, scores = docs[keep], scores[keep]
+        if len(docs) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            docs, scores = docs[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(self._documents[doc], float(score))
+                for doc, score in zip(docs[order].tolist(), scores[order].tolist())]
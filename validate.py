@@ -0,0 +1,344 @@
+import datetime
+import itertools
+from collections import defaultdict
+from dataclasses import MISSING, fields, is_dataclass
+from typing import Union, get_args, get_origin
+
+from loader import ontology_classes
+
+
+#### Schema validation ####
+# Checks loader rows (see loader.py: "type", optional "id", plain fields and "@field"
+# references) against the dataclass schema without building any objects. Each class is
+# compiled once into a field table of value checks and allowed reference classes, so a
+# row costs one dict walk. Problems are collected per row instead of raised, and rows
+# that pass register their id (and class) for checking later references.
+
+def _is_float(value):
+    if isinstance(value, str):
+        try:
+            float(value)
+        except ValueError:
+            return False
+        return True
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int(value):
+    if isinstance(value, str):
+        digits = value.strip()
+        if digits[:1] in ("+", "-"):
+            digits = digits[1:]
+        return digits.isdigit()
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+_BOOLEANS = {"true", "t", "yes", "y", "1", "false", "f", "no", "n", "0"}
+
+
+def _is_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in _BOOLEANS
+    return isinstance(value, bool)
+
+
+def _iso(parse, kind):
+    def check(value):
+        if isinstance(value, str):
+            try:
+                parse(value)
+            except ValueError:
+                return False
+            return True
+        return isinstance(value, kind)
+    return check
+
+
+# Value types that are valid for a field without looking at the value.
+_NATIVE_TYPES = {
+    float: {float, int},
+    int: {int},
+    bool: {bool},
+    str: {str},
+    datetime.date: {datetime.date, datetime.datetime},
+    datetime.datetime: {datetime.datetime},
+}
+
+_VALUE_CHECKS = {
+    float: _is_float,
+    int: _is_int,
+    bool: _is_bool,
+    str: lambda value: isinstance(value, str),
+    datetime.date: _iso(datetime.date.fromisoformat, datetime.date),
+    datetime.datetime: _iso(datetime.datetime.fromisoformat, datetime.datetime),
+}
+
+
+class _Field:
+    __slots__ = ("name", "type_name", "value_check", "native_types", "ref_types", "many",
+                 "any", "required", "accepts")
+
+    def __init__(self, name, annotation):
+        self.name = name
+        self.type_name = getattr(annotation, "__name__", str(annotation))
+        self.many = get_origin(annotation) is list
+        if self.many:
+            annotation = (get_args(annotation) or (object,))[0]
+        options = get_args(annotation) if get_origin(annotation) is Union else (annotation,)
+        self.ref_types = tuple(option for option in options
+                               if isinstance(option, type) and is_dataclass(option))
+        checks = [option for option in options if option in _VALUE_CHECKS]
+        self.value_check = _VALUE_CHECKS[checks[0]] if len(checks) == 1 else None
+        self.native_types = _NATIVE_TYPES[checks[0]] | {type(None)} if len(checks) == 1 else set()
+        # Forward references ('SharePaymentStatus') and other annotations aren't checked.
+        self.any = not self.ref_types and not checks
+        self.required = False
+        self.accepts = {}  # referenced class -> bool, memoized issubclass
+
+    def accepts_class(self, cls):
+        accepted = self.accepts.get(cls)
+        if accepted is None:
+            accepted = self.accepts[cls] = not self.ref_types or issubclass(cls, self.ref_types)
+        return accepted
+
+
+class _ClassChecker:
+    def __init__(self, cls):
+        self.cls = cls
+        self.fields = {f.name: _Field(f.name, f.type) for f in fields(cls)}
+        self.required = frozenset(f.name for f in fields(cls)
+                                  if f.default is MISSING and f.default_factory is MISSING)
+        for name in self.required:
+            self.fields[name].required = True
+        # Row key -> (field, is reference), so the hot loop does a single lookup per key.
+        self.keys = {}
+        for name, field in self.fields.items():
+            self.keys[name] = (field, False)
+            self.keys["@" + name] = (field, True)
+
+
+class SchemaValidator:
+    def __init__(self, classes=None):
+        self.classes = ontology_classes() if classes is None else classes
+        self.ids = {}          # id -> class of the row that declared it
+        self._checkers = {}    # class name -> _ClassChecker
+
+    def _checker(self, type_name):
+        checker = self._checkers.get(type_name)
+        if checker is None:
+            cls = self.classes.get(type_name)
+            if cls is None:
+                return None
+            checker = self._checkers[type_name] = _ClassChecker(cls)
+        return checker
+
+    def _check_refs(self, field, value, problems, lookup=None, defer=None):
+        if field.many and isinstance(value, str):
+            value = value.split("|")  # CSV cell; a single id is a one-item list
+        if isinstance(value, list) != field.many:
+            problems.append(f"@{field.name}: expected {'a list of ids' if field.many else 'one id'}")
+            return
+        for ref in value if field.many else (value,):
+            cls = self.ids.get(ref) if lookup is None else lookup(ref)
+            if cls is None:
+                if defer is None:
+                    problems.append(f"@{field.name}: unknown reference {ref!r}")
+                else:
+                    defer(field, ref)
+            elif not field.accepts_class(cls):
+                expected = " or ".join(t.__name__ for t in field.ref_types)
+                problems.append(f"@{field.name}: {ref!r} is a {cls.__name__}, expected {expected}")
+
+    def check(self, row, defer=None):
+        # List of problems with one row; empty means the row is valid. With `defer`, an id
+        # this validator hasn't seen is passed to defer(field, id) instead of being a problem,
+        # to be settled later with check_ref() (load_parallel's workers only see their shard).
+        checker = self._checker(row.get("type"))
+        if checker is None:
+            return [f"unknown type {row.get('type')!r}"]
+        problems = []
+        keys, ids = checker.keys, self.ids
+        required = given = 0
+        for key, value in row.items():
+            entry = keys.get(key)
+            if entry is None:
+                if key != "type" and key != "id":
+                    problems.append(f"{checker.cls.__name__} has no field {key.lstrip('@')!r}")
+                continue
+            field, is_ref = entry
+            required += field.required
+            given += 1
+            if value is None or value == "" or field.any:
+                continue
+            if is_ref:
+                # Fast path for the common single-id reference.
+                cls = ids.get(value) if type(value) is str else None
+                if cls is None or field.many or not field.accepts_class(cls):
+                    self._check_refs(field, value, problems, defer=defer)
+            elif field.value_check is not None:
+                if not field.value_check(value):
+                    problems.append(f"{field.name}: {value!r} is not a valid {field.type_name}")
+            elif field.ref_types:
+                problems.append(f"{field.name}: must be given as a reference (@{field.name})")
+        # Counting alone is fooled by a field given as both x and @x, so compare names.
+        present = {key.lstrip("@") for key in row if key in keys}
+        if required != len(checker.required) or len(present) != given:
+            problems.extend(self._field_problems(checker, row))
+        if not problems:
+            ident = row.get("id")
+            if ident not in (None, ""):
+                self.ids[ident] = checker.cls
+        return problems
+
+    def check_ref(self, type_name, name, ref):
+        # Problems with one id given for the reference field `name`, e.g. a deferred one.
+        field = self._checker(type_name).fields[name]
+        problems = []
+        self._check_refs(field, [ref] if field.many else ref, problems)
+        return problems
+
+    def validate(self, rows):
+        # Batch form: (valid rows, [(row number, problems), ...]), same rules as check().
+        # Rows are grouped by (type, columns) so schema-level problems are found once per
+        # group, then each column is checked on its distinct values. An id may be referenced
+        # by rows after the one declaring it; references to a row that fails only on its
+        # own references are not re-checked.
+        rows = list(rows)
+        problems = defaultdict(list)  # row index -> problems
+        groups = defaultdict(list)
+        previous_type = previous_keys = group = None
+        for index, row in enumerate(rows):
+            # Feeds come in runs of same-shaped rows; only hash the key set when it changes.
+            type_name, keys = row.get("type"), row.keys()
+            if type_name != previous_type or keys != previous_keys:
+                group = groups[type_name, frozenset(keys)]
+                previous_type, previous_keys = type_name, keys
+            group.append(index)
+
+        ref_columns = []
+        for (type_name, keys), indices in groups.items():
+            checker = self._checker(type_name)
+            if checker is None:
+                for index in indices:
+                    problems[index].append(f"unknown type {type_name!r}")
+                continue
+            shape = self._shape_problems(checker, keys)
+            if shape:
+                for index in indices:
+                    problems[index].extend(shape)
+            for key in keys:
+                entry = checker.keys.get(key)
+                if entry is None or entry[0].any:
+                    continue
+                field, is_ref = entry
+                if is_ref:
+                    ref_columns.append((field, key, indices))
+                else:
+                    self._check_column(field, [rows[i][key] for i in indices], indices, problems)
+
+        declared = {}  # id -> (class, row index) for rows valid so far
+        for index, row in enumerate(rows):
+            ident = row.get("id")
+            if ident not in (None, "") and index not in problems and ident not in declared:
+                declared[ident] = (self.classes[row["type"]], index)
+        for field, key, indices in ref_columns:
+            self._check_ref_column(field, key, rows, indices, declared, problems)
+
+        valid, errors = [], []
+        for index, row in enumerate(rows):
+            if index in problems:
+                errors.append((index + 1, problems[index]))
+            else:
+                valid.append(row)
+        for ident, (cls, index) in declared.items():
+            if index not in problems:
+                self.ids[ident] = cls
+        return valid, errors
+
+    def filter(self, rows, errors=None, batch_size=65536):
+        # Streaming form: validates in batches, yields valid rows and appends
+        # (row number, problems) to errors.
+        rows = iter(rows)
+        offset = 0
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return
+            valid, batch_errors = self.validate(batch)
+            if errors is not None:
+                errors.extend((number + offset, found) for number, found in batch_errors)
+            offset += len(batch)
+            yield from valid
+
+    @staticmethod
+    def _shape_problems(checker, keys):
+        shape = [f"{checker.cls.__name__} has no field {key.lstrip('@')!r}"
+                 for key in keys if key not in checker.keys and key not in ("type", "id")]
+        shape.extend(SchemaValidator._field_problems(checker, keys))
+        return shape
+
+    @staticmethod
+    def _field_problems(checker, keys):
+        names = [key.lstrip("@") for key in keys if key in checker.keys]
+        present = set(names)
+        problems = []
+        missing = checker.required - present
+        if missing:
+            problems.append(f"missing {', '.join(sorted(missing))}")
+        if len(present) < len(names):
+            problems.append("field given both as a value and as a reference")
+        return problems
+
+    @staticmethod
+    def _check_column(field, column, indices, problems):
+        if field.value_check is None:
+            # Thing-typed field given as a plain value.
+            for index, value in zip(indices, column):
+                if value is not None and value != "":
+                    problems[index].append(
+                        f"{field.name}: must be given as a reference (@{field.name})")
+            return
+        if set(map(type, column)) <= field.native_types:
+            return
+        # Strings (CSV cells, ISO dates) repeat a lot, so check each distinct one once.
+        strings = {value for value in column if type(value) is str}
+        bad = {value for value in strings if value != "" and not field.value_check(value)}
+        for index, value in zip(indices, column):
+            if type(value) is str:
+                if value not in bad:
+                    continue
+            elif type(value) in field.native_types or field.value_check(value):
+                continue
+            problems[index].append(f"{field.name}: {value!r} is not a valid {field.type_name}")
+
+    def _check_ref_column(self, field, key, rows, indices, declared, problems):
+        column = [rows[i][key] for i in indices]
+        simple = not field.many and all(type(value) is str and "|" not in value
+                                        for value in column)
+        if simple:
+            # Resolve each distinct id once; only ids declared inside the batch need the
+            # per-row "declared earlier" check.
+            ok, in_batch = set(), {}
+            for ref in set(column):
+                cls = self.ids.get(ref)
+                if cls is not None and field.accepts_class(cls):
+                    ok.add(ref)
+                elif cls is None and ref in declared and field.accepts_class(declared[ref][0]):
+                    in_batch[ref] = declared[ref][1]
+            if len(ok) == len(set(column)):
+                return
+        for index, value in zip(indices, column):
+            if value is None or value == "":
+                continue
+            if simple and (value in ok or in_batch.get(value, index) < index):
+                continue
+
+            def lookup(ref, index=index):
+                cls = self.ids.get(ref)
+                if cls is None and ref in declared and declared[ref][1] < index:
+                    cls = declared[ref][0]
+                return cls
+            found = []
+            self._check_refs(field, value, found, lookup)
+            if found:
+                problems[index].extend(found)